@@ -0,0 +1,29 @@
+from typing import Any
+
+from fastapi import Cookie, HTTPException, status
+
+from app.core import security
+
+
+def admin_claims(access_token: str | None) -> dict[str, Any] | None:
+    """Returns the verified claims of an admin session token, or None."""
+    if not access_token:
+        return None
+    payload = security.verify_token(access_token)
+    if not payload or payload.get("sub") != "admin":
+        return None
+    return payload
+
+
+async def require_admin(access_token: str | None = Cookie(None)) -> dict[str, Any]:
+    """Dependency for admin-only endpoints; raises 401 without a valid session cookie."""
+    if not access_token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated"
+        )
+    payload = admin_claims(access_token)
+    if payload is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token"
+        )
+    return payload
@@ -1,11 +1,21 @@
 from typing import Any
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, File, Query, UploadFile, status
 
+from app.core.config import settings
+from app.core.exceptions import ValidationException
 from app.core.premium_apps import PremiumAppDefinition
-from app.schemas.app import App, AppCreate, AppPreviewRequest, AppPreviewResponse
+from app.schemas.app import (
+    App,
+    AppCreate,
+    AppImportJob,
+    AppPreviewRequest,
+    AppPreviewResponse,
+)
 from app.services.app_service import AppService
+from app.services.bookmark_import import get_import_job, start_import
 from app.services.config_service import ConfigService
+from app.services.icon_mirror import icon_mirror
 from app.services.registry_service import RegistryService
 
 router = APIRouter()
@@ -26,7 +36,16 @@ async def list_apps(service: AppService = Depends(get_service)):
 @router.get("/premium", response_model=list[PremiumAppDefinition])
 async def list_premium_apps():
     config = await config_service.get_config()
-    return await registry_service.get_all_premium_apps(config.registry_urls)
+    premium_apps = await registry_service.get_all_premium_apps(config.registry_urls)
+    # Prefer locally mirrored icons over CDN hotlinks where available
+    return [
+        (
+            app.model_copy(update={"default_icon": local_icon})
+            if (local_icon := icon_mirror.lookup(app.default_icon))
+            else app
+        )
+        for app in premium_apps
+    ]
 
 
 @router.post("", response_model=App)
@@ -34,6 +53,34 @@ async def create_app(app_in: AppCreate, service: AppService = Depends(get_servic
     return await service.create(app_in)
 
 
+@router.post(
+    "/import", response_model=AppImportJob, status_code=status.HTTP_202_ACCEPTED
+)
+async def import_bookmarks(
+    file: UploadFile = File(...),
+    enrich: bool = Query(True, description="Fetch title/description/icon per link"),
+):
+    """
+    Imports a browser bookmark export (Netscape HTML or JSON). Folders become folder apps.
+    Runs in the background; poll GET /apps/import/{job_id} for progress.
+    """
+    content = await file.read(settings.BOOKMARK_IMPORT_MAX_BYTES + 1)
+    if len(content) > settings.BOOKMARK_IMPORT_MAX_BYTES:
+        raise ValidationException("Bookmark file too large")
+    return await start_import(content, file.filename or "", enrich=enrich)
+
+
+@router.get("/import/{job_id}", response_model=AppImportJob)
+async def get_bookmark_import(job_id: str):
+    return get_import_job(job_id)
+
+
+@router.post("/mirror-icons")
+async def mirror_app_icons(service: AppService = Depends(get_service)):
+    rewritten = await service.mirror_icons()
+    return {"status": "success", "rewritten": rewritten}
+
+
 @router.put("/{app_id}", response_model=App)
 async def update_app(
     app_id: str, app_update: dict[str, Any], service: AppService = Depends(get_service)
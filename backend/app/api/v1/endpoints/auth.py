@@ -3,9 +3,12 @@ from datetime import timedelta
 from fastapi import APIRouter, Cookie, Depends, Request, Response
 from pydantic import BaseModel
 
+from app.api.deps import admin_claims
 from app.core import security
-from app.core.exceptions import AuthException
+from app.core.config import settings
+from app.core.exceptions import AuthException, RateLimitException
 from app.services.auth_service import AuthService
+from app.services.login_limiter import client_ip, login_limiter
 
 router = APIRouter()
 
@@ -28,22 +31,39 @@ def get_service():
     return AuthService()
 
 
+def limit_password_attempts(request: Request) -> str:
+    """Rejects clients over their attempt budget before any password is hashed."""
+    client = client_ip(request)
+    if settings.AUTH_RATE_LIMIT_ENABLED:
+        retry_after = login_limiter.acquire(client)
+        if retry_after is not None:
+            raise RateLimitException(retry_after)
+    return client
+
+
+async def _check_attempt(service: AuthService, password: str, client: str) -> bool:
+    valid = await service.verify_password(password)
+    if settings.AUTH_RATE_LIMIT_ENABLED:
+        if valid:
+            login_limiter.record_success(client)
+        else:
+            login_limiter.record_failure(client)
+    return valid
+
+
 @router.get("/status", response_model=AuthStatus)
 async def get_status(
     service: AuthService = Depends(get_service), access_token: str | None = Cookie(None)
 ):
-    is_authenticated = False
-    if access_token:
-        payload = security.verify_token(access_token)
-        if payload and payload.get("sub") == "admin":
-            is_authenticated = True
-
-    return {"is_setup": service.is_setup(), "is_authenticated": is_authenticated}
+    return {
+        "is_setup": service.is_setup(),
+        "is_authenticated": admin_claims(access_token) is not None,
+    }
 
 
 @router.post("/setup")
 async def setup_auth(req: SetupRequest, service: AuthService = Depends(get_service)):
-    service.setup_password(req.password)
+    await service.setup_password(req.password)
     return {"status": "success"}
 
 
@@ -72,8 +92,9 @@ async def login(
     response: Response,
     request: Request,
     service: AuthService = Depends(get_service),
+    client: str = Depends(limit_password_attempts),
 ):
-    if not service.verify_password(req.password):
+    if not await _check_attempt(service, req.password, client):
         raise AuthException("Invalid password")
 
     is_secure = request.url.scheme == "https"
@@ -87,8 +108,9 @@ async def verify(
     response: Response,
     request: Request,
     service: AuthService = Depends(get_service),
+    client: str = Depends(limit_password_attempts),
 ):
-    if not service.verify_password(req.password):
+    if not await _check_attempt(service, req.password, client):
         raise AuthException("Invalid password")
 
     is_secure = request.url.scheme == "https"
@@ -109,7 +131,11 @@ class ChangePasswordRequest(BaseModel):
 
 @router.post("/change-password")
 async def change_password(
-    req: ChangePasswordRequest, service: AuthService = Depends(get_service)
+    req: ChangePasswordRequest,
+    service: AuthService = Depends(get_service),
+    client: str = Depends(limit_password_attempts),
 ):
-    service.change_password(req.old_password, req.new_password)
+    if not await _check_attempt(service, req.old_password, client):
+        raise AuthException("Invalid old password")
+    await service.set_password(req.new_password)
     return {"status": "success"}
@@ -1,10 +1,14 @@
 import os
-import shutil
+from typing import Literal
 
-from fastapi import APIRouter, File, HTTPException, UploadFile
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import FileResponse, JSONResponse
+from starlette.requests import ClientDisconnect
 
 from app.core.config import settings
+from app.schemas.media import MediaItem, MediaPage
+from app.services.media_library import blob_name, media_library, media_type
+from app.services.media_service import UploadError, receive_upload
 
 router = APIRouter()
 
@@ -12,103 +16,198 @@ UPLOAD_DIR = settings.UPLOAD_DIR
 # Ensure directory exists
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
-ALLOWED_EXTENSIONS = {
-    "image": {".jpg", ".jpeg", ".png", ".gif", ".webp"},
-    "video": {".mp4", ".webm", ".mov"},
-}
 
-MAX_FILE_SIZE = 10 * 1024 * 1024  # 10 MB
-
-
-@router.post("/upload")
-async def upload_file(file: UploadFile = File(...)):
-    # Validate file extension
-    filename = file.filename or "unknown"
-    ext = os.path.splitext(filename)[1].lower()
-    file_type = None
-
-    if ext in ALLOWED_EXTENSIONS["image"]:
-        file_type = "image"
-    elif ext in ALLOWED_EXTENSIONS["video"]:
-        file_type = "video"
-
-    if not file_type:
-        raise HTTPException(status_code=400, detail="File type not allowed")
-
-    # Validate file size (approximation, as we stream)
-    # Ideally we'd check content-length header or count bytes while reading
-
-    file_path = os.path.join(UPLOAD_DIR, filename)
-
-    # Save file
+def _validate_upload_name(filename: str) -> None:
+    if not filename or filename.startswith("."):
+        raise UploadError(400, "Invalid filename")
+    if not media_type(filename):
+        raise UploadError(400, "File type not allowed")
+
+
+@router.post(
+    "/upload",
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "multipart/form-data": {
+                    "schema": {
+                        "type": "object",
+                        "properties": {"file": {"type": "string", "format": "binary"}},
+                        "required": ["file"],
+                    }
+                }
+            },
+        }
+    },
+)
+async def upload_file(request: Request):
+    """
+    Upload an image or video.
+
+    The body is streamed to disk in chunks (never buffered in memory or written on the
+    event loop) and rejected as soon as it exceeds MEDIA_MAX_UPLOAD_BYTES. Files are
+    stored by content hash, so re-uploading identical content is deduplicated and the
+    returned URL can be cached forever.
+    """
     try:
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-
-        # Check size after save (simple approach) or during chunks
-        if os.path.getsize(file_path) > MAX_FILE_SIZE:
-            os.remove(file_path)
-            raise HTTPException(status_code=400, detail="File too large (max 10MB)")
-
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e)) from e
+        stored = await receive_upload(
+            request,
+            media_library.media_dir,
+            settings.MEDIA_MAX_UPLOAD_BYTES,
+            _validate_upload_name,
+            name_for=blob_name,
+        )
+    except UploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail) from e
+    except ClientDisconnect as e:
+        raise HTTPException(status_code=400, detail="Upload aborted") from e
+
+    file_type = media_type(stored.filename)
+    name = media_library.unique_name(stored.filename, stored.sha256)
+    # Derivatives (image width variants, video transcodes) are rendered in the background
+    entry = await media_library.register(
+        name,
+        file_type or "image",
+        stored.size,
+        stored.sha256,
+        path=f"media/{os.path.basename(stored.path)}",
+    )
 
     # Return URL (relative to backend host)
     return JSONResponse(
         {
-            "filename": filename,
-            "url": f"uploads/{filename}",
+            "filename": name,
+            "url": entry["url"],
             "type": file_type,
+            "size": stored.size,
+            "sha256": stored.sha256,
         }
     )
 
 
-@router.get("")
-async def list_media():
-    """List all uploaded media files."""
-    files = []
+@router.get("", response_model=MediaPage)
+async def list_media(
+    cursor: str | None = None,
+    limit: int = Query(50, ge=1, le=500),
+    type: Literal["image", "video"] | None = None,
+    sort: str = Query("name", pattern=r"^-?(name|mtime|size)$"),
+):
+    """
+    List uploaded media from the media index, one page at a time.
+
+    `sort` is `name`, `mtime` or `size` (prefix `-` for descending); pass the returned
+    `next_cursor` as `cursor` to fetch the following page.
+    """
+    await media_library.ensure_reconciled()
     try:
-        if not os.path.exists(UPLOAD_DIR):
-            return []
-
-        for filename in os.listdir(UPLOAD_DIR):
-            file_path = os.path.join(UPLOAD_DIR, filename)
-            if not os.path.isfile(file_path):
-                continue
-
-            ext = os.path.splitext(filename)[1].lower()
-            file_type = None
-            if ext in ALLOWED_EXTENSIONS["image"]:
-                file_type = "image"
-            elif ext in ALLOWED_EXTENSIONS["video"]:
-                file_type = "video"
-
-            if file_type:
-                files.append(
-                    {"name": filename, "url": f"uploads/{filename}", "type": file_type}
-                )
-
-        # Sort by name or modification time if needed, for now just name
-        files.sort(key=lambda x: x["name"])
-        return files
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e)) from e
-
+        page = media_library.page(cursor=cursor, limit=limit, file_type=type, sort=sort)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+    return MediaPage(
+        items=[
+            MediaItem(
+                name=entry["filename"],
+                url=entry["url"],
+                type=entry["type"],
+                size=entry.get("size"),
+                mtime=entry.get("mtime"),
+                sha256=entry.get("sha256"),
+                width=entry.get("width"),
+                height=entry.get("height"),
+                duration=entry.get("duration"),
+                placeholder=entry.get("placeholder"),
+                color=entry.get("color"),
+                poster=entry.get("poster"),
+                derivatives_status=entry["derivatives"]["status"],
+                derivatives=len(entry["derivatives"]["items"]),
+            )
+            for entry in page["items"]
+        ],
+        next_cursor=page["next_cursor"],
+        total=page["total"],
+    )
 
-@router.delete("/{filename}")
-async def delete_media(filename: str):
-    """Delete a specific media file."""
-    file_path = os.path.join(UPLOAD_DIR, filename)
 
+def _check_filename(filename: str) -> None:
     # Security check: ensure filename doesn't contain path traversal
     if ".." in filename or "/" in filename:
         raise HTTPException(status_code=400, detail="Invalid filename")
 
-    if not os.path.exists(file_path):
+
+async def _get_entry(filename: str) -> dict:
+    _check_filename(filename)
+    file_type = media_type(filename)
+    entry = await media_library.ensure(filename, file_type) if file_type else None
+    if entry is None:
+        raise HTTPException(status_code=404, detail="File not found")
+    return entry
+
+
+@router.get("/{filename}/variants")
+async def get_media_variants(filename: str):
+    """Srcset-ready manifest of the responsive variants of an uploaded image."""
+    return media_library.manifest(await _get_entry(filename))
+
+
+@router.get("/{filename}/status")
+async def get_media_status(filename: str):
+    """Processing state of derivatives / video transcoding, with progress while running."""
+    entry = await _get_entry(filename)
+    return {
+        "filename": entry["filename"],
+        "type": entry["type"],
+        "status": entry["derivatives"]["status"],
+        "progress": media_library.progress(entry["filename"]),
+        "poster": entry.get("poster"),
+    }
+
+
+@router.get("/{filename}/best")
+async def get_best_variant(
+    filename: str,
+    request: Request,
+    w: int | None = Query(None, ge=1, le=10000, description="Rendered width in px"),
+):
+    """
+    Serves the smallest variant covering the requested width in the best format the
+    client accepts (AVIF > WebP), falling back to the original file.
+    """
+    entry = await _get_entry(filename)
+    width_hint = request.headers.get("sec-ch-width") or request.headers.get("width")
+    if w is None and width_hint and width_hint.isdigit():
+        w = int(width_hint)
+
+    headers = {
+        "Vary": "Accept, Sec-CH-Width, Width",
+        "Cache-Control": "public, max-age=3600",
+    }
+    variant = media_library.best_variant(entry, request.headers.get("accept", ""), w)
+    if variant is not None:
+        path = media_library.variant_path(variant)
+        if os.path.isfile(path):
+            return FileResponse(
+                path, media_type=f"image/{variant['format']}", headers=headers
+            )
+    return FileResponse(media_library.file_path(entry), headers=headers)
+
+
+@router.delete("/{filename}")
+async def delete_media(filename: str):
+    """
+    Delete a specific media file. Stored content is removed once no other name
+    references it.
+    """
+    file_path = os.path.join(UPLOAD_DIR, filename)
+    _check_filename(filename)
+
+    if media_library.get(filename) is None and not os.path.exists(file_path):
         raise HTTPException(status_code=404, detail="File not found")
 
     try:
-        os.remove(file_path)
+        if not await media_library.remove(filename):
+            os.remove(file_path)
         return {"status": "success", "message": f"Deleted {filename}"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e)) from e
@@ -1,3 +1,4 @@
+import asyncio
 import contextlib
 import io
 import json
@@ -8,7 +9,7 @@ from typing import Any
 
 import httpx
 import structlog
-from fastapi import APIRouter, File, HTTPException, UploadFile
+from fastapi import APIRouter, Body, File, HTTPException, UploadFile
 
 from app.repositories.repos import MonitoringRepository
 from app.schemas.monitoring import (
@@ -16,16 +17,21 @@ from app.schemas.monitoring import (
     MonitoringConfig,
     MonitoringEntity,
     MonitoringProviderConfig,
+    MonitoringViewerPayload,
     MonitoringZone,
     VarcoManifestImportPayload,
 )
 from app.services.log_service import add_system_log
+from app.services.monitoring_ingest import ingest_entities
+from app.services.monitoring_sessions import monitoring_sessions
+from app.services.scheduler import scheduler
 from app.services.varco_collector import (
+    VARCO_COLLECTOR_JOB,
     _fetch_varco_data,
     _parse_url_params,
     _query_sidecar_telemetry,
-    touch_monitoring_active,
 )
+from app.services.varco_parser import iter_share_sections, split_state_text
 
 logger = structlog.get_logger()
 router = APIRouter()
@@ -128,38 +134,51 @@ async def get_monitoring_telemetry() -> dict[str, Any]:
 
 @router.post("/telemetry")
 async def update_monitoring_telemetry(payload: dict[str, Any]) -> dict[str, Any]:
-    repo = MonitoringRepository()
     incoming_entities = payload.get("entities", [])
+    if not isinstance(incoming_entities, list):
+        incoming_entities = []
 
+    _, total = await ingest_entities(incoming_entities)
     if incoming_entities:
-        async with repo.lock:
-            config = await repo.get_config()
-            ent_map = {e.id: e for e in config.entities}
-            for ie in incoming_entities:
-                if isinstance(ie, dict) and "id" in ie:
-                    with contextlib.suppress(Exception):
-                        ent_map[ie["id"]] = MonitoringEntity(**ie)
-            config.entities = list(ent_map.values())
-            await repo.save_config(config)
-
         add_system_log(
             "INFO",
             f"Varco Browser Relay synced {len(incoming_entities)} entities to server",
             {"count": len(incoming_entities)},
         )
-    else:
-        async with repo.lock:
-            config = await repo.get_config()
 
-    return {"status": "ok", "count": len(config.entities)}
+    return {"status": "ok", "count": total}
 
 
 @router.post("/active")
-async def ping_monitoring_active() -> dict[str, str]:
-    touch_monitoring_active()
+async def ping_monitoring_active(
+    payload: MonitoringViewerPayload | None = Body(None),
+) -> dict[str, str]:
+    """
+    Heartbeat of an open monitoring overlay. Clients report the zones and cards they
+    show so the collector only fetches those entities; a ping without a body keeps
+    full collection running.
+    """
+    if payload is None:
+        changed = monitoring_sessions.touch()
+    else:
+        changed = monitoring_sessions.touch(
+            payload.client_id,
+            zone_ids=payload.zone_ids,
+            card_ids=payload.card_ids,
+            interval_seconds=payload.interval_seconds,
+        )
+    if changed:
+        # Newly shown entities should not wait for backed-off polls to come due
+        scheduler.trigger(VARCO_COLLECTOR_JOB)
     return {"status": "active"}
 
 
+@router.delete("/active/{client_id}")
+async def end_monitoring_session(client_id: str) -> dict[str, str]:
+    monitoring_sessions.end(client_id)
+    return {"status": "inactive"}
+
+
 def _parse_varco_manifest_and_brief(
     manifest_data: dict[str, Any] | list[Any] | None,
     brief_text: str | None,
@@ -590,38 +609,22 @@ async def import_url(payload: VarcoManifestImportPayload) -> MonitoringConfig:
 
             ct = resp.headers.get("content-type", "").lower()
             body_str = resp.text
-            section_pattern = r'<section[^>]*data-entity="([^"]+)"[^>]*>(.*?)</section>'
-            sections = re.findall(section_pattern, body_str, re.DOTALL)
+            records = await asyncio.to_thread(
+                lambda: list(iter_share_sections(body_str))
+            )
 
-            if sections:
+            if records:
                 extracted_entities = []
-                for ent_id, sec_body in sections:
-                    ent_id = ent_id.strip()
-                    st_match = re.search(
-                        r'class="varco-card__state">([^<]+)</span>', sec_body
+                for record in records:
+                    val, unit = split_state_text(record.state)
+                    extracted_entities.append(
+                        {
+                            **record.as_entity(),
+                            "state": val,
+                            "unit": record.unit or unit,
+                        }
                     )
-                    if st_match:
-                        raw_st = st_match.group(1).strip()
-                        parts = raw_st.split()
-                        val: Any = parts[0] if parts else raw_st
-                        unit = parts[1] if len(parts) > 1 else None
-                        with contextlib.suppress(ValueError):
-                            val = float(val)
-                        extracted_entities.append(
-                            {
-                                "id": ent_id,
-                                "name": ent_id.split(".")[-1].replace("_", " ").title(),
-                                "state": val,
-                                "unit": unit,
-                                "domain": (
-                                    "binary_sensor"
-                                    if ent_id.startswith("binary_sensor.")
-                                    else "sensor"
-                                ),
-                            }
-                        )
-                if extracted_entities:
-                    manifest_data = {"entities": extracted_entities}
+                manifest_data = {"entities": extracted_entities}
             elif "application/json" in ct:
                 try:
                     manifest_data = resp.json()
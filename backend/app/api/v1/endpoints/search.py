@@ -0,0 +1,40 @@
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Query
+
+from app.schemas.search import SearchResponse, SearchResult
+from app.services.search_index import SearchService
+
+router = APIRouter()
+
+
+def get_service():
+    return SearchService()
+
+
+@router.get("", response_model=SearchResponse)
+async def search(
+    q: str = Query(..., min_length=1, max_length=200, description="Search query"),
+    limit: int = Query(20, ge=1, le=100),
+    kind: list[Literal["premium", "app", "folder"]] | None = Query(None),
+    service: SearchService = Depends(get_service),
+):
+    """Searches the premium catalog (built-in and remote registries) and the user's apps."""
+    hits, total = await service.search(
+        q, limit=limit, kinds=set(kind) if kind else None
+    )
+    results = [
+        SearchResult(
+            id=doc.id.split(":", 1)[1],
+            kind=doc.kind,  # type: ignore[arg-type]
+            name=doc.name,
+            description=doc.description,
+            url=doc.url,
+            icon=doc.icon,
+            integration=doc.integration,
+            parent_id=doc.parent_id,
+            score=round(score, 3),
+        )
+        for doc, score in hits
+    ]
+    return SearchResponse(query=q, total=total, results=results)
@@ -1,31 +1,22 @@
 from typing import Any, Literal
 
-from fastapi import APIRouter, Cookie, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from pydantic import BaseModel
 
-from app.core import security
+from app.api.deps import require_admin
 from app.services.log_service import (
     clear_system_logs,
     get_system_log_level,
     get_system_logs,
     set_system_log_level,
 )
+from app.services.login_limiter import login_limiter
+from app.services.scheduler import scheduler
+from app.services.sidecar_supervisor import sidecar_supervisor
 
 router = APIRouter()
 
 
-def verify_admin_auth(access_token: str | None = Cookie(None)) -> None:
-    if not access_token:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated"
-        )
-    payload = security.verify_token(access_token)
-    if not payload or payload.get("sub") != "admin":
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token"
-        )
-
-
 class LogLevelPayload(BaseModel):
     level: str
 
@@ -36,7 +27,7 @@ async def get_logs(
         "DEBUG", description="Minimum log level"
     ),
     limit: int = Query(100, ge=1, le=500, description="Max entries to return"),
-    _: None = Depends(verify_admin_auth),
+    _: dict[str, Any] = Depends(require_admin),
 ) -> dict[str, Any]:
     logs = get_system_logs(min_level=min_level, limit=limit)
     return {
@@ -47,14 +38,14 @@ async def get_logs(
 
 
 @router.delete("/logs")
-async def clear_logs(_: None = Depends(verify_admin_auth)) -> dict[str, Any]:
+async def clear_logs(_: dict[str, Any] = Depends(require_admin)) -> dict[str, Any]:
     clear_system_logs()
     return {"status": "ok", "message": "Logs cleared"}
 
 
 @router.post("/logs/level")
 async def update_log_level(
-    payload: LogLevelPayload, _: None = Depends(verify_admin_auth)
+    payload: LogLevelPayload, _: dict[str, Any] = Depends(require_admin)
 ) -> dict[str, Any]:
     applied = set_system_log_level(payload.level)
     if not applied:
@@ -63,3 +54,25 @@ async def update_log_level(
             detail=f"Invalid log level: {payload.level}",
         )
     return {"status": "ok", "active_level": get_system_log_level()}
+
+
+@router.get("/auth/limiter")
+async def get_login_limiter_stats(
+    _: dict[str, Any] = Depends(require_admin),
+) -> dict[str, Any]:
+    return login_limiter.stats()
+
+
+@router.get("/jobs")
+async def get_scheduled_jobs(
+    _: dict[str, Any] = Depends(require_admin),
+) -> dict[str, Any]:
+    jobs = scheduler.status()
+    return {"total": len(jobs), "jobs": jobs}
+
+
+@router.get("/sidecar")
+async def get_sidecar_status(
+    _: dict[str, Any] = Depends(require_admin),
+) -> dict[str, Any]:
+    return sidecar_supervisor.status()
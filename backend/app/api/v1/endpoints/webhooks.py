@@ -1,42 +1,27 @@
+import datetime
 from typing import Any
 
 import structlog
-from fastapi import APIRouter, Header, Query, Request
-
-from app.core.exceptions import AuthException
-from app.repositories.repos import AppRepository, ConfigRepository
-from app.schemas.config import WidgetDefaults
+from fastapi import APIRouter, Header, Query, Request, Response, status
+
+from app.core.config import settings
+from app.core.exceptions import AuthException, ValidationException
+from app.services.log_service import add_system_log
+from app.services.monitoring_ingest import (
+    IngestError,
+    entity_update_from_state,
+    ingest_entities,
+    iter_json_items,
+    webhook_provider,
+)
+from app.services.webhook_queue import delivery_key, vacation_update, webhook_queue
+from app.services.webhook_secrets import webhook_secrets
 
 logger = structlog.get_logger()
 
 router = APIRouter()
 
 
-async def _get_valid_secrets() -> set[str]:
-    """Collect all valid vacation secrets from config defaults and apps."""
-    config_repo = ConfigRepository()
-    config = await config_repo.get_config()
-
-    app_repo = AppRepository()
-    apps = await app_repo.read_all()
-
-    valid_secrets = set()
-    if (
-        config.layoutConfig.widgetDefaults
-        and config.layoutConfig.widgetDefaults.vacationSecret
-    ):
-        valid_secrets.add(config.layoutConfig.widgetDefaults.vacationSecret)
-
-    for app in apps:
-        if app.api_config and isinstance(app.api_config, dict):
-            sec = app.api_config.get("vacationSecret")
-            enabled = app.api_config.get("webhookEnabled", True)
-            if sec and enabled:
-                valid_secrets.add(str(sec))
-
-    return valid_secrets
-
-
 def _extract_provided_secret(
     secret_token: str | None,
     secret: str | None,
@@ -64,12 +49,11 @@ async def verify_vacation_webhook(
     x_webhook_secret: str | None = Header(None, alias="X-Webhook-Secret"),
     authorization: str | None = Header(None, alias="Authorization"),
 ) -> dict[str, str]:
-    valid_secrets = await _get_valid_secrets()
     provided_secret = _extract_provided_secret(
         secret_token, secret, x_webhook_secret, authorization
     )
 
-    if not provided_secret or provided_secret not in valid_secrets:
+    if not await webhook_secrets.matches(provided_secret):
         raise AuthException("Invalid or missing webhook secret token")
 
     return {
@@ -82,17 +66,18 @@ async def verify_vacation_webhook(
 @router.post("/vacation/{secret_token}")
 async def receive_vacation_webhook(
     request: Request,
+    response: Response,
     secret_token: str | None = None,
     secret: str | None = Query(None),
     x_webhook_secret: str | None = Header(None, alias="X-Webhook-Secret"),
     authorization: str | None = Header(None, alias="Authorization"),
+    x_delivery_id: str | None = Header(None, alias="X-Delivery-Id"),
 ) -> dict[str, str]:
-    valid_secrets = await _get_valid_secrets()
     provided_secret = _extract_provided_secret(
         secret_token, secret, x_webhook_secret, authorization
     )
 
-    if not provided_secret or provided_secret not in valid_secrets:
+    if not await webhook_secrets.matches(provided_secret):
         logger.warning("Unauthorized vacation webhook attempt", provided="***")
         raise AuthException("Invalid or missing webhook secret token")
 
@@ -114,40 +99,8 @@ async def receive_vacation_webhook(
             "message": "Webhook ping received successfully",
         }
 
-    # Extract trip info from nested structures
-    trip_data = payload
-    for key in ("data", "trip", "vacation", "attributes", "payload"):
-        if isinstance(payload.get(key), dict):
-            trip_data = payload[key]
-            break
-
-    title = (
-        trip_data.get("name")
-        or trip_data.get("title")
-        or trip_data.get("trip_name")
-        or trip_data.get("destination")
-        or trip_data.get("summary")
-        or trip_data.get("text")
-        or "Nächster Urlaub"
-    )
-    target_date = (
-        trip_data.get("startDate")
-        or trip_data.get("date")
-        or trip_data.get("targetDate")
-        or trip_data.get("start_date")
-        or trip_data.get("start")
-        or trip_data.get("departure")
-        or trip_data.get("departureDate")
-        or trip_data.get("timestamp")
-    )
-    destination = (
-        trip_data.get("destination")
-        or trip_data.get("location")
-        or trip_data.get("city")
-        or trip_data.get("place")
-    )
-
-    if not target_date:
+    update = vacation_update(payload)
+    if update is None:
         # If payload seems to be a test/ping without date fields, respond gracefully
         logger.info(
             "Received vacation webhook without explicit target_date", payload=payload
@@ -157,22 +110,51 @@ async def receive_vacation_webhook(
             "message": "Webhook payload received (no target_date updated)",
         }
 
-    config_repo = ConfigRepository()
-    config = await config_repo.get_config()
-
-    if not config.layoutConfig.widgetDefaults:
-        config.layoutConfig.widgetDefaults = WidgetDefaults()
-
-    config.layoutConfig.widgetDefaults.vacationTitle = str(title)
-    config.layoutConfig.widgetDefaults.vacationDate = str(target_date)
-    if destination:
-        config.layoutConfig.widgetDefaults.vacationDestination = str(destination)
-
-    await config_repo.save_config(config)
-
-    logger.info("Vacation webhook updated successfully", title=title, date=target_date)
+    # Applied by the webhook worker; retries of the same delivery are dropped there
+    response.status_code = status.HTTP_202_ACCEPTED
+    if not webhook_queue.submit(delivery_key(payload, x_delivery_id), update):
+        return {"status": "accepted", "message": "Duplicate delivery ignored"}
+    return {"status": "accepted", "message": "Vacation payload queued for update"}
+
+
+@router.post("/entities/{secret_token}")
+async def receive_entity_states(secret_token: str, request: Request) -> dict[str, Any]:
+    """
+    Accepts a batch of Home Assistant-style entity states (`{entity_id, state,
+    attributes}`) as a JSON array, NDJSON or `{"entities": [...]}` from a monitoring
+    provider of type `webhook` whose `settings.secret` matches. Updates are applied
+    in batches of WEBHOOK_ENTITY_BATCH_SIZE while the body streams in.
+    """
+    provider = await webhook_provider(secret_token)
+    if provider is None:
+        logger.warning("Unauthorized entity webhook attempt", provided="***")
+        raise AuthException("Invalid or missing webhook secret token")
 
-    return {
-        "status": "success",
-        "message": "Vacation payload updated successfully",
-    }
+    ndjson = "ndjson" in request.headers.get("content-type", "")
+    now_iso = datetime.datetime.now(datetime.UTC).isoformat()
+    batch_size = max(1, settings.WEBHOOK_ENTITY_BATCH_SIZE)
+    batch: list[dict[str, Any]] = []
+    applied = 0
+    try:
+        async for item in iter_json_items(
+            request.stream(), settings.WEBHOOK_ENTITY_MAX_BYTES, ndjson=ndjson
+        ):
+            update = entity_update_from_state(item, provider.id, now_iso)
+            if update is not None:
+                batch.append(update)
+            if len(batch) >= batch_size:
+                applied += (await ingest_entities(batch, partial=True))[0]
+                batch = []
+    except IngestError as err:
+        # Batches applied before the malformed part are kept
+        raise ValidationException(str(err)) from err
+
+    batch_applied, total = await ingest_entities(batch, partial=True)
+    applied += batch_applied
+    if applied:
+        add_system_log(
+            "INFO",
+            f"Entity webhook '{provider.name}' pushed {applied} entities",
+            {"count": applied, "provider": provider.id},
+        )
+    return {"status": "ok", "accepted": applied, "count": total}
@@ -8,6 +8,7 @@ from app.api.v1.endpoints import (
     monitoring,
     proxy,
     registry,
+    search,
     system,
     webhooks,
 )
@@ -20,6 +21,7 @@ api_router.include_router(media.router, prefix="/media", tags=["media"])
 api_router.include_router(config.router, prefix="/config", tags=["config"])
 api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
 api_router.include_router(registry.router, prefix="/registry", tags=["registry"])
+api_router.include_router(search.router, prefix="/search", tags=["search"])
 api_router.include_router(proxy.router, prefix="/proxy", tags=["proxy"])
 api_router.include_router(webhooks.router, prefix="/webhooks", tags=["webhooks"])
 api_router.include_router(monitoring.router, prefix="/monitoring", tags=["monitoring"])
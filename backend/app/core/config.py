@@ -46,6 +46,82 @@ class Settings(BaseSettings):
     SECRET_KEY: str = "changeme"
     UPLOAD_DIR: str = "uploads"
     DATA_DIR: str = "data"
+    # Concurrent PBKDF2 password checks (each runs in a worker thread)
+    AUTH_HASH_CONCURRENCY: int = 2
+
+    # Password attempt limits (per client IP, checked before hashing)
+    AUTH_RATE_LIMIT_ENABLED: bool = True
+    AUTH_RATE_LIMIT_BURST: int = 5
+    AUTH_RATE_LIMIT_PER_MINUTE: float = 10.0
+    AUTH_RATE_LIMIT_MAX_CLIENTS: int = 10_000
+    AUTH_LOCKOUT_THRESHOLD: int = 5
+    AUTH_LOCKOUT_BASE_SECONDS: int = 30
+    AUTH_LOCKOUT_MAX_SECONDS: int = 60 * 60
+    # Proxies (IP addresses or CIDR networks, e.g. the nginx container's) whose
+    # X-Forwarded-For / X-Real-IP headers are used as the client address
+    AUTH_TRUSTED_PROXIES: list[str] = []
+
+    # Media uploads
+    MEDIA_MAX_UPLOAD_BYTES: int = 10 * 1024 * 1024
+    MEDIA_DERIVATIVE_WORKERS: int = 2
+    MEDIA_RECONCILE_INTERVAL_SECONDS: int = 15 * 60
+    # Video transcoding (poster, 720p, loop) runs only when ffmpeg is installed
+    MEDIA_TRANSCODE_ENABLED: bool = True
+    MEDIA_TRANSCODE_CONCURRENCY: int = 1
+    MEDIA_LOOP_MAX_SECONDS: int = 30
+    FFMPEG_PATH: str = "ffmpeg"
+    FFPROBE_PATH: str = "ffprobe"
+
+    # Inbound webhooks (processed by a background worker)
+    WEBHOOK_QUEUE_SIZE: int = 100
+    WEBHOOK_DEDUPE_WINDOW_SECONDS: float = 10 * 60
+    WEBHOOK_COALESCE_SECONDS: float = 0.5
+    # How long shutdown waits for acknowledged updates to be applied
+    WEBHOOK_DRAIN_TIMEOUT_SECONDS: float = 10.0
+    WEBHOOK_ENTITY_MAX_BYTES: int = 10 * 1024 * 1024
+    # Entity updates applied per monitoring.json write while a batch streams in
+    WEBHOOK_ENTITY_BATCH_SIZE: int = 500
+
+    # Monitoring viewers (clients ping /monitoring/active while the overlay is open)
+    MONITORING_SESSION_TTL_SECONDS: int = 45
+
+    # Adaptive monitoring polling: unchanged entities back off towards the maximum
+    MONITORING_ADAPTIVE_POLLING: bool = True
+    MONITORING_POLL_MAX_SECONDS: int = 15 * 60
+    MONITORING_POLL_BACKOFF_FACTOR: float = 2.0
+
+    # Varco sidecar channel (NDJSON over a Unix socket; empty = system temp dir)
+    VARCO_SIDECAR_SOCKET: str = ""
+    VARCO_SIDECAR_REQUEST_TIMEOUT_SECONDS: float = 3.0
+
+    # Varco sidecar supervisor
+    VARCO_SIDECAR_MAX_HEAP_MB: int = 192
+    VARCO_SIDECAR_MAX_RSS_MB: int = 384
+    VARCO_SIDECAR_READY_TIMEOUT_SECONDS: float = 15.0
+    VARCO_SIDECAR_RESTART_BASE_SECONDS: float = 2.0
+    VARCO_SIDECAR_RESTART_MAX_SECONDS: float = 5 * 60
+    # A sidecar running this long resets the restart backoff
+    VARCO_SIDECAR_STABLE_SECONDS: float = 60.0
+    VARCO_SIDECAR_LOG_LINES_PER_MINUTE: int = 120
+
+    # Page metadata / favicon cache
+    METADATA_CACHE_TTL_SECONDS: int = 7 * 24 * 60 * 60
+    METADATA_CACHE_NEGATIVE_TTL_SECONDS: int = 15 * 60
+    METADATA_CACHE_MAX_ENTRIES: int = 2000
+    METADATA_CACHE_SAVE_DELAY_SECONDS: float = 5.0
+
+    # Local icon mirror (UPLOAD_DIR/icons)
+    ICON_MIRROR_SIZE: int = 128
+    ICON_MIRROR_MAX_BYTES: int = 2 * 1024 * 1024
+    ICON_MIRROR_FAILURE_TTL_SECONDS: int = 60 * 60
+
+    # Bookmark import
+    BOOKMARK_IMPORT_CONCURRENCY: int = 8
+    BOOKMARK_IMPORT_MAX_BYTES: int = 20 * 1024 * 1024
+
+    # Remote premium app registries
+    REGISTRY_CACHE_TTL_SECONDS: int = 10 * 60
+    REGISTRY_FETCH_TIMEOUT_SECONDS: float = 10.0
 
     model_config = SettingsConfigDict(
         case_sensitive=True, env_file=".env", extra="ignore"
@@ -1,4 +1,11 @@
+import math
+
+from app.core.config import settings
+
+
 class BackendException(Exception):
+    headers: dict[str, str] | None = None
+
     def __init__(
         self, message: str, code: str = "INTERNAL_ERROR", status_code: int = 500
     ):
@@ -23,6 +30,11 @@ class AuthException(BackendException):
         super().__init__(detail, code="UNAUTHORIZED", status_code=401)
 
 
-class LockTimeoutException(BackendException):
-    def __init__(self, detail: str = "File lock acquisition timed out") -> None:
-        super().__init__(detail, code="LOCK_TIMEOUT", status_code=503)
+class RateLimitException(BackendException):
+    def __init__(
+        self, retry_after: float, detail: str = "Too many attempts, try again later"
+    ) -> None:
+        super().__init__(detail, code="RATE_LIMITED", status_code=429)
+        # The limiter reports math.inf when attempts are disabled outright
+        retry_after = min(retry_after, settings.AUTH_LOCKOUT_MAX_SECONDS)
+        self.headers = {"Retry-After": str(max(1, math.ceil(retry_after)))}
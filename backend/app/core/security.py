@@ -1,10 +1,15 @@
 import hashlib
+import hmac
 import json
 import os
 import secrets
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from typing import Any
 
+import anyio
 from jose import jwt
 
 from app.core.config import settings
@@ -12,6 +17,16 @@ from app.core.config import settings
 ALGORITHM = "HS256"
 PBKDF2_ITERATIONS = 100_000
 
+# Stored hash of security.json, keyed by the file's (mtime_ns, size)
+_hash_cache: tuple[tuple[int, int], str] | None = None
+_hash_cache_lock = threading.Lock()
+_hash_limiter: anyio.CapacityLimiter | None = None
+
+# Verified JWT payloads keyed by a digest of (secret, token), valid until their `exp`
+TOKEN_CACHE_SIZE = 256
+_token_cache: OrderedDict[bytes, tuple[float, dict[str, Any]]] = OrderedDict()
+_token_cache_lock = threading.Lock()
+
 
 def get_security_file_path() -> str:
     return os.path.join(settings.DATA_DIR, "security.json")
@@ -26,11 +41,35 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None) -> s
 
 
 def verify_token(token: str) -> dict[str, Any] | None:
+    """
+    Decodes and verifies `token`. Verified tokens are cached until they expire, so
+    polling clients do not pay for the signature check on every request.
+    """
+    key = hashlib.sha256(f"{settings.SECRET_KEY}\0{token}".encode()).digest()
+    now = time.time()
+    with _token_cache_lock:
+        cached = _token_cache.get(key)
+        if cached is not None:
+            if cached[0] > now:
+                _token_cache.move_to_end(key)
+                return dict(cached[1])
+            del _token_cache[key]
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
     except Exception:
         return None
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)) and exp > now:
+        with _token_cache_lock:
+            _token_cache[key] = (float(exp), payload)
+            while len(_token_cache) > TOKEN_CACHE_SIZE:
+                _token_cache.popitem(last=False)
+    return dict(payload)
+
+
+def clear_token_cache() -> None:
+    with _token_cache_lock:
+        _token_cache.clear()
 
 
 def get_password_hash(password: str, salt: str | None = None) -> str:
@@ -48,14 +87,16 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
         parts = hashed_password.split("$")
         if len(parts) == 3 and parts[0] == "pbkdf2":
             salt = parts[1]
-            return get_password_hash(plain_password, salt) == hashed_password
+            return hmac.compare_digest(
+                get_password_hash(plain_password, salt), hashed_password
+            )
         elif len(parts) == 2:
             # Fallback backward compatibility for legacy SHA256 hashes
             salt, hash_val = parts
             legacy_hash = hashlib.sha256(
                 (plain_password + salt).encode("utf-8")
             ).hexdigest()
-            return legacy_hash == hash_val
+            return hmac.compare_digest(legacy_hash, hash_val)
         return False
     except ValueError:
         return False
@@ -65,6 +106,50 @@ def is_setup() -> bool:
     return os.path.exists(get_security_file_path())
 
 
+def _hash_slots() -> anyio.CapacityLimiter:
+    global _hash_limiter
+    if _hash_limiter is None:
+        _hash_limiter = anyio.CapacityLimiter(max(1, settings.AUTH_HASH_CONCURRENCY))
+    return _hash_limiter
+
+
+def _file_key(path: str) -> tuple[int, int] | None:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def load_password_hash() -> str | None:
+    """
+    Returns the stored password hash, re-reading security.json only when it changed
+    (by mtime/size) since the last read.
+    """
+    global _hash_cache
+    sec_path = get_security_file_path()
+    key = _file_key(sec_path)
+    if key is None:
+        return None
+    cached = _hash_cache
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    try:
+        with open(sec_path, encoding="utf-8") as f:
+            hashed = json.load(f).get("hashed_password", "")
+    except Exception:
+        return None
+    with _hash_cache_lock:
+        _hash_cache = (key, hashed)
+    return hashed
+
+
+def invalidate_password_cache() -> None:
+    global _hash_cache
+    with _hash_cache_lock:
+        _hash_cache = None
+
+
 def setup_password(password: str):
     hashed = get_password_hash(password)
     sec_path = get_security_file_path()
@@ -73,15 +158,25 @@ def setup_password(password: str):
     with open(tmp_path, "w", encoding="utf-8") as f:
         json.dump({"hashed_password": hashed}, f, indent=2)
     os.replace(tmp_path, sec_path)
+    invalidate_password_cache()
 
 
 def check_password(password: str) -> bool:
-    sec_path = get_security_file_path()
-    if not is_setup():
-        return False
-    try:
-        with open(sec_path, encoding="utf-8") as f:
-            data = json.load(f)
-            return verify_password(password, data.get("hashed_password", ""))
-    except Exception:
+    hashed = load_password_hash()
+    if not hashed:
         return False
+    return verify_password(password, hashed)
+
+
+async def check_password_async(password: str) -> bool:
+    """
+    check_password off the event loop: PBKDF2 runs in a worker thread (hashlib releases
+    the GIL), at most AUTH_HASH_CONCURRENCY at a time.
+    """
+    return await anyio.to_thread.run_sync(
+        check_password, password, limiter=_hash_slots()
+    )
+
+
+async def setup_password_async(password: str) -> None:
+    await anyio.to_thread.run_sync(setup_password, password, limiter=_hash_slots())
@@ -0,0 +1,279 @@
+import mimetypes
+import os
+import re
+from email.utils import formatdate, parsedate_to_datetime
+
+import anyio
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# Precompressed siblings (`<file>.br`, `<file>.gz`) are looked up for these types
+PRECOMPRESSED_EXTENSIONS = {".svg", ".json", ".js", ".css", ".txt"}
+_ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+_CHUNK_SIZE = 256 * 1024
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+# Content-hashed file names (e.g. `<sha256>.webp`) double as strong validators
+_HASHED_NAME_RE = re.compile(r"^[0-9a-f]{32,64}$")
+
+_ZEROCOPY_EXTENSION = "http.response.zerocopysend"
+_PATHSEND_EXTENSION = "http.response.pathsend"
+
+
+def _accepted_encodings(header: str) -> set[str]:
+    accepted = set()
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        if params.strip().replace(" ", "") in ("q=0", "q=0.0", "q=0.00"):
+            continue
+        accepted.add(coding.strip().lower())
+    return accepted
+
+
+def _parse_range(header: str, size: int) -> tuple[int, int] | None:
+    """
+    Parses a single `bytes=` range into an inclusive (start, end) pair.
+
+    Returns None when the header should be ignored (malformed or multiple ranges, which
+    are answered with the full body) and raises ValueError if it is unsatisfiable.
+    """
+    match = _RANGE_RE.match(header.strip())
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        suffix = int(last)
+        if suffix == 0:
+            raise ValueError("empty suffix range")
+        return max(0, size - suffix), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or (last and int(last) < start):
+        raise ValueError("range not satisfiable")
+    return start, end
+
+
+class ConditionalFileResponse(Response):
+    """
+    File response with strong ETags, conditional requests (304), single byte ranges
+    (206/416, `If-Range`) and zero-copy transmission when the server supports the
+    ASGI `zerocopysend` / `pathsend` extensions.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        stat_result: os.stat_result,
+        etag: str,
+        media_type: str | None = None,
+        cache_control: str | None = None,
+        content_encoding: str | None = None,
+        vary: str | None = None,
+    ) -> None:
+        self.path = path
+        self.stat_result = stat_result
+        self.status_code = 200
+        self.media_type = None
+        self.background = None
+        self.body = b""
+        self.init_headers()
+        headers = self.headers
+        del headers["content-length"]
+        headers["etag"] = etag
+        headers["last-modified"] = formatdate(stat_result.st_mtime, usegmt=True)
+        headers["accept-ranges"] = "bytes"
+        if cache_control:
+            headers["cache-control"] = cache_control
+        if content_encoding:
+            headers["content-encoding"] = content_encoding
+        if vary:
+            headers["vary"] = vary
+        if media_type:
+            headers["content-type"] = media_type
+
+    def _not_modified(self, request_headers: Headers) -> bool:
+        if_none_match = request_headers.get("if-none-match")
+        if if_none_match is not None:
+            etag = self.headers["etag"]
+            tags = [t.strip().removeprefix("W/") for t in if_none_match.split(",")]
+            return "*" in tags or etag in tags
+        if_modified_since = request_headers.get("if-modified-since")
+        if if_modified_since:
+            try:
+                since = parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+            return int(self.stat_result.st_mtime) <= since
+        return False
+
+    def _requested_range(
+        self, request_headers: Headers
+    ) -> tuple[int, int] | None | ValueError:
+        range_header = request_headers.get("range")
+        if not range_header:
+            return None
+        if_range = request_headers.get("if-range")
+        if if_range and if_range.strip() not in (
+            self.headers["etag"],
+            self.headers["last-modified"],
+        ):
+            return None
+        try:
+            return _parse_range(range_header, self.stat_result.st_size)
+        except ValueError as err:
+            return err
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        request_headers = Headers(scope=scope)
+        size = self.stat_result.st_size
+
+        if self._not_modified(request_headers):
+            headers = MutableHeaders(raw=list(self.raw_headers))
+            for name in ("content-type", "content-encoding", "accept-ranges"):
+                # Only validators and caching headers are repeated on a 304
+                if name in headers:
+                    del headers[name]
+            await send(
+                {"type": "http.response.start", "status": 304, "headers": headers.raw}
+            )
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        requested = self._requested_range(request_headers)
+        if isinstance(requested, ValueError):
+            self.headers["content-range"] = f"bytes */{size}"
+            self.headers["content-length"] = "0"
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": 416,
+                    "headers": self.raw_headers,
+                }
+            )
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        status = 200
+        start, end = 0, size - 1
+        if requested is not None:
+            status = 206
+            start, end = requested
+            self.headers["content-range"] = f"bytes {start}-{end}/{size}"
+        count = max(0, end - start + 1)
+        self.headers["content-length"] = str(count)
+
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status,
+                "headers": self.raw_headers,
+            }
+        )
+        if scope["method"].upper() == "HEAD" or count == 0:
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        extensions = scope.get("extensions") or {}
+        if _PATHSEND_EXTENSION in extensions and status == 200:
+            await send({"type": _PATHSEND_EXTENSION, "path": self.path})
+            return
+        if _ZEROCOPY_EXTENSION in extensions:
+            with open(self.path, "rb") as file:
+                await send(
+                    {
+                        "type": _ZEROCOPY_EXTENSION,
+                        "file": file.fileno(),
+                        "offset": start,
+                        "count": count,
+                    }
+                )
+            return
+
+        async with await anyio.open_file(self.path, mode="rb") as file:
+            await file.seek(start)
+            remaining = count
+            while remaining > 0:
+                chunk = await file.read(min(_CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send(
+                    {
+                        "type": "http.response.body",
+                        "body": chunk,
+                        "more_body": remaining > 0,
+                    }
+                )
+        if remaining > 0:
+            # File shrank while sending; close the body instead of hanging the client
+            await send({"type": "http.response.body", "body": b""})
+
+
+class ConditionalStaticFiles(StaticFiles):
+    """
+    StaticFiles serving ConditionalFileResponse: byte ranges for seeking/looping media,
+    strong ETags with 304 revalidation and precompressed `.br`/`.gz` siblings.
+    """
+
+    cache_control: str | None = None
+
+    @staticmethod
+    def _etag(full_path: str, stat_result: os.stat_result, encoding: str | None) -> str:
+        stem = os.path.splitext(os.path.basename(full_path))[0]
+        tag = (
+            stem
+            if _HASHED_NAME_RE.match(stem)
+            else f"{stat_result.st_size:x}-{stat_result.st_mtime_ns:x}"
+        )
+        return f'"{tag}-{encoding}"' if encoding else f'"{tag}"'
+
+    def file_response(
+        self,
+        full_path: str,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        full_path = str(full_path)
+        media_type = mimetypes.guess_type(full_path)[0] or "application/octet-stream"
+        if media_type.startswith("text/") or media_type == "image/svg+xml":
+            media_type += "; charset=utf-8"
+
+        vary = None
+        encoding = None
+        serve_path, serve_stat = full_path, stat_result
+        if os.path.splitext(full_path)[1].lower() in PRECOMPRESSED_EXTENSIONS:
+            vary = "Accept-Encoding"
+            accepted = _accepted_encodings(
+                Headers(scope=scope).get("accept-encoding", "")
+            )
+            for coding, suffix in _ENCODINGS:
+                if coding not in accepted:
+                    continue
+                try:
+                    serve_stat = os.stat(full_path + suffix)
+                except OSError:
+                    continue
+                serve_path, encoding = full_path + suffix, coding
+                break
+
+        return ConditionalFileResponse(
+            serve_path,
+            serve_stat,
+            etag=self._etag(full_path, serve_stat, encoding),
+            media_type=media_type,
+            cache_control=self.cache_control,
+            content_encoding=encoding,
+            vary=vary,
+        )
+
+
+class ImmutableStaticFiles(ConditionalStaticFiles):
+    """StaticFiles for content-hashed assets: a URL never changes content, so clients may cache forever."""
+
+    cache_control = IMMUTABLE_CACHE_CONTROL
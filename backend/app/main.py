@@ -1,3 +1,4 @@
+import asyncio
 import os
 from collections.abc import AsyncGenerator
 from contextlib import asynccontextmanager
@@ -8,13 +9,30 @@ import tomllib
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
-from fastapi.staticfiles import StaticFiles
 
 from app.api.v1.router import api_router
 from app.core.config import settings
 from app.core.exceptions import BackendException
+from app.core.premium_apps import AppRegistry
+from app.core.static_files import ConditionalStaticFiles, ImmutableStaticFiles
 from app.services.config_service import ConfigService
-from app.services.varco_collector import start_varco_collector, stop_varco_collector
+from app.services.icon_mirror import ICON_DIR, icon_mirror
+from app.services.media_library import (
+    DERIVATIVE_DIR,
+    MEDIA_DIR,
+    media_library,
+    run_media_reconcile,
+    shutdown_media_workers,
+)
+from app.services.metadata_cache import metadata_cache
+from app.services.scheduler import scheduler
+from app.services.sidecar_supervisor import sidecar_supervisor
+from app.services.varco_collector import (
+    INACTIVE_RECHECK_SECONDS,
+    VARCO_COLLECTOR_JOB,
+    collect_varco_telemetry,
+)
+from app.services.webhook_queue import webhook_queue
 
 logger = structlog.get_logger()
 
@@ -80,12 +98,33 @@ def get_project_version() -> str:
 async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     logger.info("Startup: Initializing ER-Startseite Backend")
     get_project_version()
-    start_varco_collector()
+    scheduler.add_job(
+        VARCO_COLLECTOR_JOB,
+        collect_varco_telemetry,
+        interval=INACTIVE_RECHECK_SECONDS,
+        retry_delay=15,
+    )
+    scheduler.add_job(
+        "media-reconcile",
+        run_media_reconcile,
+        interval=settings.MEDIA_RECONCILE_INTERVAL_SECONDS,
+    )
+    scheduler.start()
+    # Mirror built-in premium icons in the background so the catalog can serve local copies
+    icon_warmup = asyncio.create_task(
+        icon_mirror.warm([app.default_icon for app in AppRegistry.get_all()])
+    )
     try:
         yield
     finally:
         logger.info("Shutdown: cleaning up resources")
-        await stop_varco_collector()
+        icon_warmup.cancel()
+        await scheduler.stop()
+        await sidecar_supervisor.stop()
+        await media_library.stop()
+        shutdown_media_workers()
+        await webhook_queue.stop()
+        await metadata_cache.flush()
 
 
 app = FastAPI(
@@ -100,6 +139,7 @@ async def backend_exception_handler(request: Request, exc: BackendException):
     return JSONResponse(
         status_code=exc.status_code,
         content={"success": False, "error_code": exc.code, "message": exc.message},
+        headers=exc.headers,
     )
 
 
@@ -131,8 +171,19 @@ if settings.BACKEND_CORS_ORIGINS:
 
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
-# Mount uploads directory
-app.mount("/uploads", StaticFiles(directory=settings.UPLOAD_DIR), name="uploads")
+# Mount uploads directory (content-hashed assets first, they may be cached forever)
+# Created here rather than on import of the mirror; StaticFiles needs it to exist
+os.makedirs(ICON_DIR, exist_ok=True)
+app.mount("/uploads/icons", ImmutableStaticFiles(directory=ICON_DIR), name="icons")
+app.mount("/uploads/media", ImmutableStaticFiles(directory=MEDIA_DIR), name="media")
+app.mount(
+    "/uploads/derivatives",
+    ImmutableStaticFiles(directory=DERIVATIVE_DIR),
+    name="derivatives",
+)
+app.mount(
+    "/uploads", ConditionalStaticFiles(directory=settings.UPLOAD_DIR), name="uploads"
+)
 
 
 @app.get("/health")
@@ -1,3 +1,4 @@
+import asyncio
 import json
 from typing import Generic, TypeVar
 
@@ -6,12 +7,34 @@ from pydantic import BaseModel, parse_obj_as
 
 T = TypeVar("T", bound=BaseModel)
 
+# Save counter per file, lets in-memory derived data (e.g. search index) detect changes
+_generations: dict[str, int] = {}
+# One read-modify-write lock per file, shared by every repository instance
+_locks: dict[str, asyncio.Lock] = {}
+
+
+def file_generation(file_path: str) -> int:
+    return _generations.get(str(file_path), 0)
+
+
+def bump_generation(file_path: str) -> None:
+    _generations[str(file_path)] = file_generation(file_path) + 1
+
 
 class JsonRepository(Generic[T]):
     def __init__(self, file_path: str, model: type[T]):
         self.file_path = Path(file_path)
         self.model = model
 
+    @property
+    def generation(self) -> int:
+        return file_generation(str(self.file_path))
+
+    @property
+    def lock(self) -> asyncio.Lock:
+        """Held around read-modify-write cycles of this file."""
+        return _locks.setdefault(str(self.file_path), asyncio.Lock())
+
     async def _ensure_dir(self):
         parent = self.file_path.parent
         if not await parent.exists():
@@ -59,32 +82,39 @@ class JsonRepository(Generic[T]):
                 )
 
         await tmp_path.rename(self.file_path)
+        bump_generation(str(self.file_path))
 
     async def add(self, item: T) -> list[T]:
-        items = await self.read_all()
-        items.append(item)
-        await self.save_all(items)
-        return items
+        return await self.extend([item])
 
-    async def delete(self, item_id: str, id_field: str = "id") -> bool:
-        items = await self.read_all()
-        initial_len = len(items)
-        items = [i for i in items if getattr(i, id_field) != item_id]
-        if len(items) < initial_len:
+    async def extend(self, new_items: list[T]) -> list[T]:
+        async with self.lock:
+            items = await self.read_all()
+            items.extend(new_items)
             await self.save_all(items)
-            return True
-        return False
+            return items
+
+    async def delete(self, item_id: str, id_field: str = "id") -> bool:
+        async with self.lock:
+            items = await self.read_all()
+            initial_len = len(items)
+            items = [i for i in items if getattr(i, id_field) != item_id]
+            if len(items) < initial_len:
+                await self.save_all(items)
+                return True
+            return False
 
     async def update(
         self, item_id: str, update_data: dict, id_field: str = "id"
     ) -> T | None:
-        items = await self.read_all()
-        for i, item in enumerate(items):
-            if getattr(item, id_field) == item_id:
-                curr_data = item.model_dump(mode="json")
-                curr_data.update(update_data)
-                new_item = self.model(**curr_data)
-                items[i] = new_item
-                await self.save_all(items)
-                return new_item
-        return None
+        async with self.lock:
+            items = await self.read_all()
+            for i, item in enumerate(items):
+                if getattr(item, id_field) == item_id:
+                    curr_data = item.model_dump(mode="json")
+                    curr_data.update(update_data)
+                    new_item = self.model(**curr_data)
+                    items[i] = new_item
+                    await self.save_all(items)
+                    return new_item
+            return None
@@ -1,17 +1,13 @@
 import asyncio
-import contextlib
-import datetime
-import fcntl
 import os
-from collections.abc import AsyncIterator
+from collections.abc import Callable
 from typing import TYPE_CHECKING
 
 import structlog
 from anyio import Path
 
 from app.core.config import settings
-from app.core.exceptions import LockTimeoutException
-from app.repositories.base import JsonRepository
+from app.repositories.base import JsonRepository, bump_generation, file_generation
 from app.schemas.app import App
 from app.schemas.config import (
     AppConfig,
@@ -35,36 +31,37 @@ class AppRepository(JsonRepository[App]):
     async def update(
         self, item_id: str, update_data: dict, id_field: str = "id"
     ) -> App | None:
-        items = await self.read_all()
-        updated_item = None
-
-        # Recursive function to find and update
-        def update_recursive(app_list):
-            nonlocal updated_item
-            for i, app in enumerate(app_list):
-                if getattr(app, id_field) == item_id:
-                    # Found it! Update logic similar to Base Repo
-                    curr_data = app.model_dump(mode="json")
-                    curr_data.update(update_data)
-                    new_app = self.model(**curr_data)
-                    app_list[i] = new_app
-                    updated_item = new_app
-                    return True
-
-                # Check contents if folder
-                if (
-                    app.type == "folder"
-                    and app.contents
-                    and update_recursive(app.contents)
-                ):
-                    return True
-            return False
-
-        if update_recursive(items):
-            await self.save_all(items)
-            return updated_item
-
-        return None
+        async with self.lock:
+            items = await self.read_all()
+            updated_item = None
+
+            # Recursive function to find and update
+            def update_recursive(app_list):
+                nonlocal updated_item
+                for i, app in enumerate(app_list):
+                    if getattr(app, id_field) == item_id:
+                        # Found it! Update logic similar to Base Repo
+                        curr_data = app.model_dump(mode="json")
+                        curr_data.update(update_data)
+                        new_app = self.model(**curr_data)
+                        app_list[i] = new_app
+                        updated_item = new_app
+                        return True
+
+                    # Check contents if folder
+                    if (
+                        app.type == "folder"
+                        and app.contents
+                        and update_recursive(app.contents)
+                    ):
+                        return True
+                return False
+
+            if update_recursive(items):
+                await self.save_all(items)
+                return updated_item
+
+            return None
 
 
 # Config Repo manages a SINGLE Config Object (stored as a JSON object, not list)
@@ -72,6 +69,14 @@ class ConfigRepository:
     def __init__(self):
         self._file_path = Path(os.path.join(settings.DATA_DIR, "config.json"))
 
+    @property
+    def file_path(self) -> Path:
+        return self._file_path
+
+    @property
+    def generation(self) -> int:
+        return file_generation(str(self._file_path))
+
     async def _ensure_dir(self):
         parent = self._file_path.parent
         if not await parent.exists():
@@ -124,6 +129,7 @@ class ConfigRepository:
                 print(f"WARNING: Failed creating config backup: {e}", flush=True)
 
         await tmp_path.rename(self._file_path)
+        bump_generation(str(self._file_path))
 
     def _get_default(self) -> AppConfig:
         from app.core.constants import (
@@ -142,7 +148,11 @@ class ConfigRepository:
 
 
 class MonitoringRepository:
+    # Held by callers for read-modify-write cycles
     _lock = asyncio.Lock()
+    _write_lock = asyncio.Lock()
+    # Called with every saved config (e.g. to push settings to the Varco sidecar)
+    _save_listeners: list[Callable[["MonitoringConfig"], None]] = []
 
     def __init__(self) -> None:
         self._file_path = Path(os.path.join(settings.DATA_DIR, "monitoring.json"))
@@ -151,65 +161,18 @@ class MonitoringRepository:
     def lock(self) -> asyncio.Lock:
         return self._lock
 
-    @contextlib.asynccontextmanager
-    async def _acquire_file_lock(self) -> AsyncIterator[None]:
-        lock_file = Path(os.path.join(settings.DATA_DIR, "monitoring.json.lock"))
-        await lock_file.parent.mkdir(parents=True, exist_ok=True)
-        acquired = False
-        fd: int | None = None
-        start_time = datetime.datetime.now(datetime.timezone.utc)
-
-        try:
-            fd = os.open(str(lock_file), os.O_RDWR | os.O_CREAT, 0o666)
-            while not acquired:
-                try:
-                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
-                    acquired = True
-                except OSError as lock_err:
-                    await asyncio.sleep(0.02)
-                    if (
-                        datetime.datetime.now(datetime.timezone.utc) - start_time
-                    ).total_seconds() > 5.0:
-                        logger.warning(
-                            "MonitoringRepository file lock acquisition timed out",
-                            exc_info=True,
-                            error=str(lock_err),
-                        )
-                        break
-
-            if acquired:
-                yield
-            else:
-                raise LockTimeoutException(
-                    "MonitoringRepository file lock acquisition timed out after 5.0s"
-                )
-        except Exception as err:
-            if not isinstance(err, LockTimeoutException):
-                logger.debug(
-                    "MonitoringRepository file lock operation failed",
-                    exc_info=True,
-                    error=str(err),
-                )
-            raise
-        finally:
-            if fd is not None:
-                if acquired:
-                    try:
-                        fcntl.flock(fd, fcntl.LOCK_UN)
-                    except Exception as unlock_err:
-                        logger.debug(
-                            "Failed to release file lock",
-                            exc_info=True,
-                            error=str(unlock_err),
-                        )
-                try:
-                    os.close(fd)
-                except Exception as close_err:
-                    logger.debug(
-                        "Failed to close lock file descriptor",
-                        exc_info=True,
-                        error=str(close_err),
-                    )
+    @property
+    def file_path(self) -> Path:
+        return self._file_path
+
+    @property
+    def generation(self) -> int:
+        return file_generation(str(self._file_path))
+
+    @classmethod
+    def add_save_listener(cls, listener: Callable[["MonitoringConfig"], None]) -> None:
+        if listener not in cls._save_listeners:
+            cls._save_listeners.append(listener)
 
     async def _ensure_dir(self) -> None:
         parent = self._file_path.parent
@@ -221,32 +184,42 @@ class MonitoringRepository:
 
         await self._ensure_dir()
 
-        try:
-            async with self._acquire_file_lock():
-                if await self._file_path.exists():
-                    try:
-                        content = await self._file_path.read_text(encoding="utf-8")
-                        return MonitoringConfig.model_validate_json(content)
-                    except Exception as err:
-                        logger.debug(
-                            "Failed to read/validate monitoring.json",
-                            exc_info=True,
-                            error=str(err),
-                        )
-        except LockTimeoutException as lock_err:
-            logger.warning(
-                "get_config lock acquisition timed out; returning default config",
-                exc_info=True,
-                error=str(lock_err),
-            )
+        # Saves replace the file atomically, so reads never see a partial write
+        if await self._file_path.exists():
+            try:
+                content = await self._file_path.read_text(encoding="utf-8")
+                return MonitoringConfig.model_validate_json(content)
+            except Exception as err:
+                logger.warning(
+                    "Failed to read/validate monitoring.json; using defaults",
+                    exc_info=True,
+                    error=str(err),
+                )
 
         return self._get_default()
 
     async def save_config(self, config: "MonitoringConfig") -> None:
+        """
+        Writes monitoring.json. The backend is its only writer (the Varco sidecar
+        persists its identity through the sidecar channel), so an in-process lock
+        replaces cross-process file locking.
+        """
         await self._ensure_dir()
-        async with self._acquire_file_lock():
-            content = config.model_dump_json(indent=2)
-            await self._file_path.write_text(content, encoding="utf-8")
+        content = config.model_dump_json(indent=2)
+        tmp_path = Path(f"{self._file_path}.tmp")
+        async with self._write_lock:
+            await tmp_path.write_text(content, encoding="utf-8")
+            await tmp_path.replace(self._file_path)
+            bump_generation(str(self._file_path))
+        for listener in self._save_listeners:
+            try:
+                listener(config)
+            except Exception as err:
+                logger.warning(
+                    "Monitoring config save listener failed",
+                    exc_info=True,
+                    error=str(err),
+                )
 
     def _get_default(self):
         from app.schemas.monitoring import (
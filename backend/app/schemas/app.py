@@ -42,4 +42,16 @@ class AppPreviewResponse(BaseModel):
     description: str | None = None
 
 
+class AppImportJob(BaseModel):
+    id: str
+    status: Literal["pending", "running", "completed", "failed"] = "pending"
+    total: int = 0
+    processed: int = 0
+    imported: int = 0
+    failed: int = 0
+    error: str | None = None
+    created_at: str
+    finished_at: str | None = None
+
+
 App.model_rebuild()
@@ -6,6 +6,11 @@ from pydantic import BaseModel, Field
 class BackgroundConfig(BaseModel):
     type: str
     value: str
+    # Derived from the media index for uploaded images (not user-editable)
+    placeholder: str | None = None
+    color: str | None = None
+    poster: str | None = None
+    sources: list[dict[str, str]] | None = None
 
 
 class LogoConfig(BaseModel):
@@ -0,0 +1,26 @@
+from typing import Literal
+
+from pydantic import BaseModel
+
+
+class MediaItem(BaseModel):
+    name: str
+    url: str
+    type: Literal["image", "video"]
+    size: int | None = None
+    mtime: float | None = None
+    sha256: str | None = None
+    width: int | None = None
+    height: int | None = None
+    duration: float | None = None
+    placeholder: str | None = None
+    color: str | None = None
+    poster: str | None = None
+    derivatives_status: str | None = None
+    derivatives: int = 0
+
+
+class MediaPage(BaseModel):
+    items: list[MediaItem]
+    next_cursor: str | None = None
+    total: int
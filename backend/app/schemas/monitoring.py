@@ -67,6 +67,13 @@ class MonitoringConfig(BaseMonitoringModel):
     providers: list[MonitoringProviderConfig] = Field(default_factory=list)
 
 
+class MonitoringViewerPayload(BaseMonitoringModel):
+    client_id: str = Field(min_length=1, max_length=128)
+    zone_ids: list[str] = Field(default_factory=list, max_length=256)
+    card_ids: list[str] = Field(default_factory=list, max_length=4096)
+    interval_seconds: int | None = Field(default=None, ge=1)
+
+
 class VarcoManifestImportPayload(BaseMonitoringModel):
     manifest: dict[str, Any] | list[Any] | None = None
     brief_content: str | None = None
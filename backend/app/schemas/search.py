@@ -0,0 +1,21 @@
+from typing import Literal
+
+from pydantic import BaseModel
+
+
+class SearchResult(BaseModel):
+    id: str
+    kind: Literal["premium", "app", "folder"]
+    name: str
+    description: str | None = None
+    url: str | None = None
+    icon: str | None = None
+    integration: str | None = None
+    parent_id: str | None = None
+    score: float
+
+
+class SearchResponse(BaseModel):
+    query: str
+    total: int
+    results: list[SearchResult]
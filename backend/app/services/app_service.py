@@ -10,6 +10,8 @@ from app.core.exceptions import NotFoundException
 from app.core.premium_apps import AppRegistry
 from app.repositories.repos import AppRepository
 from app.schemas.app import App, AppCreate
+from app.services.icon_mirror import icon_mirror
+from app.services.metadata_cache import metadata_cache
 
 
 class AppService:
@@ -65,6 +67,10 @@ class AppService:
         if not description and fetched_meta.get("description"):
             description = fetched_meta["description"]
 
+        # Serve icons from the local mirror instead of hotlinking third parties
+        final_icon_url = await icon_mirror.mirror_or_keep(final_icon_url)
+        custom_icon_url = await icon_mirror.mirror_or_keep(custom_icon_url)
+
         # Helper to recursively create specific App instances from AppBase/AppCreate
         def ensure_app_instances(items: list[Any]) -> list[App]:
             apps = []
@@ -127,22 +133,56 @@ class AppService:
         if "custom_icon_url" in app_in and app_in["custom_icon_url"]:
             app_in["icon_url"] = app_in["custom_icon_url"]
 
+        for key in ("icon_url", "custom_icon_url"):
+            if app_in.get(key):
+                app_in[key] = await icon_mirror.mirror_or_keep(app_in[key])
+
         updated = await self.repo.update(app_id, app_in)
         if not updated:
             raise NotFoundException(f"App {app_id}")
         return updated
 
+    async def mirror_icons(self) -> int:
+        """Rewrites remote icon URLs of all stored apps to local mirrored copies. Returns the number rewritten."""
+        items = await self.repo.read_all()
+        rewritten = 0
+
+        async def mirror_recursive(app_list: list[App]) -> None:
+            nonlocal rewritten
+            for app in app_list:
+                for field in ("icon_url", "custom_icon_url"):
+                    current = getattr(app, field)
+                    local = await icon_mirror.mirror(current)
+                    if local and local != current:
+                        setattr(app, field, local)
+                        rewritten += 1
+                if app.type == "folder" and app.contents:
+                    await mirror_recursive(app.contents)
+
+        await mirror_recursive(items)
+        if rewritten:
+            await self.repo.save_all(items)
+        return rewritten
+
     # --- Helper Logic ---
     async def fetch_metadata(self, url: str) -> dict:
         """
         Fetches metadata (icon, description) from the given URL.
-        Returns a dict: {"icon": str | None, "description": str | None}
+        Results (including failures) are served from the persistent metadata cache.
+        Returns a dict: {"icon": str | None, "description": str | None, "title": str | None}
         """
+        return await metadata_cache.get_or_fetch(url, self._fetch_metadata_uncached)
+
+    async def _fetch_metadata_uncached(
+        self, url: str
+    ) -> tuple[dict[str, str | None], bool]:
+        """Fetches metadata from the network. The flag is False when the host could not be used."""
         meta: dict[str, str | None] = {
             "icon": None,
             "description": None,
             "title": None,
         }
+        page_ok = False
         try:
             headers = {
                 "User-Agent": (
@@ -161,6 +201,7 @@ class AppService:
                 try:
                     response = await client.get(url)
                     if response.status_code == 200:
+                        page_ok = True
                         html = response.text
 
                         # A. Extract Title
@@ -229,7 +270,7 @@ class AppService:
         except Exception as e:
             print(f"Fetch metadata failed: {e}", flush=True)
 
-        return meta
+        return meta, page_ok or any(meta.values())
 
     async def _validate_icon_url(
         self, client: httpx.AsyncClient, icon_url: str
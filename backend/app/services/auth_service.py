@@ -6,17 +6,16 @@ class AuthService:
     def is_setup(self) -> bool:
         return security.is_setup()
 
-    def setup_password(self, password: str):
+    async def setup_password(self, password: str):
         if self.is_setup():
             raise ValidationException("Already setup")
-        security.setup_password(password)
+        await security.setup_password_async(password)
 
-    def verify_password(self, password: str) -> bool:
+    async def verify_password(self, password: str) -> bool:
         if not self.is_setup():
             raise AuthException("Not setup")
-        return security.check_password(password)
+        return await security.check_password_async(password)
 
-    def change_password(self, old_password: str, new_password: str):
-        if not self.verify_password(old_password):
-            raise AuthException("Invalid old password")
-        security.setup_password(new_password)
+    async def set_password(self, password: str):
+        """Replaces the password; callers must have verified the current one."""
+        await security.setup_password_async(password)
@@ -0,0 +1,280 @@
+import asyncio
+import json
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from html.parser import HTMLParser
+from typing import Any
+
+import anyio
+import structlog
+
+from app.core.config import settings
+from app.core.exceptions import NotFoundException, ValidationException
+from app.schemas.app import App, AppImportJob
+from app.services.app_service import AppService
+from app.services.icon_mirror import icon_mirror
+
+logger = structlog.get_logger()
+
+_MAX_TRACKED_JOBS = 20
+# Deeper folder trees are rejected; browsers do not export anything close to this
+MAX_FOLDER_DEPTH = 64
+_jobs: dict[str, AppImportJob] = {}
+_job_tasks: set[asyncio.Task[None]] = set()
+
+
+@dataclass
+class BookmarkNode:
+    name: str
+    url: str | None = None
+    icon: str | None = None
+    children: list["BookmarkNode"] | None = None
+
+    @property
+    def is_folder(self) -> bool:
+        return self.children is not None
+
+
+def _is_importable_url(url: str | None) -> bool:
+    return bool(url) and url.lower().startswith(("http://", "https://"))
+
+
+class _NetscapeBookmarkParser(HTMLParser):
+    """Parses the Netscape bookmark file format exported by all major browsers."""
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.root: list[BookmarkNode] = []
+        self._stack: list[list[BookmarkNode]] = [self.root]
+        self._pending_folder: BookmarkNode | None = None
+        self._current: BookmarkNode | None = None
+        self._text: list[str] = []
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        attr_map = {k.lower(): v for k, v in attrs}
+        if tag in ("h3", "a"):
+            self._pending_folder = None
+        if tag == "h3":
+            self._current = BookmarkNode(name="", children=[])
+            self._text = []
+        elif tag == "a":
+            self._current = BookmarkNode(
+                name="", url=attr_map.get("href"), icon=attr_map.get("icon")
+            )
+            self._text = []
+        elif tag == "dl" and self._pending_folder is not None:
+            assert self._pending_folder.children is not None
+            if len(self._stack) > MAX_FOLDER_DEPTH:
+                raise ValidationException("Bookmark folders are nested too deeply")
+            self._stack.append(self._pending_folder.children)
+            self._pending_folder = None
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in ("h3", "a") and self._current is not None:
+            node = self._current
+            node.name = "".join(self._text).strip() or (node.url or "Folder")
+            self._stack[-1].append(node)
+            if tag == "h3":
+                self._pending_folder = node
+            self._current = None
+        elif tag == "dl" and len(self._stack) > 1:
+            self._stack.pop()
+
+    def handle_data(self, data: str) -> None:
+        if self._current is not None:
+            self._text.append(data)
+
+
+def _json_to_nodes(data: Any) -> list[BookmarkNode]:
+    """Converts Chrome/Edge, Firefox (.json backup) or plain list bookmark JSON to nodes."""
+    while True:
+        if isinstance(data, dict) and isinstance(data.get("roots"), dict):
+            data = list(data["roots"].values())
+        elif (
+            isinstance(data, dict)
+            and "children" in data
+            and not data.get("url")
+            # Firefox backups wrap everything in a single unnamed root container
+            and not (data.get("title") or data.get("name"))
+        ):
+            data = data["children"]
+        else:
+            break
+    if isinstance(data, dict) and "children" in data and not data.get("url"):
+        data = [data]
+    if not isinstance(data, list):
+        raise ValidationException("Unsupported bookmark JSON structure")
+
+    # Walked with an explicit stack so deep trees cannot exhaust the call stack
+    nodes: list[BookmarkNode] = []
+    pending: list[tuple[list[Any], list[BookmarkNode], int]] = [(data, nodes, 1)]
+    while pending:
+        items, target, depth = pending.pop()
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            name = str(item.get("name") or item.get("title") or "").strip()
+            url = item.get("url") or item.get("uri") or item.get("href")
+            if isinstance(item.get("children"), list) and not url:
+                if depth > MAX_FOLDER_DEPTH:
+                    raise ValidationException("Bookmark folders are nested too deeply")
+                folder = BookmarkNode(name=name or "Folder", children=[])
+                target.append(folder)
+                assert folder.children is not None
+                pending.append((item["children"], folder.children, depth + 1))
+            elif url:
+                target.append(
+                    BookmarkNode(
+                        name=name or str(url), url=str(url), icon=item.get("icon")
+                    )
+                )
+    return nodes
+
+
+def parse_bookmarks(content: bytes, filename: str = "") -> list[BookmarkNode]:
+    """Parses a Netscape bookmarks HTML or bookmark JSON export into a node tree."""
+    text = content.decode("utf-8", errors="ignore").lstrip("\ufeff")
+    stripped = text.lstrip()
+    if filename.lower().endswith(".json") or stripped.startswith(("{", "[")):
+        try:
+            return _json_to_nodes(json.loads(text))
+        except json.JSONDecodeError as e:
+            raise ValidationException(f"Invalid bookmark JSON: {e}") from e
+        except RecursionError as e:
+            raise ValidationException("Bookmark JSON is nested too deeply") from e
+
+    parser = _NetscapeBookmarkParser()
+    parser.feed(text)
+    parser.close()
+    if not parser.root:
+        raise ValidationException("No bookmarks found in file")
+    return parser.root
+
+
+def _count_links(nodes: list[BookmarkNode]) -> int:
+    return sum(
+        (
+            _count_links(n.children or [])
+            if n.is_folder
+            else int(_is_importable_url(n.url))
+        )
+        for n in nodes
+    )
+
+
+@dataclass
+class _ImportContext:
+    job: AppImportJob
+    service: AppService
+    enrich: bool
+    semaphore: asyncio.Semaphore
+    created_at: str = field(default_factory=lambda: datetime.utcnow().isoformat())
+
+
+async def _build_link(node: BookmarkNode, ctx: _ImportContext) -> App | None:
+    try:
+        description: str | None = None
+        icon: str | None = None
+        if ctx.enrich:
+            async with ctx.semaphore:
+                meta = await ctx.service.fetch_metadata(str(node.url))
+                description = meta.get("description")
+                icon = await icon_mirror.mirror_or_keep(meta.get("icon"))
+        app = App(
+            id=str(uuid.uuid4()),
+            name=node.name[:200],
+            url=node.url,
+            icon_url=icon or node.icon,
+            description=description,
+            type="link",
+            created_at=ctx.created_at,
+        )
+        ctx.job.imported += 1
+        return app
+    except Exception as err:
+        ctx.job.failed += 1
+        logger.info("Bookmark skipped", url=node.url, error=str(err))
+        return None
+    finally:
+        ctx.job.processed += 1
+
+
+async def _build_apps(nodes: list[BookmarkNode], ctx: _ImportContext) -> list[App]:
+    async def build(node: BookmarkNode) -> App | None:
+        if node.is_folder:
+            contents = await _build_apps(node.children or [], ctx)
+            if not contents:
+                return None
+            return App(
+                id=str(uuid.uuid4()),
+                name=node.name[:200],
+                type="folder",
+                contents=contents,
+                created_at=ctx.created_at,
+            )
+        if not _is_importable_url(node.url):
+            return None
+        return await _build_link(node, ctx)
+
+    built = await asyncio.gather(*(build(n) for n in nodes))
+    return [app for app in built if app is not None]
+
+
+async def _run_import(
+    job: AppImportJob, nodes: list[BookmarkNode], enrich: bool
+) -> None:
+    job.status = "running"
+    ctx = _ImportContext(
+        job=job,
+        service=AppService(),
+        enrich=enrich,
+        semaphore=asyncio.Semaphore(max(1, settings.BOOKMARK_IMPORT_CONCURRENCY)),
+    )
+    try:
+        new_apps = await _build_apps(nodes, ctx)
+        # Commit the whole import with a single apps.json write
+        await ctx.service.repo.extend(new_apps)
+        job.status = "completed"
+    except Exception as err:
+        logger.warning("Bookmark import failed", job_id=job.id, error=str(err))
+        job.status = "failed"
+        job.error = str(err)
+    finally:
+        job.finished_at = datetime.utcnow().isoformat()
+
+
+async def start_import(
+    content: bytes, filename: str, enrich: bool = True
+) -> AppImportJob:
+    """Parses a bookmark export and starts the import in the background. Returns the job for polling."""
+    nodes = await anyio.to_thread.run_sync(parse_bookmarks, content, filename)
+    job = AppImportJob(
+        id=str(uuid.uuid4()),
+        status="pending",
+        total=_count_links(nodes),
+        created_at=datetime.utcnow().isoformat(),
+    )
+
+    # Forget the oldest finished jobs
+    while len(_jobs) >= _MAX_TRACKED_JOBS:
+        oldest = next(
+            (jid for jid, j in _jobs.items() if j.status in ("completed", "failed")),
+            None,
+        )
+        if oldest is None:
+            break
+        del _jobs[oldest]
+    _jobs[job.id] = job
+
+    task = asyncio.create_task(_run_import(job, nodes, enrich))
+    _job_tasks.add(task)
+    task.add_done_callback(_job_tasks.discard)
+    return job
+
+
+def get_import_job(job_id: str) -> AppImportJob:
+    job = _jobs.get(job_id)
+    if not job:
+        raise NotFoundException(f"Import job {job_id}")
+    return job
@@ -1,5 +1,6 @@
 from app.repositories.repos import ConfigRepository
 from app.schemas.config import AppConfig
+from app.services.media_library import media_library, upload_filename
 
 
 class ConfigService:
@@ -7,8 +8,42 @@ class ConfigService:
         self.repo = ConfigRepository()
 
     async def get_config(self) -> AppConfig:
-        return await self.repo.get_config()
+        config = await self.repo.get_config()
+        return self._with_background_media(config)
+
+    def _with_background_media(self, config: AppConfig) -> AppConfig:
+        """
+        Attaches derived media of an uploaded background: the placeholder of an image
+        (painted immediately) or the poster and transcoded sources of a video. Only
+        reads the media index; backgrounds are indexed when saved and by the
+        reconcile job.
+        """
+        bg = config.bgConfig
+        filename = upload_filename(bg.value) if bg else None
+        if not filename or bg.type not in ("image", "video"):
+            return config
+        entry = media_library.resolve(filename)
+        if entry is None:
+            return config
+        if bg.type == "image":
+            bg.placeholder = entry.get("placeholder")
+            bg.color = entry.get("color")
+        else:
+            bg.poster = entry.get("poster")
+            bg.sources = media_library.video_sources(entry)
+        return config
 
     async def update_config(self, config: AppConfig) -> AppConfig:
+        # Derived media fields are attached on read, don't persist what the client echoes back
+        if config.bgConfig:
+            config.bgConfig.placeholder = None
+            config.bgConfig.color = None
+            config.bgConfig.poster = None
+            config.bgConfig.sources = None
         await self.repo.save_config(config)
-        return config
+        bg = config.bgConfig
+        filename = upload_filename(bg.value) if bg else None
+        if filename and bg.type in ("image", "video"):
+            # Indexes a background that predates the media index
+            await media_library.ensure(filename, bg.type)
+        return self._with_background_media(config)
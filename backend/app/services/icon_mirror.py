@@ -0,0 +1,206 @@
+import asyncio
+import gzip
+import hashlib
+import io
+import json
+import os
+import time
+from collections.abc import Callable
+
+import anyio
+import httpx
+import structlog
+from PIL import Image
+
+from app.core.config import settings
+
+logger = structlog.get_logger()
+
+ICON_DIR = os.path.join(settings.UPLOAD_DIR, "icons")
+ICON_URL_PREFIX = "/uploads/icons/"
+
+
+def is_remote_url(url: str | None) -> bool:
+    return bool(url) and url.lower().startswith(("http://", "https://"))
+
+
+def _looks_like_svg(content: bytes, content_type: str) -> bool:
+    if "svg" in content_type:
+        return True
+    head = content[:512].lstrip().lower()
+    return head.startswith(b"<svg") or (head.startswith(b"<?xml") and b"<svg" in head)
+
+
+def normalize_icon(content: bytes, content_type: str, size: int) -> tuple[bytes, str]:
+    """Returns (bytes, extension): SVGs are kept as-is, raster icons are resized to `size` and re-encoded as WebP."""
+    if _looks_like_svg(content, content_type):
+        return content, "svg"
+
+    # Pillow loads the largest frame of multi-size .ico files by default
+    with Image.open(io.BytesIO(content)) as img:
+        frame = img.convert("RGBA")
+    frame.thumbnail((size, size), Image.Resampling.LANCZOS)
+    out = io.BytesIO()
+    frame.save(out, format="WEBP", quality=90, method=6)
+    return out.getvalue(), "webp"
+
+
+class IconMirror:
+    """
+    Mirrors remote icons into UPLOAD_DIR/icons under content-hash filenames.
+
+    The source-URL -> local-URL mapping is persisted in DATA_DIR/icon_mirror.json so
+    each icon is only downloaded once. Local URLs never change content and are served
+    with an immutable Cache-Control header. Icons that fail to mirror are retried
+    after ICON_MIRROR_FAILURE_TTL_SECONDS.
+    """
+
+    def __init__(
+        self,
+        icon_dir: str = ICON_DIR,
+        index_path: str | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.icon_dir = icon_dir
+        self.index_path = index_path or os.path.join(
+            settings.DATA_DIR, "icon_mirror.json"
+        )
+        self._clock = clock
+        self._index: dict[str, str] | None = None
+        self._lock = asyncio.Lock()
+        # Source URL -> monotonic time after which mirroring is retried
+        self._failed: dict[str, float] = {}
+        # Local URLs whose file has been seen on disk (icons are never deleted)
+        self._present: set[str] = set()
+
+    def _load_index(self) -> dict[str, str]:
+        if self._index is None:
+            self._present.clear()
+            try:
+                with open(self.index_path, encoding="utf-8") as f:
+                    data = json.load(f)
+                self._index = data if isinstance(data, dict) else {}
+            except FileNotFoundError:
+                self._index = {}
+            except Exception as err:
+                logger.warning("Failed reading icon mirror index", error=str(err))
+                self._index = {}
+        return self._index
+
+    def _save_index(self) -> None:
+        os.makedirs(os.path.dirname(self.index_path) or ".", exist_ok=True)
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._load_index(), f, indent=2)
+        os.replace(tmp_path, self.index_path)
+
+    def _local_path(self, local_url: str) -> str:
+        return os.path.join(self.icon_dir, local_url.removeprefix(ICON_URL_PREFIX))
+
+    def lookup(self, url: str | None) -> str | None:
+        """Returns the local URL of an already mirrored icon without touching the network."""
+        if not is_remote_url(url):
+            return None
+        local_url = self._load_index().get(url)  # type: ignore[arg-type]
+        if not local_url:
+            return None
+        if local_url not in self._present:
+            if not os.path.exists(self._local_path(local_url)):
+                return None
+            self._present.add(local_url)
+        return local_url
+
+    async def mirror(self, url: str | None) -> str | None:
+        """Downloads and stores `url` locally. Returns the local URL or None if it cannot be mirrored."""
+        if not is_remote_url(url):
+            return None
+        assert url is not None
+        retry_at = self._failed.get(url)
+        if retry_at is not None:
+            if self._clock() < retry_at:
+                return None
+            del self._failed[url]
+        existing = self.lookup(url)
+        if existing:
+            return existing
+
+        try:
+            content, content_type = await self._download(url)
+            data, ext = await anyio.to_thread.run_sync(
+                normalize_icon, content, content_type, settings.ICON_MIRROR_SIZE
+            )
+        except Exception as err:
+            self._failed[url] = self._clock() + settings.ICON_MIRROR_FAILURE_TTL_SECONDS
+            logger.info("Icon mirroring failed", url=url, error=str(err))
+            return None
+
+        filename = f"{hashlib.sha256(data).hexdigest()[:32]}.{ext}"
+        local_url = f"{ICON_URL_PREFIX}{filename}"
+        async with self._lock:
+            await anyio.to_thread.run_sync(self._store, filename, data, url, local_url)
+        return local_url
+
+    @staticmethod
+    async def _download(url: str) -> tuple[bytes, str]:
+        """Streams an icon, aborting once it exceeds ICON_MIRROR_MAX_BYTES."""
+        limit = settings.ICON_MIRROR_MAX_BYTES
+        async with httpx.AsyncClient(
+            verify=False, follow_redirects=True, timeout=10.0
+        ) as client, client.stream("GET", url) as resp:
+            content_type = resp.headers.get("content-type", "").lower()
+            if resp.status_code != 200:
+                raise ValueError(f"HTTP {resp.status_code}")
+            if content_type and not (
+                content_type.startswith("image/")
+                or "octet-stream" in content_type
+                or "xml" in content_type
+            ):
+                raise ValueError(f"unexpected content type {content_type}")
+            declared = resp.headers.get("content-length", "")
+            if declared.isdigit() and int(declared) > limit:
+                raise ValueError("icon too large")
+            chunks = bytearray()
+            async for chunk in resp.aiter_bytes():
+                chunks.extend(chunk)
+                if len(chunks) > limit:
+                    raise ValueError("icon too large")
+        if not chunks:
+            raise ValueError("empty response")
+        return bytes(chunks), content_type
+
+    def _store(self, filename: str, data: bytes, url: str, local_url: str) -> None:
+        os.makedirs(self.icon_dir, exist_ok=True)
+        target = os.path.join(self.icon_dir, filename)
+        if not os.path.exists(target):
+            if filename.endswith(".svg"):
+                # Precompressed sibling, served to clients accepting gzip
+                self._write_atomic(f"{target}.gz", gzip.compress(data, 9, mtime=0))
+            self._write_atomic(target, data)
+        self._load_index()[url] = local_url
+        self._present.add(local_url)
+        self._save_index()
+
+    @staticmethod
+    def _write_atomic(path: str, data: bytes) -> None:
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    async def mirror_or_keep(self, url: str | None) -> str | None:
+        """Returns the local copy of a remote icon, falling back to the original URL."""
+        return await self.mirror(url) or url
+
+    async def warm(self, urls: list[str], concurrency: int = 4) -> int:
+        """Mirrors a batch of icons with bounded concurrency. Returns the number available locally."""
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def _one(u: str) -> bool:
+            async with semaphore:
+                return await self.mirror(u) is not None
+
+        results = await asyncio.gather(*(_one(u) for u in dict.fromkeys(urls)))
+        return sum(results)
+
+
+icon_mirror = IconMirror()
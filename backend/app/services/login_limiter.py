@@ -0,0 +1,159 @@
+import functools
+import ipaddress
+import math
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from fastapi import Request
+
+from app.core.config import settings
+
+
+@dataclass
+class _ClientState:
+    tokens: float
+    updated: float
+    failures: int = 0
+    locked_until: float = 0.0
+
+
+@dataclass
+class LimiterCounters:
+    allowed: int = 0
+    rate_limited: int = 0
+    locked_out: int = 0
+    failures: int = 0
+    lockouts: int = 0
+
+
+def client_ip(request: Request) -> str:
+    """
+    Returns the client address, taking it from the headers set by the bundled nginx
+    when the direct peer is listed in AUTH_TRUSTED_PROXIES. With
+    `$proxy_add_x_forwarded_for` the rightmost X-Forwarded-For entry is the address
+    nginx saw; entries to its left are client-supplied and not trusted.
+    """
+    peer = request.client.host if request.client else ""
+    if _is_trusted_proxy(peer):
+        forwarded = request.headers.get("x-forwarded-for", "")
+        candidate = (
+            forwarded.rsplit(",", 1)[-1].strip()
+            or request.headers.get("x-real-ip", "").strip()
+        )
+        if candidate:
+            return candidate
+    return peer or "unknown"
+
+
+@functools.lru_cache(maxsize=8)
+def _trusted_networks(
+    proxies: tuple[str, ...],
+) -> tuple[ipaddress.IPv4Network | ipaddress.IPv6Network, ...]:
+    return tuple(ipaddress.ip_network(p.strip(), strict=False) for p in proxies)
+
+
+def _is_trusted_proxy(host: str) -> bool:
+    if not settings.AUTH_TRUSTED_PROXIES:
+        return False
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        # Non-IP peers (e.g. "testclient", unix sockets) are never trusted
+        return False
+    return any(
+        address in network
+        for network in _trusted_networks(tuple(settings.AUTH_TRUSTED_PROXIES))
+    )
+
+
+class LoginRateLimiter:
+    """
+    Per-client token bucket for password checks with exponential lockout after
+    repeated failures. Checked before any hashing work, so guessing passwords cannot
+    pin a CPU core. State is in memory and bounded to AUTH_RATE_LIMIT_MAX_CLIENTS
+    clients (least recently seen are dropped first).
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic) -> None:
+        self._clock = clock
+        self._clients: OrderedDict[str, _ClientState] = OrderedDict()
+        self.counters = LimiterCounters()
+
+    def _state(self, key: str, now: float) -> _ClientState:
+        state = self._clients.get(key)
+        if state is None:
+            state = _ClientState(
+                tokens=float(settings.AUTH_RATE_LIMIT_BURST), updated=now
+            )
+            self._clients[key] = state
+            while len(self._clients) > settings.AUTH_RATE_LIMIT_MAX_CLIENTS:
+                self._clients.popitem(last=False)
+        else:
+            self._clients.move_to_end(key)
+        return state
+
+    def acquire(self, key: str) -> float | None:
+        """Consumes one attempt for `key`. Returns the seconds to wait if it is refused."""
+        now = self._clock()
+        state = self._state(key, now)
+        if state.locked_until > now:
+            self.counters.locked_out += 1
+            return state.locked_until - now
+
+        rate = settings.AUTH_RATE_LIMIT_PER_MINUTE / 60
+        state.tokens = min(
+            float(settings.AUTH_RATE_LIMIT_BURST),
+            state.tokens + (now - state.updated) * rate,
+        )
+        state.updated = now
+        if state.tokens < 1:
+            self.counters.rate_limited += 1
+            return (1 - state.tokens) / rate if rate > 0 else math.inf
+        state.tokens -= 1
+        self.counters.allowed += 1
+        return None
+
+    def record_failure(self, key: str) -> None:
+        now = self._clock()
+        state = self._state(key, now)
+        state.failures += 1
+        self.counters.failures += 1
+        excess = state.failures - settings.AUTH_LOCKOUT_THRESHOLD
+        if excess >= 0:
+            lockout = min(
+                settings.AUTH_LOCKOUT_BASE_SECONDS * 2 ** min(excess, 32),
+                settings.AUTH_LOCKOUT_MAX_SECONDS,
+            )
+            state.locked_until = now + lockout
+            self.counters.lockouts += 1
+
+    def record_success(self, key: str) -> None:
+        state = self._clients.get(key)
+        if state is not None:
+            state.failures = 0
+            state.locked_until = 0.0
+
+    def reset(self) -> None:
+        self._clients.clear()
+        self.counters = LimiterCounters()
+
+    def stats(self) -> dict[str, Any]:
+        now = self._clock()
+        return {
+            "enabled": settings.AUTH_RATE_LIMIT_ENABLED,
+            "tracked_clients": len(self._clients),
+            "locked_clients": sum(
+                1 for s in self._clients.values() if s.locked_until > now
+            ),
+            "allowed": self.counters.allowed,
+            "rate_limited": self.counters.rate_limited,
+            "locked_out": self.counters.locked_out,
+            "failures": self.counters.failures,
+            "lockouts": self.counters.lockouts,
+        }
+
+
+login_limiter = LoginRateLimiter()
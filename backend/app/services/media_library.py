@@ -0,0 +1,782 @@
+import asyncio
+import base64
+import contextlib
+import hashlib
+import io
+import json
+import os
+import re
+import shutil
+import time
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+
+import anyio
+import structlog
+from PIL import Image, ImageOps, features
+
+from app.core.config import settings
+from app.services.video_transcoder import ffmpeg_available, transcode_video
+
+logger = structlog.get_logger()
+
+MEDIA_DIR = os.path.join(settings.UPLOAD_DIR, "media")
+MEDIA_URL_PREFIX = "uploads/media/"
+DERIVATIVE_DIR = os.path.join(settings.UPLOAD_DIR, "derivatives")
+DERIVATIVE_URL_PREFIX = "/uploads/derivatives/"
+# Ensure directories exist
+os.makedirs(MEDIA_DIR, exist_ok=True)
+os.makedirs(DERIVATIVE_DIR, exist_ok=True)
+
+DERIVATIVE_WIDTHS = (640, 1280, 1920, 3840)
+# Preferred first; AVIF is skipped when Pillow was built without it
+DERIVATIVE_FORMATS = ("avif", "webp")
+FORMAT_MIME_TYPES = {"avif": "image/avif", "webp": "image/webp"}
+_ENCODER_OPTIONS: dict[str, dict[str, Any]] = {
+    "avif": {"quality": 55, "speed": 6},
+    "webp": {"quality": 80, "method": 4},
+}
+ALLOWED_EXTENSIONS = {
+    "image": {".jpg", ".jpeg", ".png", ".gif", ".webp"},
+    "video": {".mp4", ".webm", ".mov"},
+}
+_DERIVABLE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".gif"}
+SORT_FIELDS = ("name", "mtime", "size")
+# Unreferenced blobs / temp files younger than this may belong to a running upload
+_ORPHAN_GRACE_SECONDS = 3600
+PLACEHOLDER_SIZE = 32
+_UPLOAD_URL_RE = re.compile(r"^/?uploads/((?:media/)?[^/?#]+)(?:[?#].*)?$")
+_BLOB_NAME_RE = re.compile(r"^[0-9a-f]{64}\.[a-z0-9]+$")
+
+_pool: ProcessPoolExecutor | None = None
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=settings.MEDIA_DERIVATIVE_WORKERS)
+    return _pool
+
+
+def shutdown_media_workers() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def upload_filename(url: str | None) -> str | None:
+    """
+    Extracts the file name from an `uploads/<file>` or `uploads/media/<sha256>.<ext>`
+    URL (with optional query).
+    """
+    match = _UPLOAD_URL_RE.match(url or "")
+    return os.path.basename(match.group(1)) if match else None
+
+
+def media_type(filename: str) -> str | None:
+    ext = os.path.splitext(filename)[1].lower()
+    for file_type, extensions in ALLOWED_EXTENSIONS.items():
+        if ext in extensions:
+            return file_type
+    return None
+
+
+def blob_name(filename: str, sha256: str) -> str:
+    """Content-addressed file name of an upload: `<sha256>.<ext>`."""
+    return f"{sha256}{os.path.splitext(filename)[1].lower()}"
+
+
+def available_formats() -> list[str]:
+    return [fmt for fmt in DERIVATIVE_FORMATS if features.check(fmt)]
+
+
+def file_sha256(path: str) -> str:
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def render_placeholder(img: Image.Image) -> tuple[str, str]:
+    """Returns a tiny inline WebP preview (data URI) and the dominant colour (#rrggbb)."""
+    thumb = img.convert("RGB")
+    thumb.thumbnail((PLACEHOLDER_SIZE, PLACEHOLDER_SIZE), Image.Resampling.BOX)
+    out = io.BytesIO()
+    thumb.save(out, format="WEBP", quality=40)
+    data_uri = "data:image/webp;base64," + base64.b64encode(out.getvalue()).decode()
+
+    palette = thumb.quantize(colors=5)
+    counts = sorted(palette.getcolors() or [], reverse=True)
+    colors = palette.getpalette() or []
+    if counts and colors:
+        index = counts[0][1] * 3
+        r, g, b = colors[index : index + 3]
+    else:
+        r, g, b = thumb.resize((1, 1)).getpixel((0, 0))
+    return data_uri, f"#{r:02x}{g:02x}{b:02x}"
+
+
+def generate_image_derivatives(
+    src_path: str, out_dir: str, widths: list[int], formats: list[str]
+) -> dict[str, Any]:
+    """
+    Renders width variants of an image in each format plus its placeholder. Runs in a
+    worker process.
+
+    Images are never upscaled; a source narrower than the smallest width gets a single
+    variant at its own width. Animated images are left alone.
+    """
+    with Image.open(src_path) as img:
+        if getattr(img, "is_animated", False):
+            placeholder, color = render_placeholder(img)
+            return {
+                "width": img.width,
+                "height": img.height,
+                "placeholder": placeholder,
+                "color": color,
+                "variants": [],
+            }
+        img = ImageOps.exif_transpose(img)
+        width, height = img.size
+        placeholder, color = render_placeholder(img)
+        has_alpha = img.mode in ("RGBA", "LA") or "transparency" in img.info
+        img = img.convert("RGBA" if has_alpha else "RGB")
+
+        targets = sorted({w for w in widths if w < width}) or [width]
+        if width not in targets and width <= max(widths):
+            targets.append(width)
+
+        os.makedirs(out_dir, exist_ok=True)
+        variants = []
+        for target in targets:
+            target_height = max(1, round(height * target / width))
+            resized = (
+                img
+                if target == width
+                else img.resize((target, target_height), Image.Resampling.LANCZOS)
+            )
+            for fmt in formats:
+                name = f"{target}.{fmt}"
+                tmp_path = os.path.join(out_dir, f".{name}.tmp")
+                resized.save(tmp_path, format=fmt.upper(), **_ENCODER_OPTIONS[fmt])
+                os.replace(tmp_path, os.path.join(out_dir, name))
+                variants.append(
+                    {
+                        "width": target,
+                        "height": target_height,
+                        "format": fmt,
+                        "file": name,
+                        "size": os.path.getsize(os.path.join(out_dir, name)),
+                    }
+                )
+    return {
+        "width": width,
+        "height": height,
+        "placeholder": placeholder,
+        "color": color,
+        "variants": variants,
+    }
+
+
+class MediaLibrary:
+    """
+    Tracks uploaded media in DATA_DIR/media_index.json and renders responsive image
+    derivatives (WebP/AVIF width variants) plus a low-quality placeholder and dominant
+    colour in a background process pool.
+
+    Uploads are stored content-addressed as UPLOAD_DIR/media/<sha256>.<ext>; the index
+    maps friendly names to blobs, and a blob (with its derivatives under
+    UPLOAD_DIR/derivatives/<sha256>/) is deleted once no name references it. Files
+    uploaded before the store existed stay in UPLOAD_DIR and are indexed in place.
+    All hashed URLs never change content and can be cached forever.
+    """
+
+    def __init__(
+        self,
+        upload_dir: str | None = None,
+        derivative_dir: str = DERIVATIVE_DIR,
+        index_path: str | None = None,
+    ) -> None:
+        self._upload_dir = upload_dir
+        self.derivative_dir = derivative_dir
+        self.index_path = index_path or os.path.join(
+            settings.DATA_DIR, "media_index.json"
+        )
+        self._index: dict[str, dict[str, Any]] | None = None
+        self._lock = asyncio.Lock()
+        self._tasks: dict[str, asyncio.Task[None]] = {}
+        self._progress: dict[str, float] = {}
+        # Bumped on every index change; invalidates the sorted listing views
+        self._generation = 0
+        self._sorted: dict[str, tuple[int, list[tuple[Any, str]]]] = {}
+        self._reconciled = False
+        self._reconcile_lock = asyncio.Lock()
+
+    @property
+    def upload_dir(self) -> str:
+        return self._upload_dir or settings.UPLOAD_DIR
+
+    @property
+    def media_dir(self) -> str:
+        return os.path.join(self.upload_dir, "media")
+
+    def file_path(self, entry: dict[str, Any]) -> str:
+        return os.path.join(self.upload_dir, entry["path"])
+
+    def _load_index(self) -> dict[str, dict[str, Any]]:
+        if self._index is None:
+            try:
+                with open(self.index_path, encoding="utf-8") as f:
+                    data = json.load(f)
+                items = data.get("items") if isinstance(data, dict) else None
+                self._index = items if isinstance(items, dict) else {}
+                for name, entry in self._index.items():
+                    # Version 1 entries describe files stored under their own name
+                    entry.setdefault("path", name)
+                    entry.setdefault("url", f"uploads/{name}")
+            except FileNotFoundError:
+                self._index = {}
+            except Exception as err:
+                logger.warning("Failed reading media index", error=str(err))
+                self._index = {}
+        return self._index
+
+    def _save_index(self) -> None:
+        self._generation += 1
+        os.makedirs(os.path.dirname(self.index_path) or ".", exist_ok=True)
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": 2, "items": self._load_index()}, f, indent=2)
+        os.replace(tmp_path, self.index_path)
+
+    async def _update(self, filename: str, **fields: Any) -> dict[str, Any] | None:
+        async with self._lock:
+            entry = self._load_index().get(filename)
+            if entry is None:
+                return None
+            entry.update(fields)
+            await anyio.to_thread.run_sync(self._save_index)
+            return dict(entry)
+
+    def get(self, filename: str) -> dict[str, Any] | None:
+        entry = self._load_index().get(filename)
+        return dict(entry) if entry else None
+
+    def entries(self) -> list[dict[str, Any]]:
+        return [dict(e) for e in self._load_index().values()]
+
+    def resolve(self, key: str) -> dict[str, Any] | None:
+        """Looks up an entry by friendly name or by blob name (`<sha256>.<ext>`)."""
+        entry = self.get(key)
+        if entry is None and _BLOB_NAME_RE.match(key):
+            path = f"media/{key}"
+            entry = next(
+                (dict(e) for e in self._load_index().values() if e["path"] == path),
+                None,
+            )
+        return entry
+
+    def refcount(self, sha256: str) -> int:
+        return sum(1 for e in self._load_index().values() if e.get("sha256") == sha256)
+
+    def unique_name(self, filename: str, sha256: str) -> str:
+        """
+        Returns `filename` if it is free or already names the same content, otherwise
+        the first free `<stem>-<n><ext>`, so different files never replace each other.
+        """
+        stem, ext = os.path.splitext(filename)
+        candidate, n = filename, 1
+        while True:
+            existing = self._load_index().get(candidate)
+            if existing is not None:
+                if existing.get("sha256") == sha256:
+                    return candidate
+            elif not os.path.exists(os.path.join(self.upload_dir, candidate)):
+                return candidate
+            n += 1
+            candidate = f"{stem}-{n}{ext}"
+
+    async def register(
+        self,
+        filename: str,
+        file_type: str,
+        size: int,
+        sha256: str,
+        path: str | None = None,
+        mtime: float | None = None,
+    ) -> dict[str, Any]:
+        """
+        Records a stored file under `filename` and schedules derivative rendering or
+        transcoding. `path` is relative to UPLOAD_DIR (defaults to the file name itself).
+        """
+        path = path or filename
+        if file_type == "video":
+            derivable = ffmpeg_available()
+        else:
+            derivable = os.path.splitext(filename)[1].lower() in _DERIVABLE_EXTENSIONS
+        entry = {
+            "filename": filename,
+            "path": path,
+            "url": f"uploads/{path}",
+            "type": file_type,
+            "size": size,
+            "mtime": mtime or time.time(),
+            "sha256": sha256,
+            "width": None,
+            "height": None,
+            "placeholder": None,
+            "color": None,
+            "poster": None,
+            "duration": None,
+            "derivatives": {"status": "pending" if derivable else "none", "items": []},
+        }
+        async with self._lock:
+            previous = self._load_index().get(filename)
+            if previous and previous.get("sha256") == sha256:
+                entry = previous
+            else:
+                self._load_index()[filename] = entry
+                await anyio.to_thread.run_sync(self._save_index)
+                if previous:
+                    # Re-indexed in place (same path): the file is the new content
+                    await self._release(previous, keep_file=previous["path"] == path)
+
+        if entry["derivatives"]["status"] in ("pending", "failed") and derivable:
+            self._schedule(filename)
+        return dict(entry)
+
+    async def ensure(self, filename: str, file_type: str) -> dict[str, Any] | None:
+        """
+        Returns the index entry for a name or blob name, indexing files that predate
+        the index.
+        """
+        entry = self.resolve(filename)
+        if entry is not None:
+            if self._needs_rerender(entry):
+                self._schedule(entry["filename"])
+            return entry
+        path = os.path.join(self.upload_dir, filename)
+        if not os.path.isfile(path):
+            return None
+        return await self._index_in_place(filename, file_type)
+
+    @staticmethod
+    def _needs_rerender(entry: dict[str, Any]) -> bool:
+        status = entry["derivatives"]["status"]
+        if "placeholder" not in entry and status == "ready":
+            # Indexed before placeholders existed
+            return True
+        # ffmpeg was installed after the upload
+        return entry["type"] == "video" and status == "none" and ffmpeg_available()
+
+    async def _index_in_place(self, filename: str, file_type: str) -> dict[str, Any]:
+        path = os.path.join(self.upload_dir, filename)
+        sha256 = await anyio.to_thread.run_sync(file_sha256, path)
+        stat = os.stat(path)
+        return await self.register(
+            filename,
+            file_type,
+            stat.st_size,
+            sha256,
+            path=filename,
+            mtime=stat.st_mtime,
+        )
+
+    def _schedule(self, filename: str) -> None:
+        if filename in self._tasks:
+            return
+        entry = self.get(filename)
+        job = self._transcode if entry and entry["type"] == "video" else self._render
+        task = asyncio.create_task(job(filename))
+        self._tasks[filename] = task
+        task.add_done_callback(lambda _: self._finish(filename))
+
+    def _finish(self, filename: str) -> None:
+        self._tasks.pop(filename, None)
+        self._progress.pop(filename, None)
+
+    def progress(self, filename: str) -> float | None:
+        """Progress (0..1) of a running background job for `filename`, if any."""
+        return self._progress.get(filename)
+
+    async def wait(self, filename: str) -> None:
+        """Waits for pending derivative rendering of `filename` (mainly for tests and tooling)."""
+        task = self._tasks.get(filename)
+        if task is not None:
+            await asyncio.shield(task)
+
+    async def stop(self) -> None:
+        """Cancels running derivative jobs and waits for them to finish (on shutdown)."""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _render(self, filename: str) -> None:
+        entry = self.get(filename)
+        if entry is None:
+            return
+        sha256 = entry["sha256"]
+        out_dir = os.path.join(self.derivative_dir, sha256)
+        loop = asyncio.get_running_loop()
+        try:
+            result = await loop.run_in_executor(
+                _get_pool(),
+                generate_image_derivatives,
+                self.file_path(entry),
+                out_dir,
+                list(DERIVATIVE_WIDTHS),
+                available_formats(),
+            )
+        except Exception as err:
+            logger.warning(
+                "Rendering media derivatives failed", filename=filename, error=str(err)
+            )
+            await self._update(filename, derivatives={"status": "failed", "items": []})
+            return
+
+        items = []
+        for variant in result["variants"]:
+            file = variant.pop("file")
+            items.append({**variant, "url": f"{DERIVATIVE_URL_PREFIX}{sha256}/{file}"})
+        current = self.get(filename)
+        if current is None or current.get("sha256") != sha256:
+            # Replaced or deleted while rendering
+            await self._release(entry, keep_file=self._same_file(entry, current))
+            return
+        await self._update(
+            filename,
+            width=result["width"],
+            height=result["height"],
+            placeholder=result["placeholder"],
+            color=result["color"],
+            derivatives={"status": "ready", "items": items},
+        )
+
+    async def _transcode(self, filename: str) -> None:
+        entry = self.get(filename)
+        if entry is None:
+            return
+        sha256 = entry["sha256"]
+        self._progress[filename] = 0.0
+
+        def on_progress(fraction: float) -> None:
+            self._progress[filename] = round(fraction, 3)
+
+        try:
+            result = await transcode_video(
+                self.file_path(entry),
+                os.path.join(self.derivative_dir, sha256),
+                on_progress,
+            )
+        except Exception as err:
+            logger.warning(
+                "Transcoding video failed", filename=filename, error=str(err)
+            )
+            await self._update(filename, derivatives={"status": "failed", "items": []})
+            return
+
+        items = []
+        for output in result["outputs"]:
+            file = output.pop("file")
+            items.append({**output, "url": f"{DERIVATIVE_URL_PREFIX}{sha256}/{file}"})
+        current = self.get(filename)
+        if current is None or current.get("sha256") != sha256:
+            await self._release(entry, keep_file=self._same_file(entry, current))
+            return
+        await self._update(
+            filename,
+            width=result["width"],
+            height=result["height"],
+            duration=result["duration"],
+            poster=next((i["url"] for i in items if i["kind"] == "poster"), None),
+            derivatives={"status": "ready", "items": items},
+        )
+
+    @staticmethod
+    def _same_file(entry: dict[str, Any], current: dict[str, Any] | None) -> bool:
+        """Whether `current` replaced `entry` in place (a legacy file re-hashed)."""
+        return current is not None and current["path"] == entry["path"]
+
+    async def _release(self, entry: dict[str, Any], keep_file: bool = False) -> None:
+        """Deletes the stored file and derivatives of `entry` once no name references them."""
+        sha256 = entry.get("sha256")
+        if not sha256 or self.refcount(sha256) > 0:
+            return
+        file_path = self.file_path(entry)
+        derivative_path = os.path.join(self.derivative_dir, sha256)
+
+        def _delete() -> None:
+            if not keep_file and os.path.isfile(file_path):
+                os.remove(file_path)
+            shutil.rmtree(derivative_path, ignore_errors=True)
+
+        await anyio.to_thread.run_sync(_delete)
+
+    async def remove(self, filename: str) -> bool:
+        """Removes the name `filename`. Returns False if it was not indexed."""
+        async with self._lock:
+            entry = self._load_index().pop(filename, None)
+            if entry is None:
+                return False
+            await anyio.to_thread.run_sync(self._save_index)
+            await self._release(entry)
+            return True
+
+    def _sorted_view(self, field: str) -> list[tuple[Any, str]]:
+        cached = self._sorted.get(field)
+        if cached is not None and cached[0] == self._generation:
+            return cached[1]
+        index = self._load_index()
+        if field == "name":
+            view = sorted((name.lower(), name) for name in index)
+        else:
+            view = sorted((index[name].get(field) or 0, name) for name in index)
+        self._sorted[field] = (self._generation, view)
+        return view
+
+    @staticmethod
+    def _encode_cursor(position: tuple[Any, str]) -> str:
+        raw = json.dumps(list(position), separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    @staticmethod
+    def _decode_cursor(cursor: str) -> tuple[Any, str]:
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            key, name = json.loads(raw)
+        except Exception as err:
+            raise ValueError("Invalid cursor") from err
+        return key, name
+
+    def page(
+        self,
+        cursor: str | None = None,
+        limit: int = 50,
+        file_type: str | None = None,
+        sort: str = "name",
+    ) -> dict[str, Any]:
+        """
+        Returns one page of entries in `sort` order (`name`, `mtime`, `size`; prefix `-`
+        for descending) after the opaque `cursor`, plus the cursor of the next page.
+
+        Sorted views are cached per index generation, so a page costs a binary search
+        plus `limit` lookups instead of a directory scan.
+        """
+        field = sort.removeprefix("-")
+        if field not in SORT_FIELDS:
+            raise ValueError(f"Unsupported sort field: {field}")
+        descending = sort.startswith("-")
+        view = self._sorted_view(field)
+        index = self._load_index()
+
+        if cursor:
+            position = self._decode_cursor(cursor)
+            try:
+                # Descending pages continue at the last key below the cursor
+                start = (
+                    bisect_left(view, position) - 1
+                    if descending
+                    else bisect_right(view, position)
+                )
+            except TypeError as err:
+                raise ValueError("Cursor does not match sort order") from err
+        else:
+            start = len(view) - 1 if descending else 0
+
+        step = -1 if descending else 1
+        items: list[dict[str, Any]] = []
+        last: tuple[Any, str] | None = None
+        i = start
+        while 0 <= i < len(view):
+            entry = index.get(view[i][1])
+            if entry is not None and (not file_type or entry["type"] == file_type):
+                if len(items) == limit:
+                    break
+                items.append(dict(entry))
+                last = view[i]
+            i += step
+        has_more = 0 <= i < len(view)
+        total = sum(
+            1 for e in index.values() if not file_type or e["type"] == file_type
+        )
+        return {
+            "items": items,
+            "next_cursor": self._encode_cursor(last) if has_more and last else None,
+            "total": total,
+        }
+
+    def _scan(self, index: dict[str, dict[str, Any]]) -> dict[str, Any]:
+        """
+        Collects the on-disk state needed by `reconcile` (runs in a worker thread, on
+        a snapshot of the index taken on the event loop).
+        """
+        now = time.time()
+        root_files: dict[str, os.stat_result] = {}
+        orphan_paths: list[str] = []
+        with contextlib.suppress(FileNotFoundError):
+            for item in os.scandir(self.upload_dir):
+                if item.is_file() and media_type(item.name):
+                    root_files[item.name] = item.stat()
+        referenced = {e["path"] for e in index.values()}
+        hashes = {e.get("sha256") for e in index.values()}
+        with contextlib.suppress(FileNotFoundError):
+            for item in os.scandir(self.media_dir):
+                if f"media/{item.name}" in referenced:
+                    continue
+                if now - item.stat().st_mtime > _ORPHAN_GRACE_SECONDS:
+                    orphan_paths.append(item.path)
+        with contextlib.suppress(FileNotFoundError):
+            for item in os.scandir(self.derivative_dir):
+                if (
+                    item.is_dir()
+                    and item.name not in hashes
+                    and now - item.stat().st_mtime > _ORPHAN_GRACE_SECONDS
+                ):
+                    orphan_paths.append(item.path)
+        missing = [
+            name for name, e in index.items() if not os.path.isfile(self.file_path(e))
+        ]
+        return {"root_files": root_files, "orphans": orphan_paths, "missing": missing}
+
+    async def reconcile(self) -> dict[str, int]:
+        """
+        Brings the index in line with the disk: drops entries whose file is gone,
+        indexes (or re-hashes changed) files in UPLOAD_DIR, re-renders derivatives
+        that are out of date and deletes stale orphaned blobs, upload temp files and
+        derivative directories.
+        """
+        snapshot = {name: dict(e) for name, e in self._load_index().items()}
+        scan = await anyio.to_thread.run_sync(self._scan, snapshot)
+        stats = {"added": 0, "updated": 0, "removed": 0, "orphans": 0}
+
+        for name in scan["missing"]:
+            stats["removed"] += await self.remove(name)
+
+        for name, stat in scan["root_files"].items():
+            entry = self.get(name)
+            if entry is not None and entry["path"] != name:
+                # Name taken by a stored upload; the legacy file stays unlisted
+                continue
+            if (
+                entry is not None
+                and entry["size"] == stat.st_size
+                and (abs(entry.get("mtime", 0) - stat.st_mtime) < 1)
+            ):
+                continue
+            file_type = media_type(name)
+            assert file_type is not None
+            await self._index_in_place(name, file_type)
+            stats["updated" if entry else "added"] += 1
+
+        for name, entry in list(self._load_index().items()):
+            if self._needs_rerender(entry):
+                self._schedule(name)
+
+        def _delete(paths: list[str]) -> None:
+            for path in paths:
+                if os.path.isdir(path):
+                    shutil.rmtree(path, ignore_errors=True)
+                else:
+                    with contextlib.suppress(FileNotFoundError):
+                        os.remove(path)
+
+        if scan["orphans"]:
+            await anyio.to_thread.run_sync(_delete, scan["orphans"])
+            stats["orphans"] = len(scan["orphans"])
+        self._reconciled = True
+        if any(stats.values()):
+            logger.info("Media index reconciled", **stats)
+        return stats
+
+    async def ensure_reconciled(self) -> None:
+        """Reconciles once per process so files that predate the index are listed."""
+        if self._reconciled:
+            return
+        # Concurrent first listings wait for the same reconcile instead of each running one
+        async with self._reconcile_lock:
+            if not self._reconciled:
+                await self.reconcile()
+
+    @staticmethod
+    def manifest(entry: dict[str, Any]) -> dict[str, Any]:
+        """Builds a srcset-ready description of an entry's derivatives."""
+        items = entry["derivatives"]["items"]
+        sources = []
+        for fmt in DERIVATIVE_FORMATS:
+            variants = sorted(
+                (v for v in items if v["format"] == fmt), key=lambda v: v["width"]
+            )
+            if variants:
+                sources.append(
+                    {
+                        "type": FORMAT_MIME_TYPES[fmt],
+                        "srcset": ", ".join(
+                            f"{v['url']} {v['width']}w" for v in variants
+                        ),
+                    }
+                )
+        return {
+            "filename": entry["filename"],
+            "url": entry["url"],
+            "width": entry.get("width"),
+            "height": entry.get("height"),
+            "status": entry["derivatives"]["status"],
+            "poster": entry.get("poster"),
+            "sources": sources,
+            "variants": items,
+        }
+
+    @staticmethod
+    def video_sources(entry: dict[str, Any]) -> list[dict[str, str]]:
+        """<source> candidates for a video background, lightest first, original last."""
+        by_kind = {i.get("kind"): i for i in entry["derivatives"]["items"]}
+        sources = [
+            {"src": by_kind[kind]["url"], "type": mime}
+            for kind, mime in (("loop", "video/webm"), ("720p", "video/mp4"))
+            if kind in by_kind
+        ]
+        ext = os.path.splitext(entry["path"])[1].lower().lstrip(".")
+        original_type = "video/quicktime" if ext == "mov" else f"video/{ext}"
+        sources.append({"src": entry["url"], "type": original_type})
+        return sources
+
+    @staticmethod
+    def best_variant(
+        entry: dict[str, Any], accept: str, width: int | None
+    ) -> dict[str, Any] | None:
+        """
+        Picks the variant to serve for an `Accept` header and desired width: the best
+        supported format, then the smallest variant at least `width` wide (or the
+        largest one if none is wide enough). Returns None if no variant fits.
+        """
+        accept = accept.lower()
+        items = entry["derivatives"]["items"]
+        for fmt in DERIVATIVE_FORMATS:
+            if FORMAT_MIME_TYPES[fmt] not in accept:
+                continue
+            variants = sorted(
+                (v for v in items if v["format"] == fmt), key=lambda v: v["width"]
+            )
+            if not variants:
+                continue
+            if not width:
+                return variants[-1]
+            return next((v for v in variants if v["width"] >= width), variants[-1])
+        return None
+
+    def variant_path(self, variant: dict[str, Any]) -> str:
+        return os.path.join(
+            self.derivative_dir, variant["url"].removeprefix(DERIVATIVE_URL_PREFIX)
+        )
+
+
+media_library = MediaLibrary()
+
+
+async def run_media_reconcile() -> None:
+    """Scheduled job: periodic reconcile of the media index with the upload dir."""
+    await media_library.reconcile()
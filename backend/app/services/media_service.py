@@ -0,0 +1,186 @@
+import hashlib
+import os
+import tempfile
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import IO
+
+import anyio
+from fastapi import Request
+from multipart.multipart import MultipartParser, parse_options_header
+
+# Slack for multipart boundaries and part headers when pre-checking Content-Length
+_MULTIPART_OVERHEAD = 64 * 1024
+
+
+class UploadError(Exception):
+    def __init__(self, status_code: int, detail: str) -> None:
+        self.status_code = status_code
+        self.detail = detail
+        super().__init__(detail)
+
+
+@dataclass
+class StoredUpload:
+    filename: str
+    path: str
+    size: int
+    sha256: str
+    content_type: str | None = None
+
+
+def _write_chunk(f: IO[bytes], hasher: "hashlib._Hash", data: bytes) -> None:
+    # hashlib releases the GIL for large buffers, so hashing runs alongside the write
+    hasher.update(data)
+    f.write(data)
+
+
+def _discard(f: IO[bytes] | None, path: str | None) -> None:
+    if f is not None:
+        f.close()
+    if path and os.path.exists(path):
+        os.remove(path)
+
+
+async def receive_upload(
+    request: Request,
+    dest_dir: str,
+    max_bytes: int,
+    validate_filename: Callable[[str], None],
+    field_name: str = "file",
+    name_for: Callable[[str, str], str] | None = None,
+) -> StoredUpload:
+    """
+    Streams a multipart file field from `request` into `dest_dir` without buffering it.
+
+    The body is parsed chunk by chunk, written to a temp file in a worker thread and
+    hashed while streaming. The upload is aborted as soon as it exceeds `max_bytes`
+    and only moved into place (atomic rename) once it completed successfully.
+    `validate_filename` may raise UploadError to reject a file before any data is written.
+    `name_for(filename, sha256)` picks the stored file name (default: the client's name).
+    """
+    content_type, params = parse_options_header(request.headers.get("content-type"))
+    boundary = params.get(b"boundary")
+    if content_type != b"multipart/form-data" or not boundary:
+        raise UploadError(400, "Expected multipart/form-data upload")
+
+    too_large = f"File too large (max {max_bytes // 1024 // 1024}MB)"
+    content_length = request.headers.get("content-length", "")
+    if (
+        content_length.isdigit()
+        and int(content_length) > max_bytes + _MULTIPART_OVERHEAD
+    ):
+        raise UploadError(413, too_large)
+
+    # Parser callbacks are synchronous; they only queue events that are applied
+    # asynchronously after each fed chunk.
+    events: list[tuple[str, bytes]] = []
+    header_field = bytearray()
+    header_value = bytearray()
+    part_headers: dict[bytes, bytes] = {}
+
+    def on_header_field(data: bytes, start: int, end: int) -> None:
+        header_field.extend(data[start:end])
+
+    def on_header_value(data: bytes, start: int, end: int) -> None:
+        header_value.extend(data[start:end])
+
+    def on_header_end() -> None:
+        part_headers[bytes(header_field).lower()] = bytes(header_value)
+        header_field.clear()
+        header_value.clear()
+
+    def on_headers_finished() -> None:
+        _, disposition = parse_options_header(
+            part_headers.get(b"content-disposition", b"")
+        )
+        if (
+            disposition.get(b"name") == field_name.encode()
+            and b"filename" in disposition
+        ):
+            events.append(("begin", disposition[b"filename"]))
+            events.append(("type", part_headers.get(b"content-type", b"")))
+        part_headers.clear()
+
+    def on_part_data(data: bytes, start: int, end: int) -> None:
+        events.append(("data", data[start:end]))
+
+    def on_part_end() -> None:
+        events.append(("end", b""))
+
+    parser = MultipartParser(
+        boundary,
+        {
+            "on_header_field": on_header_field,
+            "on_header_value": on_header_value,
+            "on_header_end": on_header_end,
+            "on_headers_finished": on_headers_finished,
+            "on_part_data": on_part_data,
+            "on_part_end": on_part_end,
+        },
+    )
+
+    hasher = hashlib.sha256()
+    tmp_file: IO[bytes] | None = None
+    tmp_path: str | None = None
+    filename: str | None = None
+    part_type: str | None = None
+    size = 0
+    in_file = False
+    done = False
+
+    try:
+        async for chunk in request.stream():
+            if not chunk:
+                continue
+            parser.write(chunk)
+            pending: list[bytes] = []
+            for kind, payload in events:
+                if kind == "begin" and filename is None:
+                    filename = os.path.basename(
+                        payload.decode("utf-8", errors="replace").replace("\\", "/")
+                    )
+                    validate_filename(filename)
+                    await anyio.to_thread.run_sync(os.makedirs, dest_dir, 0o755, True)
+                    fd, tmp_path = tempfile.mkstemp(dir=dest_dir, prefix=".upload-")
+                    tmp_file = os.fdopen(fd, "wb")
+                    in_file = True
+                elif kind == "type" and in_file:
+                    part_type = payload.decode("latin-1") or None
+                elif kind == "data" and in_file:
+                    size += len(payload)
+                    if size > max_bytes:
+                        raise UploadError(413, too_large)
+                    pending.append(payload)
+                elif kind == "end" and in_file:
+                    in_file = False
+                    done = True
+            events.clear()
+            if pending and tmp_file is not None:
+                await anyio.to_thread.run_sync(
+                    _write_chunk, tmp_file, hasher, b"".join(pending)
+                )
+            if done:
+                break
+
+        parser.finalize()
+        if not done or tmp_file is None or tmp_path is None or not filename:
+            raise UploadError(400, "No file uploaded")
+
+        sha256 = hasher.hexdigest()
+        stored_name = name_for(filename, sha256) if name_for else filename
+        final_path = os.path.join(dest_dir, stored_name)
+        await anyio.to_thread.run_sync(tmp_file.close)
+        await anyio.to_thread.run_sync(os.replace, tmp_path, final_path)
+        tmp_file = None
+        tmp_path = None
+        return StoredUpload(
+            filename=filename,
+            path=final_path,
+            size=size,
+            sha256=sha256,
+            content_type=part_type,
+        )
+    finally:
+        if tmp_file is not None or tmp_path is not None:
+            await anyio.to_thread.run_sync(_discard, tmp_file, tmp_path)
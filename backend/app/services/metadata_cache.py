@@ -0,0 +1,218 @@
+import asyncio
+import contextlib
+import json
+import os
+import time
+import urllib.parse
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+import structlog
+from anyio import Path
+
+from app.core.config import settings
+
+logger = structlog.get_logger()
+
+MetadataFetcher = Callable[[str], Awaitable[tuple[dict[str, str | None], bool]]]
+
+_META_FIELDS = ("title", "description", "icon")
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def normalize_url(url: str) -> str:
+    """
+    Normalises a URL into a stable cache key: scheme and host case and the default
+    port. Path and query are kept as-is, servers may treat `/a` and `/a/` (or `?q=`
+    and no query) differently.
+    """
+    parsed = urllib.parse.urlsplit(url.strip())
+    scheme = parsed.scheme.lower()
+    host = (parsed.hostname or "").lower()
+    if parsed.port and parsed.port != _DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parsed.port}"
+    if parsed.username or parsed.password:
+        userinfo = parsed.netloc.rpartition("@")[0]
+        host = f"{userinfo}@{host}"
+    path = parsed.path or "/"
+    return urllib.parse.urlunsplit((scheme, host, path, parsed.query, parsed.fragment))
+
+
+class MetadataCache:
+    """
+    Persistent LRU cache for page metadata (title, description, icon).
+
+    Successful lookups are kept for `ttl` seconds, failed lookups for the shorter
+    `negative_ttl` so unreachable hosts are not hit on every attempt. Entries are
+    stored under DATA_DIR and survive restarts; writes are batched into one save
+    `save_delay` seconds after the first change (and on `flush`).
+    """
+
+    def __init__(
+        self,
+        file_path: str | None = None,
+        ttl: int | None = None,
+        negative_ttl: int | None = None,
+        max_entries: int | None = None,
+        save_delay: float | None = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._file_path = Path(
+            file_path or os.path.join(settings.DATA_DIR, "metadata_cache.json")
+        )
+        self.ttl = ttl if ttl is not None else settings.METADATA_CACHE_TTL_SECONDS
+        self.negative_ttl = (
+            negative_ttl
+            if negative_ttl is not None
+            else settings.METADATA_CACHE_NEGATIVE_TTL_SECONDS
+        )
+        self.max_entries = (
+            max_entries
+            if max_entries is not None
+            else settings.METADATA_CACHE_MAX_ENTRIES
+        )
+        self.save_delay = (
+            save_delay
+            if save_delay is not None
+            else settings.METADATA_CACHE_SAVE_DELAY_SECONDS
+        )
+        self._clock = clock
+        self._entries: OrderedDict[str, dict[str, Any]] = OrderedDict()
+        self._loaded = False
+        self._lock = asyncio.Lock()
+        self._inflight: dict[str, asyncio.Future[dict[str, str | None]]] = {}
+        self._save_lock = asyncio.Lock()
+        self._save_task: asyncio.Task[None] | None = None
+        self._dirty = False
+
+    async def _load(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            if not await self._file_path.exists():
+                return
+            data = json.loads(await self._file_path.read_text(encoding="utf-8"))
+            now = self._clock()
+            for key, entry in (data.get("entries") or {}).items():
+                if isinstance(entry, dict) and entry.get("expires_at", 0) > now:
+                    self._entries[key] = entry
+        except Exception as err:
+            logger.warning(
+                "Failed loading metadata cache, starting empty",
+                path=str(self._file_path),
+                error=str(err),
+            )
+            self._entries.clear()
+
+    async def _persist(self) -> None:
+        async with self._save_lock:
+            if not self._dirty:
+                return
+            self._dirty = False
+            content = json.dumps({"version": 1, "entries": self._entries})
+            tmp_path = Path(f"{self._file_path}.tmp")
+            try:
+                parent = self._file_path.parent
+                if not await parent.exists():
+                    await parent.mkdir(parents=True, exist_ok=True)
+                await tmp_path.write_text(content, encoding="utf-8")
+                await tmp_path.rename(self._file_path)
+            except Exception as err:
+                self._dirty = True
+                logger.warning(
+                    "Failed persisting metadata cache",
+                    path=str(self._file_path),
+                    error=str(err),
+                )
+
+    def _mark_dirty(self) -> None:
+        self._dirty = True
+        if self._save_task is None or self._save_task.done():
+            self._save_task = asyncio.get_running_loop().create_task(self._save_later())
+
+    async def _save_later(self) -> None:
+        await asyncio.sleep(self.save_delay)
+        await self._persist()
+
+    async def flush(self) -> None:
+        """Writes pending changes now (e.g. on shutdown)."""
+        task, self._save_task = self._save_task, None
+        if task is not None and not task.done():
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        await self._persist()
+
+    async def get(self, url: str) -> dict[str, str | None] | None:
+        """Returns cached metadata for `url` (empty fields for cached failures) or None on a miss."""
+        key = normalize_url(url)
+        async with self._lock:
+            await self._load()
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.get("expires_at", 0) <= self._clock():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return {field: entry.get(field) for field in _META_FIELDS}
+
+    async def set(self, url: str, meta: dict[str, str | None], ok: bool) -> None:
+        key = normalize_url(url)
+        lifetime = self.ttl if ok else self.negative_ttl
+        async with self._lock:
+            await self._load()
+            self._entries[key] = {
+                **{field: meta.get(field) for field in _META_FIELDS},
+                "ok": ok,
+                "expires_at": self._clock() + lifetime,
+            }
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._mark_dirty()
+
+    async def get_or_fetch(
+        self, url: str, fetcher: MetadataFetcher
+    ) -> dict[str, str | None]:
+        """
+        Returns cached metadata or runs `fetcher` once per URL, sharing the result
+        with concurrent callers asking for the same URL.
+        """
+        cached = await self.get(url)
+        if cached is not None:
+            return cached
+
+        key = normalize_url(url)
+        pending = self._inflight.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future: asyncio.Future[dict[str, str | None]] = (
+            asyncio.get_running_loop().create_future()
+        )
+        self._inflight[key] = future
+        try:
+            meta, ok = await fetcher(url)
+            await self.set(url, meta, ok)
+            future.set_result(meta)
+            return meta
+        except BaseException as err:
+            future.set_exception(err)
+            # Mark retrieved so an unawaited failure does not log a warning
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    async def clear(self) -> None:
+        async with self._lock:
+            self._entries.clear()
+            self._loaded = True
+            self._dirty = True
+        await self.flush()
+
+
+metadata_cache = MetadataCache()
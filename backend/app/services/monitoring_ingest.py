@@ -0,0 +1,301 @@
+import codecs
+import contextlib
+import datetime
+import hashlib
+import hmac
+import json
+from collections.abc import AsyncIterator, Iterable
+from typing import Any
+
+from app.repositories.repos import MonitoringRepository
+from app.schemas.monitoring import (
+    MonitoringConfig,
+    MonitoringEntity,
+    MonitoringProviderConfig,
+)
+
+WEBHOOK_PROVIDER_TYPE = "webhook"
+# Largest single entity state accepted from a streamed batch
+_MAX_ITEM_CHARS = 1024 * 1024
+_decoder = json.JSONDecoder()
+
+
+class IngestError(ValueError):
+    pass
+
+
+async def ingest_entities(
+    updates: Iterable[dict[str, Any]], partial: bool = False
+) -> tuple[int, int]:
+    """
+    Applies entity updates to monitoring.json in a single locked read-modify-write.
+
+    Each update is a MonitoringEntity dict keyed by `id`. With `partial`, fields missing
+    from an update keep their stored values instead of being reset to defaults.
+    Invalid updates are skipped. Returns (applied, total entities).
+    """
+    repo = MonitoringRepository()
+    async with repo.lock:
+        config = await repo.get_config()
+        ent_map = {e.id: e for e in config.entities}
+        applied = 0
+        for update in updates:
+            if not isinstance(update, dict) or "id" not in update:
+                continue
+            data = update
+            if partial:
+                existing = ent_map.get(update["id"])
+                base = (
+                    existing.model_dump() if existing else {"name": str(update["id"])}
+                )
+                data = {**base, **update}
+            with contextlib.suppress(Exception):
+                ent_map[update["id"]] = MonitoringEntity(**data)
+                applied += 1
+        if applied:
+            config.entities = list(ent_map.values())
+            await repo.save_config(config)
+    return applied, len(ent_map)
+
+
+def _coerce_state(state: Any) -> tuple[Any, str]:
+    if isinstance(state, bool):
+        return state, "boolean"
+    if isinstance(state, (int, float)):
+        return state, "numeric"
+    if isinstance(state, str):
+        with contextlib.suppress(ValueError):
+            number = float(state)
+            return (int(number) if number.is_integer() else number), "numeric"
+        return state, "string"
+    return "N/A" if state is None else str(state), "string"
+
+
+def entity_update_from_state(
+    item: Any, provider_id: str, now_iso: str | None = None
+) -> dict[str, Any] | None:
+    """
+    Converts a Home Assistant-style state (`{entity_id, state, attributes}`) into a
+    partial entity update, or None if it has no entity id.
+    """
+    if not isinstance(item, dict):
+        return None
+    entity_id = item.get("entity_id") or item.get("id")
+    if not isinstance(entity_id, str) or not entity_id:
+        return None
+    attributes = item.get("attributes")
+    if not isinstance(attributes, dict):
+        attributes = {}
+    state, value_type = _coerce_state(item.get("state"))
+    update: dict[str, Any] = {
+        "id": entity_id,
+        "provider_id": provider_id,
+        "domain": entity_id.split(".", 1)[0] if "." in entity_id else "sensor",
+        "state": state,
+        "value_type": value_type,
+        "attributes": attributes,
+        "last_updated": item.get("last_updated")
+        or item.get("last_changed")
+        or now_iso
+        or datetime.datetime.now(datetime.UTC).isoformat(),
+    }
+    for field, key in (
+        ("name", "friendly_name"),
+        ("unit_of_measurement", "unit_of_measurement"),
+        ("icon", "icon"),
+    ):
+        if attributes.get(key):
+            update[field] = str(attributes[key])
+    return update
+
+
+def _digest(secret: str) -> bytes:
+    return hashlib.sha256(secret.encode("utf-8")).digest()
+
+
+class _WebhookProviderIndex:
+    """
+    Enabled webhook providers keyed by the SHA-256 digest of their secret.
+
+    monitoring.json is only written by the backend, so the index is rebuilt from
+    every saved config (save listener) and re-read only when the repository
+    generation it was built for is out of date, e.g. on the first lookup.
+    """
+
+    def __init__(self) -> None:
+        self._providers: tuple[tuple[bytes, MonitoringProviderConfig], ...] = ()
+        self._version: tuple | None = None
+
+    @staticmethod
+    def _current_version() -> tuple:
+        repo = MonitoringRepository()
+        return (str(repo.file_path), repo.generation)
+
+    def _load(self, config: MonitoringConfig, version: tuple) -> None:
+        providers = []
+        for provider in config.providers:
+            expected = (provider.settings or {}).get("secret")
+            if provider.type != WEBHOOK_PROVIDER_TYPE or not provider.enabled:
+                continue
+            if isinstance(expected, str) and expected:
+                providers.append((_digest(expected), provider))
+        self._providers = tuple(providers)
+        self._version = version
+
+    def config_saved(self, config: MonitoringConfig) -> None:
+        self._load(config, self._current_version())
+
+    async def lookup(self, secret: str) -> MonitoringProviderConfig | None:
+        # Taken before reading, so a save racing the read forces another reload
+        version = self._current_version()
+        if version != self._version:
+            self._load(await MonitoringRepository().get_config(), version)
+        provided = _digest(secret)
+        match = None
+        for digest, provider in self._providers:
+            # Every provider is compared so the timing does not reveal which one matched
+            if hmac.compare_digest(digest, provided) and match is None:
+                match = provider
+        return match
+
+
+_provider_index = _WebhookProviderIndex()
+MonitoringRepository.add_save_listener(_provider_index.config_saved)
+
+
+async def webhook_provider(secret: str | None) -> MonitoringProviderConfig | None:
+    """Returns the enabled webhook provider whose `settings.secret` matches `secret`."""
+    if not secret:
+        return None
+    return await _provider_index.lookup(secret)
+
+
+async def iter_json_items(
+    chunks: AsyncIterator[bytes], max_bytes: int, ndjson: bool = False
+) -> AsyncIterator[Any]:
+    """
+    Incrementally parses a streamed JSON body, yielding one item at a time.
+
+    A top-level array yields its elements as soon as each is complete and NDJSON one
+    item per line, so large batches are never buffered whole. The `entities` array of
+    a top-level object is streamed the same way; an object without one is yielded
+    itself. Raises IngestError for malformed or oversized bodies (items before the
+    error have already been yielded).
+    """
+    stream = chunks.__aiter__()
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    buf = ""
+    pos = 0
+    received = 0
+    eof = False
+
+    async def fill() -> None:
+        nonlocal buf, pos, received, eof
+        buf = buf[pos:]
+        pos = 0
+        try:
+            chunk = await stream.__anext__()
+        except StopAsyncIteration:
+            buf += utf8.decode(b"", final=True)
+            eof = True
+            return
+        received += len(chunk)
+        if received > max_bytes:
+            raise IngestError(f"Body too large (max {max_bytes} bytes)")
+        buf += utf8.decode(chunk)
+
+    async def peek(separators: str = " \t\r\n") -> str:
+        """Next significant character ("" at the end of the body)."""
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in separators:
+                pos += 1
+            if pos < len(buf):
+                return buf[pos]
+            if eof:
+                return ""
+            await fill()
+
+    async def value() -> Any:
+        nonlocal pos
+        while True:
+            try:
+                item, end = _decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError as err:
+                if eof:
+                    raise IngestError(f"Invalid JSON: {err.msg}") from err
+                if len(buf) - pos > _MAX_ITEM_CHARS:
+                    raise IngestError("JSON item too large") from err
+                await fill()
+                continue
+            if end == len(buf) and not eof:
+                # A number may continue in the next chunk
+                await fill()
+                continue
+            pos = end
+            return item
+
+    async def elements() -> AsyncIterator[Any]:
+        nonlocal pos
+        while True:
+            char = await peek(" \t\r\n,")
+            if char == "]":
+                pos += 1
+                return
+            if not char:
+                raise IngestError("Unterminated JSON array")
+            if char != "{":
+                raise IngestError("Expected JSON objects")
+            yield await value()
+
+    if ndjson:
+        while char := await peek():
+            if char != "{":
+                raise IngestError("Expected JSON objects")
+            yield await value()
+        return
+
+    char = await peek()
+    if char == "[":
+        pos += 1
+        async for item in elements():
+            yield item
+    elif char == "{":
+        # Walked key by key so an `entities` array streams like a bare array
+        pos += 1
+        fields: dict[str, Any] = {}
+        streamed = False
+        if await peek() == "}":
+            pos += 1
+        else:
+            while True:
+                if await peek() != '"':
+                    raise IngestError("Invalid JSON object")
+                key = await value()
+                if await peek() != ":":
+                    raise IngestError("Invalid JSON object")
+                pos += 1
+                if not await peek():
+                    raise IngestError("Invalid JSON object")
+                if key == "entities" and not streamed and buf[pos] == "[":
+                    pos += 1
+                    streamed = True
+                    async for item in elements():
+                        yield item
+                else:
+                    fields[key] = await value()
+                char = await peek()
+                pos += 1
+                if char == "}":
+                    break
+                if char != ",":
+                    raise IngestError("Invalid JSON object")
+        if await peek():
+            raise IngestError("Unexpected data after JSON object")
+        if not streamed:
+            yield fields
+        return
+    elif char:
+        raise IngestError("Expected JSON objects")
+    if await peek():
+        raise IngestError("Unexpected data after JSON array")
@@ -0,0 +1,109 @@
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from app.core.config import settings
+from app.schemas.monitoring import MonitoringConfig
+
+# Session of clients that ping /monitoring/active without reporting what they show
+LEGACY_CLIENT_ID = "legacy"
+OVERVIEW_ZONE_ID = "overview"
+
+
+@dataclass
+class ViewerSession:
+    client_id: str
+    zone_ids: frozenset[str] | None
+    card_ids: frozenset[str]
+    interval_seconds: float | None
+    last_seen: float
+
+
+@dataclass
+class CollectionDemand:
+    # None means every entity (a viewer did not report what it shows)
+    entity_ids: set[str] | None
+    interval_seconds: float | None = None
+    viewers: int = 0
+
+
+class MonitoringSessions:
+    """
+    Tracks which monitoring zones and cards each open client shows, so the collector
+    only fetches entities someone is looking at. Sessions expire without a ping for
+    MONITORING_SESSION_TTL_SECONDS.
+    """
+
+    def __init__(self) -> None:
+        self._sessions: dict[str, ViewerSession] = {}
+
+    def touch(
+        self,
+        client_id: str = LEGACY_CLIENT_ID,
+        zone_ids: Iterable[str] | None = None,
+        card_ids: Iterable[str] = (),
+        interval_seconds: float | None = None,
+    ) -> bool:
+        """Records a ping. Returns True if the client is new or changed its view."""
+        previous = self._sessions.get(client_id)
+        session = self._sessions[client_id] = ViewerSession(
+            client_id=client_id,
+            zone_ids=frozenset(zone_ids) if zone_ids is not None else None,
+            card_ids=frozenset(card_ids),
+            interval_seconds=interval_seconds,
+            last_seen=time.monotonic(),
+        )
+        return previous is None or (
+            previous.zone_ids,
+            previous.card_ids,
+            previous.interval_seconds,
+        ) != (session.zone_ids, session.card_ids, session.interval_seconds)
+
+    def end(self, client_id: str) -> bool:
+        return self._sessions.pop(client_id, None) is not None
+
+    def active(self) -> list[ViewerSession]:
+        cutoff = time.monotonic() - settings.MONITORING_SESSION_TTL_SECONDS
+        for client_id in [
+            cid for cid, s in self._sessions.items() if s.last_seen < cutoff
+        ]:
+            del self._sessions[client_id]
+        return list(self._sessions.values())
+
+    def has_viewers(self) -> bool:
+        return bool(self.active())
+
+    def demand(self, config: MonitoringConfig) -> CollectionDemand | None:
+        """
+        Union of the entities visible to any client and the fastest interval any of
+        them asked for. Returns None when nobody is watching.
+        """
+        sessions = self.active()
+        if not sessions:
+            return None
+        entity_ids: set[str] | None = set()
+        intervals = [s.interval_seconds for s in sessions if s.interval_seconds]
+        for session in sessions:
+            if session.zone_ids is None:
+                entity_ids = None
+                break
+            for card in config.cards:
+                if card.id in session.card_ids or (
+                    not card.hidden
+                    and (
+                        card.zone_id in session.zone_ids
+                        or OVERVIEW_ZONE_ID in session.zone_ids
+                    )
+                ):
+                    entity_ids.update(card.entity_ids)
+        return CollectionDemand(
+            entity_ids=entity_ids,
+            interval_seconds=min(intervals) if intervals else None,
+            viewers=len(sessions),
+        )
+
+    def clear(self) -> None:
+        self._sessions.clear()
+
+
+monitoring_sessions = MonitoringSessions()
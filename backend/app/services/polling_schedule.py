@@ -0,0 +1,166 @@
+import time
+from collections.abc import Callable, Collection, Iterable, Mapping
+from dataclasses import dataclass
+from typing import Any
+
+from app.core.config import settings
+from app.schemas.monitoring import MonitoringConfig
+
+# Card settings overriding the adaptive interval of the card's entities
+FIXED_INTERVAL_KEY = "pollIntervalSeconds"
+MIN_INTERVAL_KEY = "minPollIntervalSeconds"
+MAX_INTERVAL_KEY = "maxPollIntervalSeconds"
+
+_UNSEEN = object()
+
+
+@dataclass
+class EntityPollState:
+    interval: float
+    next_due: float
+    min_interval: float
+    last_polled: float
+    last_state: Any = _UNSEEN
+    last_changed: float | None = None
+    polls: int = 0
+    changes: int = 0
+
+
+def _positive(value: Any) -> float | None:
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if number > 0 else None
+
+
+def entity_poll_bounds(
+    config: MonitoringConfig, min_interval: float, max_interval: float
+) -> dict[str, tuple[float, float]]:
+    """
+    Per-entity (min, max) polling interval from card settings. `pollIntervalSeconds`
+    pins an interval; `minPollIntervalSeconds` / `maxPollIntervalSeconds` narrow the
+    adaptive range. An entity shown on several cards gets the tightest bounds.
+    Entities without overrides are omitted.
+    """
+    bounds: dict[str, tuple[float, float]] = {}
+    for card in config.cards:
+        card_settings = card.settings or {}
+        fixed = _positive(card_settings.get(FIXED_INTERVAL_KEY))
+        low = fixed or _positive(card_settings.get(MIN_INTERVAL_KEY)) or min_interval
+        high = fixed or _positive(card_settings.get(MAX_INTERVAL_KEY)) or max_interval
+        if low == min_interval and high == max_interval:
+            continue
+        high = max(low, high)
+        for eid in card.entity_ids:
+            prev_low, prev_high = bounds.get(eid, (low, high))
+            bounds[eid] = (min(prev_low, low), min(prev_high, high))
+    return bounds
+
+
+class AdaptivePollSchedule:
+    """
+    Polls each entity on its own interval, adapted to how often its state changes.
+
+    An entity starts at the minimum interval; every poll that returns an unchanged
+    state multiplies its interval by MONITORING_POLL_BACKOFF_FACTOR up to the maximum,
+    and a change snaps it back to the minimum. Volatile sensors therefore stay near the
+    base interval while stable ones (speedtests, uptime) back off.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic) -> None:
+        self._clock = clock
+        self._entities: dict[str, EntityPollState] = {}
+        self._next_discovery = 0.0
+
+    def due(self, entity_ids: Iterable[str]) -> set[str]:
+        """Entities whose next poll is due (never polled ones included)."""
+        now = self._clock()
+        due = set()
+        for eid in entity_ids:
+            state = self._entities.get(eid)
+            if state is None or state.next_due <= now:
+                due.add(eid)
+        return due
+
+    def discovery_due(self) -> bool:
+        """Whether a full fetch to pick up newly shared entities is due."""
+        return self._next_discovery <= self._clock()
+
+    def record(
+        self,
+        polled: Collection[str],
+        states: Mapping[str, Any],
+        min_interval: float,
+        max_interval: float,
+        overrides: Mapping[str, tuple[float, float]] | None = None,
+        discovery: bool = False,
+    ) -> None:
+        """
+        Records a poll of `polled` (plus any extra entities in `states`) and schedules
+        each one's next poll. An entity missing from `states` counts as unchanged.
+        """
+        overrides = overrides or {}
+        now = self._clock()
+        for eid in {*polled, *states}:
+            low, high = overrides.get(
+                eid, (min_interval, max(min_interval, max_interval))
+            )
+            entry = self._entities.get(eid)
+            if entry is None:
+                entry = self._entities[eid] = EntityPollState(
+                    interval=low, next_due=now, min_interval=low, last_polled=now
+                )
+            seen = entry.last_state is not _UNSEEN
+            if eid in states and (not seen or states[eid] != entry.last_state):
+                if seen:
+                    entry.changes += 1
+                entry.last_state = states[eid]
+                entry.last_changed = now
+                entry.interval = low
+            else:
+                entry.interval *= settings.MONITORING_POLL_BACKOFF_FACTOR
+            entry.interval = min(high, max(low, entry.interval))
+            entry.polls += 1
+            entry.min_interval = low
+            entry.last_polled = now
+            entry.next_due = now + entry.interval
+        if discovery:
+            self._next_discovery = now + max(min_interval, max_interval)
+
+    def mark_changed(self, entity_ids: Iterable[str]) -> float | None:
+        """
+        Pulls in the next poll of entities known to have changed (e.g. pushed by the
+        sidecar) to their minimum interval after the last poll. Returns the seconds
+        until the earliest of them is due, or None if none is scheduled.
+        """
+        now = self._clock()
+        delays = []
+        for eid in entity_ids:
+            entry = self._entities.get(eid)
+            if entry is None:
+                continue
+            entry.interval = entry.min_interval
+            entry.next_due = min(entry.next_due, entry.last_polled + entry.interval)
+            delays.append(max(0.0, entry.next_due - now))
+        return min(delays) if delays else None
+
+    def next_delay(self, entity_ids: Iterable[str], fallback: float) -> float:
+        """Seconds until the earliest of `entity_ids` is due again."""
+        now = self._clock()
+        delays = [
+            (self._entities[eid].next_due - now if eid in self._entities else 0.0)
+            for eid in entity_ids
+        ]
+        return max(0.0, min(delays)) if delays else fallback
+
+    def interval(self, eid: str) -> float | None:
+        entry = self._entities.get(eid)
+        return entry.interval if entry else None
+
+    def clear(self) -> None:
+        self._entities.clear()
+        self._next_discovery = 0.0
+
+
+poll_schedule = AdaptivePollSchedule()
@@ -1,36 +1,123 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+
 import httpx
+import structlog
 
+from app.core.config import settings
 from app.core.premium_apps import AppRegistry, PremiumAppDefinition
 
+logger = structlog.get_logger()
+
+# Retry interval for registries whose last fetch failed
+_FAILURE_RETRY_SECONDS = 60.0
+
+
+@dataclass
+class _RegistryCacheEntry:
+    apps: list[PremiumAppDefinition] = field(default_factory=list)
+    etag: str | None = None
+    last_modified: str | None = None
+    expires_at: float = 0.0
+    version: int = 0
+
+
+_registry_cache: dict[str, _RegistryCacheEntry] = {}
+_refresh_tasks: dict[str, asyncio.Task[None]] = {}
+_merged_cache: tuple[tuple, list[PremiumAppDefinition]] | None = None
+_merged_version = 0
+
 
 class RegistryService:
+    @property
+    def catalog_version(self) -> int:
+        """Changes whenever the merged premium catalog is rebuilt."""
+        return _merged_version
+
+    @staticmethod
+    def _parse_registry(data: object) -> list[PremiumAppDefinition]:
+        if not isinstance(data, list):
+            raise ValueError("Registry data must be a list of app definitions")
+
+        apps = []
+        for item in data:
+            # Validate basic structure
+            if not isinstance(item, dict) or not all(
+                key in item for key in ["id", "name", "description", "default_icon"]
+            ):
+                continue
+            apps.append(PremiumAppDefinition(**item))
+        return apps
+
     async def fetch_registry(self, url: str) -> list[PremiumAppDefinition]:
         """
         Fetches a registry from a given URL and validates its content.
         """
         try:
-            async with httpx.AsyncClient(verify=False, timeout=10.0) as client:
+            async with httpx.AsyncClient(
+                verify=False, timeout=settings.REGISTRY_FETCH_TIMEOUT_SECONDS
+            ) as client:
                 response = await client.get(url)
                 response.raise_for_status()
-                data = response.json()
-
-                if not isinstance(data, list):
-                    raise ValueError("Registry data must be a list of app definitions")
-
-                apps = []
-                for item in data:
-                    # Validate basic structure
-                    if not all(
-                        key in item
-                        for key in ["id", "name", "description", "default_icon"]
-                    ):
-                        continue
-                    apps.append(PremiumAppDefinition(**item))
-                return apps
+                return self._parse_registry(response.json())
         except Exception as e:
             print(f"Error fetching registry from {url}: {e}", flush=True)
             return []
 
+    async def _revalidate(self, client: httpx.AsyncClient, url: str) -> None:
+        """Conditionally refreshes one cached registry. Keeps the last good copy on failure."""
+        entry = _registry_cache.setdefault(url, _RegistryCacheEntry())
+        headers = {}
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+
+        try:
+            response = await client.get(url, headers=headers)
+            if response.status_code != 304:
+                response.raise_for_status()
+                entry.apps = self._parse_registry(response.json())
+                entry.etag = response.headers.get("etag")
+                entry.last_modified = response.headers.get("last-modified")
+                entry.version += 1
+            entry.expires_at = time.monotonic() + settings.REGISTRY_CACHE_TTL_SECONDS
+        except Exception as e:
+            logger.info(
+                "Registry refresh failed, serving last good copy",
+                url=url,
+                cached_apps=len(entry.apps),
+                error=str(e),
+            )
+            entry.expires_at = time.monotonic() + min(
+                _FAILURE_RETRY_SECONDS, settings.REGISTRY_CACHE_TTL_SECONDS
+            )
+
+    async def _refresh(self, urls: list[str]) -> None:
+        async with httpx.AsyncClient(
+            verify=False,
+            timeout=settings.REGISTRY_FETCH_TIMEOUT_SECONDS,
+            follow_redirects=True,
+        ) as client:
+            await asyncio.gather(*(self._revalidate(client, url) for url in urls))
+
+    def _schedule_refresh(self, urls: list[str]) -> asyncio.Task[None] | None:
+        pending = [u for u in urls if u not in _refresh_tasks]
+        if not pending:
+            return None
+        task = asyncio.create_task(self._refresh(pending))
+        for url in pending:
+            _refresh_tasks[url] = task
+
+        def _done(_: asyncio.Task[None]) -> None:
+            for url in pending:
+                if _refresh_tasks.get(url) is task:
+                    del _refresh_tasks[url]
+
+        task.add_done_callback(_done)
+        return task
+
     async def validate_registry_url(self, url: str) -> bool:
         """
         Validates if a URL points to a valid registry.
@@ -50,15 +137,50 @@ class RegistryService:
     ) -> list[PremiumAppDefinition]:
         """
         Combines the built-in apps with apps from custom registries.
+
+        Registries are served from memory (stale-while-revalidate): expired entries are
+        revalidated in the background with ETag/If-Modified-Since, and only registries
+        that were never fetched block the request (fetched concurrently).
         """
-        all_apps = AppRegistry.get_all()
-        seen_ids = {app.id for app in all_apps}
+        global _merged_cache, _merged_version
+
+        urls = list(dict.fromkeys(registry_urls))
+        # Registries without a completed first fetch attempt
+        missing = [
+            u
+            for u in urls
+            if u not in _registry_cache or _registry_cache[u].expires_at == 0.0
+        ]
+        if missing:
+            task = self._schedule_refresh(missing)
+            waiting = {_refresh_tasks[u] for u in missing if u in _refresh_tasks}
+            if task:
+                waiting.add(task)
+            await asyncio.gather(*(asyncio.shield(t) for t in waiting))
+
+        now = time.monotonic()
+        stale = [
+            u
+            for u in urls
+            if u in _registry_cache and _registry_cache[u].expires_at <= now
+        ]
+        if stale:
+            self._schedule_refresh(stale)
 
-        for url in registry_urls:
-            registry_apps = await self.fetch_registry(url)
-            for app in registry_apps:
-                if app.id not in seen_ids:
-                    all_apps.append(app)
-                    seen_ids.add(app.id)
+        key = tuple(
+            (u, _registry_cache[u].version if u in _registry_cache else -1)
+            for u in urls
+        )
+        if _merged_cache is None or _merged_cache[0] != key:
+            all_apps = AppRegistry.get_all()
+            seen_ids = {app.id for app in all_apps}
+            for url in urls:
+                entry = _registry_cache.get(url)
+                for app in entry.apps if entry else []:
+                    if app.id not in seen_ids:
+                        all_apps.append(app)
+                        seen_ids.add(app.id)
+            _merged_cache = (key, all_apps)
+            _merged_version += 1
 
-        return all_apps
+        return list(_merged_cache[1])
@@ -0,0 +1,257 @@
+import asyncio
+import contextlib
+import datetime
+import random
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import Any, Literal
+
+import structlog
+
+logger = structlog.get_logger()
+
+# A job may return the delay (seconds) until its next run to override its interval
+JobFunc = Callable[[], Awaitable[float | None]]
+# "skip": a tick that finds all slots busy is dropped
+# "coalesce": it runs once as soon as a slot frees up (further missed ticks merge into it)
+MissedRunPolicy = Literal["skip", "coalesce"]
+
+
+@dataclass
+class Job:
+    name: str
+    func: JobFunc
+    interval: float
+    jitter: float = 0.1
+    max_concurrency: int = 1
+    missed_run_policy: MissedRunPolicy = "skip"
+    initial_delay: float = 0.0
+    retry_delay: float | None = None
+    max_backoff: float = 15 * 60
+
+    runs: int = 0
+    failures: int = 0
+    consecutive_failures: int = 0
+    missed_runs: int = 0
+    running: int = 0
+    pending: bool = False
+    # Earliest run asked for through Scheduler.trigger that has not started yet
+    requested_run: float | None = None
+    last_started: float | None = None
+    last_finished: float | None = None
+    last_duration: float | None = None
+    last_error: str | None = None
+    next_run: float | None = None
+    wake: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+
+    def _jittered(self, delay: float) -> float:
+        if self.jitter <= 0 or delay <= 0:
+            return delay
+        return delay * (1 + random.uniform(-self.jitter, self.jitter))
+
+    def reschedule(self, delay: float) -> None:
+        """Sets the next run, keeping an earlier one requested through a trigger."""
+        run_at = time.monotonic() + max(0.0, self._jittered(delay))
+        if self.requested_run is not None:
+            run_at = min(run_at, self.requested_run)
+        self.next_run = run_at
+        self.wake.set()
+
+    def backoff_delay(self) -> float:
+        base = self.retry_delay if self.retry_delay is not None else self.interval
+        exponent = min(self.consecutive_failures - 1, 16)
+        return min(self.max_backoff, base * 2**exponent)
+
+
+def _wall_time(monotonic_ts: float | None) -> str | None:
+    if monotonic_ts is None:
+        return None
+    wall = time.time() + (monotonic_ts - time.monotonic())
+    return datetime.datetime.fromtimestamp(wall, datetime.UTC).isoformat()
+
+
+class Scheduler:
+    """
+    Runs named periodic jobs on the event loop with jitter, exponential backoff after
+    failures, a per-job concurrency cap and a policy for ticks that find the job busy.
+
+    Each job's interval counts from the start of a run. A job may instead return the
+    delay until its next run (e.g. intervals read from config). After an event-loop
+    stall a job runs once rather than catching up on every missed tick.
+    """
+
+    def __init__(self) -> None:
+        self._jobs: dict[str, Job] = {}
+        self._loops: dict[str, asyncio.Task[None]] = {}
+        self._runs: set[asyncio.Task[None]] = set()
+
+    def add_job(
+        self,
+        name: str,
+        func: JobFunc,
+        interval: float,
+        *,
+        jitter: float = 0.1,
+        max_concurrency: int = 1,
+        missed_run_policy: MissedRunPolicy = "skip",
+        initial_delay: float = 0.0,
+        retry_delay: float | None = None,
+        max_backoff: float = 15 * 60,
+    ) -> Job:
+        if name in self._loops:
+            raise ValueError(f"Job {name!r} is already running")
+        job = Job(
+            name=name,
+            func=func,
+            interval=interval,
+            jitter=jitter,
+            max_concurrency=max(1, max_concurrency),
+            missed_run_policy=missed_run_policy,
+            initial_delay=initial_delay,
+            retry_delay=retry_delay,
+            max_backoff=max_backoff,
+        )
+        self._jobs[name] = job
+        return job
+
+    def get(self, name: str) -> Job | None:
+        return self._jobs.get(name)
+
+    def start(self) -> None:
+        for name, job in self._jobs.items():
+            task = self._loops.get(name)
+            if task is None or task.done():
+                job.wake = asyncio.Event()
+                self._loops[name] = asyncio.create_task(self._job_loop(job))
+
+    async def stop(self) -> None:
+        tasks = [*self._loops.values(), *self._runs]
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        self._loops.clear()
+        self._runs.clear()
+        for job in self._jobs.values():
+            job.running = 0
+            job.pending = False
+            job.requested_run = None
+            job.next_run = None
+
+    def trigger(self, name: str, delay: float = 0.0) -> bool:
+        """
+        Runs a job within `delay` seconds (as soon as possible by default), unless it
+        is already due sooner. A trigger that finds the job running is not dropped:
+        the job runs again once it finishes, whatever its missed-run policy, and the
+        delay it returns cannot push the triggered run back. Returns False for
+        unknown jobs.
+        """
+        job = self._jobs.get(name)
+        if job is None:
+            return False
+        run_at = time.monotonic() + max(0.0, delay)
+        if job.requested_run is None or run_at < job.requested_run:
+            job.requested_run = run_at
+        if job.next_run is None or run_at < job.next_run:
+            job.next_run = run_at
+            job.wake.set()
+        return True
+
+    async def _job_loop(self, job: Job) -> None:
+        job.next_run = time.monotonic() + job.initial_delay
+        while True:
+            job.wake.clear()
+            delay = job.next_run - time.monotonic()
+            if delay > 0:
+                with contextlib.suppress(TimeoutError):
+                    await asyncio.wait_for(job.wake.wait(), delay)
+                if job.next_run > time.monotonic():
+                    continue
+
+            now = time.monotonic()
+            late_by = now - job.next_run
+            if late_by > job.interval:
+                # The loop stalled past whole intervals; run once, do not catch up
+                job.missed_runs += int(late_by // job.interval)
+            job.next_run = now + job._jittered(job.interval)
+
+            triggered = job.requested_run is not None and job.requested_run <= now
+            if job.running < job.max_concurrency:
+                self._spawn(job)
+            elif job.missed_run_policy == "coalesce" or triggered:
+                # The pending run now carries the trigger
+                job.pending = True
+                job.requested_run = None
+            else:
+                job.missed_runs += 1
+
+    def _spawn(self, job: Job) -> None:
+        if job.requested_run is not None and job.requested_run <= time.monotonic():
+            job.requested_run = None
+        job.running += 1
+        task = asyncio.create_task(self._run(job))
+        self._runs.add(task)
+        task.add_done_callback(self._runs.discard)
+
+    async def _run(self, job: Job) -> None:
+        started = time.monotonic()
+        job.last_started = started
+        try:
+            next_delay = await job.func()
+        except asyncio.CancelledError:
+            raise
+        except Exception as err:
+            job.failures += 1
+            job.consecutive_failures += 1
+            job.last_error = str(err) or type(err).__name__
+            backoff = job.backoff_delay()
+            logger.warning(
+                "Scheduled job failed",
+                job=job.name,
+                error=job.last_error,
+                retry_in=round(backoff, 1),
+            )
+            job.reschedule(backoff)
+        else:
+            job.consecutive_failures = 0
+            job.last_error = None
+            if next_delay is not None:
+                job.reschedule(max(0.0, next_delay))
+        finally:
+            finished = time.monotonic()
+            job.runs += 1
+            job.running -= 1
+            job.last_finished = finished
+            job.last_duration = finished - started
+        if job.pending and job.running < job.max_concurrency:
+            job.pending = False
+            self._spawn(job)
+
+    def status(self) -> list[dict[str, Any]]:
+        return [
+            {
+                "name": job.name,
+                "interval_seconds": job.interval,
+                "max_concurrency": job.max_concurrency,
+                "missed_run_policy": job.missed_run_policy,
+                "running": job.running,
+                "runs": job.runs,
+                "failures": job.failures,
+                "consecutive_failures": job.consecutive_failures,
+                "missed_runs": job.missed_runs,
+                "last_started": _wall_time(job.last_started),
+                "last_duration_ms": (
+                    round(job.last_duration * 1000, 1)
+                    if job.last_duration is not None
+                    else None
+                ),
+                "last_error": job.last_error,
+                "next_run": _wall_time(job.next_run),
+            }
+            for job in self._jobs.values()
+        ]
+
+
+scheduler = Scheduler()
@@ -0,0 +1,302 @@
+import asyncio
+import heapq
+import re
+import urllib.parse
+from bisect import bisect_left, insort
+from collections import Counter
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from app.repositories.repos import AppRepository
+from app.schemas.app import App
+from app.services.config_service import ConfigService
+from app.services.icon_mirror import icon_mirror
+from app.services.registry_service import RegistryService
+
+_TOKEN_RE = re.compile(r"[^\W_]+")
+_HOST_STOPWORDS = {"www", "com", "org", "net", "de", "io", "local", "lan"}
+_FIELD_WEIGHTS = {"name": 3.0, "integration": 2.0, "host": 2.0, "description": 1.0}
+
+_EXACT_FACTOR = 1.0
+_PREFIX_FACTOR = 0.75
+_FUZZY_FACTOR = 0.5
+_FUZZY_THRESHOLD = 0.35
+_MAX_PREFIX_EXPANSION = 256
+# Batch size above which the sorted token list is rebuilt instead of updated in place
+_BULK_SORT_THRESHOLD = 64
+
+
+def tokenize(text: str | None) -> list[str]:
+    return _TOKEN_RE.findall(text.lower()) if text else []
+
+
+def trigrams(token: str) -> set[str]:
+    padded = f"  {token} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+@dataclass(frozen=True)
+class SearchDocument:
+    id: str
+    kind: str
+    name: str
+    source: str
+    description: str | None = None
+    url: str | None = None
+    icon: str | None = None
+    integration: str | None = None
+    parent_id: str | None = None
+
+
+class SearchIndex:
+    """
+    In-memory inverted index with exact, prefix (sorted token list) and trigram (typo
+    tolerant) matching. Documents are grouped by source and can be synced per source,
+    so only changed documents are re-indexed.
+    """
+
+    def __init__(self) -> None:
+        self._docs: dict[str, SearchDocument] = {}
+        self._doc_terms: dict[str, dict[str, float]] = {}
+        self._postings: dict[str, dict[str, float]] = {}
+        self._trigrams: dict[str, set[str]] = {}
+        self._gram_counts: dict[str, int] = {}
+        self._sources: dict[str, set[str]] = {}
+        self._sorted_tokens: list[str] = []
+        self._stale_tokens = 0
+        self._pending_tokens: list[str] = []
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    @staticmethod
+    def _terms_for(doc: SearchDocument) -> dict[str, float]:
+        host = urllib.parse.urlsplit(doc.url).hostname if doc.url else None
+        fields = {
+            "name": tokenize(doc.name),
+            "integration": tokenize(doc.integration),
+            "host": [t for t in tokenize(host) if t not in _HOST_STOPWORDS],
+            "description": tokenize(doc.description),
+        }
+        terms: dict[str, float] = {}
+        for field_name, tokens in fields.items():
+            weight = _FIELD_WEIGHTS[field_name]
+            for token in tokens:
+                if terms.get(token, 0.0) < weight:
+                    terms[token] = weight
+        return terms
+
+    def _add_token(self, token: str) -> None:
+        self._postings[token] = {}
+        grams = trigrams(token)
+        self._gram_counts[token] = len(grams)
+        for gram in grams:
+            self._trigrams.setdefault(gram, set()).add(token)
+        self._pending_tokens.append(token)
+
+    def _drop_token(self, token: str) -> None:
+        del self._postings[token]
+        for gram in trigrams(token):
+            tokens = self._trigrams.get(gram)
+            if tokens is not None:
+                tokens.discard(token)
+                if not tokens:
+                    del self._trigrams[gram]
+        self._gram_counts.pop(token, None)
+        # Removed lazily from the sorted list; compacted on the next full sort
+        self._stale_tokens += 1
+
+    def upsert(self, doc: SearchDocument) -> bool:
+        """Indexes `doc`, replacing any previous version. Returns False if it was unchanged."""
+        if self._docs.get(doc.id) == doc:
+            return False
+        self.remove(doc.id)
+
+        terms = self._terms_for(doc)
+        for token, weight in terms.items():
+            if token not in self._postings:
+                self._add_token(token)
+            self._postings[token][doc.id] = weight
+        self._docs[doc.id] = doc
+        self._doc_terms[doc.id] = terms
+        self._sources.setdefault(doc.source, set()).add(doc.id)
+        return True
+
+    def remove(self, doc_id: str) -> bool:
+        doc = self._docs.pop(doc_id, None)
+        if doc is None:
+            return False
+        for token in self._doc_terms.pop(doc_id, {}):
+            posting = self._postings.get(token)
+            if posting is not None:
+                posting.pop(doc_id, None)
+                if not posting:
+                    self._drop_token(token)
+        self._sources.get(doc.source, set()).discard(doc_id)
+        return True
+
+    def sync_source(self, source: str, docs: Iterable[SearchDocument]) -> int:
+        """Makes the indexed documents of `source` match `docs`. Returns the number of changes."""
+        incoming = {doc.id: doc for doc in docs}
+        changes = 0
+        for doc_id in list(self._sources.get(source, set()) - incoming.keys()):
+            changes += self.remove(doc_id)
+        for doc in incoming.values():
+            changes += self.upsert(doc)
+        return changes
+
+    def _ensure_sorted(self) -> None:
+        if not self._pending_tokens and self._stale_tokens <= len(self._postings) // 4:
+            return
+        if (
+            len(self._pending_tokens) > _BULK_SORT_THRESHOLD
+            or self._stale_tokens > len(self._postings) // 4
+        ):
+            self._sorted_tokens = sorted(self._postings)
+            self._stale_tokens = 0
+        else:
+            for token in self._pending_tokens:
+                idx = bisect_left(self._sorted_tokens, token)
+                if idx >= len(self._sorted_tokens) or self._sorted_tokens[idx] != token:
+                    insort(self._sorted_tokens, token)
+        self._pending_tokens.clear()
+
+    def _match_term(self, term: str, min_results: int) -> dict[str, float]:
+        matches: dict[str, float] = {}
+
+        def collect(token: str, factor: float) -> None:
+            for doc_id, weight in self._postings[token].items():
+                score = weight * factor
+                if score > matches.get(doc_id, 0.0):
+                    matches[doc_id] = score
+
+        if term in self._postings:
+            collect(term, _EXACT_FACTOR)
+
+        idx = bisect_left(self._sorted_tokens, term)
+        expanded = 0
+        while idx < len(self._sorted_tokens) and expanded < _MAX_PREFIX_EXPANSION:
+            token = self._sorted_tokens[idx]
+            if not token.startswith(term):
+                break
+            if token != term and token in self._postings:
+                collect(token, _PREFIX_FACTOR)
+                expanded += 1
+            idx += 1
+
+        if len(term) >= 3 and len(matches) < min_results:
+            term_grams = trigrams(term)
+            shared: Counter[str] = Counter()
+            for gram in term_grams:
+                shared.update(self._trigrams.get(gram, ()))
+            for token, count in shared.items():
+                similarity = count / (
+                    len(term_grams) + self._gram_counts[token] - count
+                )
+                if similarity >= _FUZZY_THRESHOLD:
+                    collect(token, _FUZZY_FACTOR * similarity)
+        return matches
+
+    def search(
+        self, query: str, limit: int = 20, kinds: set[str] | None = None
+    ) -> list[tuple[SearchDocument, float]]:
+        """Returns documents matching all query terms, best first."""
+        return self.search_with_total(query, limit, kinds)[0]
+
+    def search_with_total(
+        self, query: str, limit: int = 20, kinds: set[str] | None = None
+    ) -> tuple[list[tuple[SearchDocument, float]], int]:
+        """Like `search`, but also returns the number of matches before the limit."""
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms or not self._docs:
+            return [], 0
+        self._ensure_sorted()
+
+        scores = self._match_term(terms[0], limit)
+        for term in terms[1:]:
+            if not scores:
+                break
+            matches = self._match_term(term, limit)
+            scores = {d: s + matches[d] for d, s in scores.items() if d in matches}
+
+        if kinds:
+            scores = {d: s for d, s in scores.items() if self._docs[d].kind in kinds}
+        best = heapq.nsmallest(
+            limit, scores.items(), key=lambda item: (-item[1], self._docs[item[0]].name)
+        )
+        return [(self._docs[doc_id], score) for doc_id, score in best], len(scores)
+
+
+search_index = SearchIndex()
+_sync_lock = asyncio.Lock()
+_synced_versions: dict[str, object] = {}
+
+
+def _app_documents(
+    apps: list[App], parent_id: str | None = None
+) -> Iterable[SearchDocument]:
+    for app in apps:
+        yield SearchDocument(
+            id=f"app:{app.id}",
+            kind="folder" if app.type == "folder" else "app",
+            name=app.name,
+            source="apps",
+            description=app.description,
+            url=str(app.url) if app.url else None,
+            icon=app.custom_icon_url or app.icon_url,
+            integration=app.integration,
+            parent_id=parent_id,
+        )
+        if app.type == "folder" and app.contents:
+            yield from _app_documents(app.contents, app.id)
+
+
+class SearchService:
+    def __init__(self) -> None:
+        self.index = search_index
+        self.app_repo = AppRepository()
+        self.registry_service = RegistryService()
+
+    async def _sync(self) -> None:
+        """Re-indexes sources whose data changed since the last search."""
+        async with _sync_lock:
+            # Served from memory; expired registries are revalidated in the background
+            # and removed ones drop out of the merged catalog.
+            config = await ConfigService().get_config()
+            catalog = await self.registry_service.get_all_premium_apps(
+                config.registry_urls
+            )
+            catalog_version = (
+                tuple(config.registry_urls),
+                self.registry_service.catalog_version,
+            )
+            if _synced_versions.get("premium") != catalog_version:
+                self.index.sync_source(
+                    "premium",
+                    (
+                        SearchDocument(
+                            id=f"premium:{p.id}",
+                            kind="premium",
+                            name=p.name,
+                            source="premium",
+                            description=p.description,
+                            icon=icon_mirror.lookup(p.default_icon) or p.default_icon,
+                            integration=p.id,
+                        )
+                        for p in catalog
+                    ),
+                )
+                _synced_versions["premium"] = catalog_version
+
+            apps_version = (str(self.app_repo.file_path), self.app_repo.generation)
+            if _synced_versions.get("apps") != apps_version:
+                apps = await self.app_repo.read_all()
+                self.index.sync_source("apps", _app_documents(apps))
+                _synced_versions["apps"] = apps_version
+
+    async def search(
+        self, query: str, limit: int = 20, kinds: set[str] | None = None
+    ) -> tuple[list[tuple[SearchDocument, float]], int]:
+        """Returns the best `limit` hits and the total number of matches."""
+        await self._sync()
+        return self.index.search_with_total(query, limit=limit, kinds=kinds)
@@ -0,0 +1,344 @@
+import asyncio
+import contextlib
+import itertools
+import json
+import os
+import tempfile
+from collections.abc import Callable, Collection, Iterable
+from typing import Any
+
+import structlog
+
+from app.core.config import settings
+from app.repositories.repos import MonitoringRepository
+from app.schemas.monitoring import MonitoringConfig
+
+logger = structlog.get_logger()
+
+DEFAULT_BRIDGE_URL = "https://varco-bridge.andreabaccega.com"
+DEFAULT_CONSUMER_NAME = "ER-Startseite Backend Server"
+# Always requested so a fresh share shows the default speedtest cards
+DEFAULT_ENTITIES = (
+    "sensor.speedtest_download",
+    "sensor.speedtest_upload",
+    "sensor.speedtest_ping",
+)
+# Largest single NDJSON line (full entity snapshots can be big)
+_MAX_LINE_BYTES = 16 * 1024 * 1024
+
+EntitiesListener = Callable[[list[str]], None]
+
+
+def socket_path() -> str:
+    return settings.VARCO_SIDECAR_SOCKET or os.path.join(
+        tempfile.gettempdir(), "er-startseite-varco.sock"
+    )
+
+
+def _setting(values: dict[str, Any], camel: str, snake: str) -> Any:
+    return values.get(camel) or values.get(snake)
+
+
+def sidecar_settings(config: MonitoringConfig) -> dict[str, Any] | None:
+    """
+    Settings the sidecar connects to Varco with, or None when monitoring, the Varco
+    provider or its share link is not configured (the sidecar then disconnects).
+    """
+    if not config.enabled:
+        return None
+    provider = next(
+        (p for p in config.providers if p.type == "varco" and p.enabled), None
+    )
+    if provider is None or not provider.settings:
+        return None
+    values = provider.settings
+    authority_id = _setting(values, "authorityId", "authority_id")
+    share_code = _setting(values, "shareCode", "share_code")
+    if not authority_id or not share_code:
+        return None
+    requested = dict.fromkeys(DEFAULT_ENTITIES)
+    requested.update(dict.fromkeys(e.id for e in config.entities if e.id))
+    for card in config.cards:
+        requested.update(dict.fromkeys(eid for eid in card.entity_ids if eid))
+    return {
+        "authorityId": authority_id,
+        "shareCode": share_code,
+        "bridgeUrl": _setting(values, "bridgeUrl", "bridge_url") or DEFAULT_BRIDGE_URL,
+        "claimSecret": _setting(values, "claimSecret", "claim_secret"),
+        "privateKey": _setting(values, "privateKey", "private_key"),
+        "identityData": _setting(values, "identityData", "identity_data"),
+        "consumerName": _setting(values, "consumerName", "consumer_name")
+        or DEFAULT_CONSUMER_NAME,
+        "requestedEntities": list(requested),
+    }
+
+
+async def save_varco_identity(
+    private_key: str | None, identity_data: str | None = None
+) -> bool:
+    """
+    Persists (or with no key, clears) the consumer identity the sidecar paired with,
+    on behalf of the sidecar. Returns False if there is no Varco provider.
+    """
+    repo = MonitoringRepository()
+    async with repo.lock:
+        config = await repo.get_config()
+        provider = next((p for p in config.providers if p.type == "varco"), None)
+        if provider is None:
+            return False
+        values = dict(provider.settings or {})
+        if not private_key:
+            for key in ("privateKey", "private_key", "identityData", "identity_data"):
+                values.pop(key, None)
+        else:
+            values["privateKey"] = values["private_key"] = private_key
+            if identity_data:
+                values["identityData"] = values["identity_data"] = identity_data
+        if values != provider.settings:
+            provider.settings = values
+            await repo.save_config(config)
+    return True
+
+
+class SidecarChannel:
+    """
+    Persistent newline-delimited JSON channel to the Varco Node sidecar over a Unix
+    socket. The backend listens; the sidecar connects, pushes entity deltas from its
+    Varco subscription as they arrive and receives its settings whenever the
+    monitoring config changes. The sidecar never writes monitoring.json; it sends
+    its paired identity as an `identity` message instead. Requests (e.g. an
+    on-demand `fetch` of entities the subscription has not delivered yet) are
+    matched to replies by `id`.
+    """
+
+    def __init__(self) -> None:
+        self._server: asyncio.AbstractServer | None = None
+        self._writer: asyncio.StreamWriter | None = None
+        self._pending: dict[int, asyncio.Future[dict[str, Any]]] = {}
+        self._ids = itertools.count(1)
+        self._listeners: list[EntitiesListener] = []
+        self._tasks: set[asyncio.Task[None]] = set()
+        self._hello_waiters: list[asyncio.Future[Any]] = []
+        self._sent_settings: Any = object()
+        self._config: MonitoringConfig | None = None
+        self.entities: dict[str, dict[str, Any]] = {}
+        self.online = False
+        self.sidecar_pid: int | None = None
+        self.path: str | None = None
+
+    @property
+    def connected(self) -> bool:
+        return self._writer is not None and not self._writer.is_closing()
+
+    def add_listener(self, listener: EntitiesListener) -> None:
+        """Registers a callback invoked with the ids of entities the sidecar pushed."""
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+
+    async def start(self, path: str | None = None) -> str:
+        """Listens on the socket (idempotent). Returns its path."""
+        path = path or socket_path()
+        if self._server is not None and self.path == path:
+            return path
+        await self.stop()
+        MonitoringRepository.add_save_listener(self._config_saved)
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(path)
+        self._server = await asyncio.start_unix_server(
+            self._handle, path=path, limit=_MAX_LINE_BYTES
+        )
+        os.chmod(path, 0o600)
+        self.path = path
+        logger.info("Varco sidecar channel listening", path=path)
+        return path
+
+    async def stop(self) -> None:
+        for task in list(self._tasks):
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        if self._server is not None:
+            self._server.close()
+            with contextlib.suppress(Exception):
+                await self._server.wait_closed()
+            self._server = None
+        if self.path:
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(self.path)
+        self._fail_pending(ConnectionError("Sidecar channel closed"))
+        self.online = False
+
+    async def _handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        # A reconnecting sidecar replaces the previous connection
+        if self._writer is not None and self._writer is not writer:
+            self._writer.close()
+            self._fail_pending(ConnectionError("Sidecar reconnected"))
+        self._writer = writer
+        self._sent_settings = object()
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (asyncio.LimitOverrunError, ValueError):
+                    logger.warning("Dropping oversized sidecar message")
+                    break
+                if not line:
+                    break
+                try:
+                    message = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.debug("Ignoring malformed sidecar message")
+                    continue
+                if isinstance(message, dict):
+                    await self._dispatch(message)
+        except ConnectionError:
+            pass
+        finally:
+            if self._writer is writer:
+                self._writer = None
+                self.online = False
+                self._fail_pending(ConnectionError("Sidecar disconnected"))
+            writer.close()
+
+    async def _dispatch(self, message: dict[str, Any]) -> None:
+        kind = message.get("type")
+        if kind == "hello":
+            self.sidecar_pid = message.get("pid")
+            for waiter in self._hello_waiters:
+                if not waiter.done():
+                    waiter.set_result(self.sidecar_pid)
+            self._hello_waiters.clear()
+            if self._config is not None:
+                await self.push_config(self._config)
+        elif kind == "entities":
+            self._merge(message.get("entities"), full=bool(message.get("full")))
+            self.online = bool(message.get("online", self.online))
+        elif kind == "status":
+            self.online = bool(message.get("online"))
+        elif kind == "identity":
+            saved = False
+            try:
+                saved = await save_varco_identity(
+                    message.get("privateKey"), message.get("identityData")
+                )
+            except Exception:
+                logger.warning("Failed saving Varco sidecar identity", exc_info=True)
+            if message.get("id") is not None:
+                await self.send(
+                    {"type": "response", "id": message["id"], "success": saved}
+                )
+        elif kind == "response":
+            future = self._pending.pop(message.get("id"), None)
+            if future is not None and not future.done():
+                future.set_result(message)
+
+    def _merge(self, entities: Any, full: bool = False, notify: bool = True) -> None:
+        if not isinstance(entities, list):
+            return
+        previous = self.entities
+        if full:
+            self.entities = {}
+        changed = []
+        for entity in entities:
+            if isinstance(entity, dict) and isinstance(entity.get("id"), str):
+                eid = entity["id"]
+                old = previous.get(eid)
+                self.entities[eid] = entity
+                if old is None or old.get("state") != entity.get("state"):
+                    changed.append(eid)
+        if changed and notify:
+            for listener in self._listeners:
+                try:
+                    listener(changed)
+                except Exception:
+                    logger.warning("Sidecar entities listener failed", exc_info=True)
+
+    def _fail_pending(self, error: Exception) -> None:
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(error)
+        self._pending.clear()
+
+    async def wait_for_hello(self, pid: int) -> None:
+        """Waits until the sidecar process `pid` has connected and said hello."""
+        while not (self.connected and self.sidecar_pid == pid):
+            waiter = asyncio.get_running_loop().create_future()
+            self._hello_waiters.append(waiter)
+            try:
+                await waiter
+            finally:
+                if waiter in self._hello_waiters:
+                    self._hello_waiters.remove(waiter)
+
+    async def send(self, message: dict[str, Any]) -> bool:
+        writer = self._writer
+        if writer is None or writer.is_closing():
+            return False
+        try:
+            writer.write(json.dumps(message, separators=(",", ":")).encode() + b"\n")
+            await writer.drain()
+        except ConnectionError:
+            return False
+        return True
+
+    async def request(
+        self, kind: str, timeout: float | None = None, **fields: Any
+    ) -> dict[str, Any]:
+        """Sends a request and waits for the sidecar's `response` with the same id."""
+        request_id = next(self._ids)
+        future: asyncio.Future[dict[str, Any]] = (
+            asyncio.get_running_loop().create_future()
+        )
+        self._pending[request_id] = future
+        try:
+            if not await self.send({"type": kind, "id": request_id, **fields}):
+                raise ConnectionError("Sidecar is not connected")
+            return await asyncio.wait_for(
+                future, timeout or settings.VARCO_SIDECAR_REQUEST_TIMEOUT_SECONDS
+            )
+        finally:
+            self._pending.pop(request_id, None)
+
+    def _config_saved(self, config: MonitoringConfig) -> None:
+        if self.connected:
+            task = asyncio.get_running_loop().create_task(self.push_config(config))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def push_config(self, config: MonitoringConfig) -> None:
+        """Sends the sidecar its settings if they changed since the last push."""
+        self._config = config
+        values = sidecar_settings(config)
+        if values == self._sent_settings:
+            return
+        if await self.send({"type": "config", "settings": values}):
+            self._sent_settings = values
+
+    async def fetch(self, entity_ids: Collection[str] | None = None) -> bool:
+        """
+        Asks the sidecar to query Varco for `entity_ids` (all subscribed entities if
+        None) and caches the returned states. Listeners are not notified: the caller
+        asked for these states.
+        """
+        try:
+            response = await self.request(
+                "fetch", entities=sorted(entity_ids) if entity_ids else None
+            )
+        except (ConnectionError, TimeoutError):
+            return False
+        self.online = bool(response.get("online", self.online))
+        self._merge(response.get("entities"), notify=False)
+        return bool(response.get("success"))
+
+    def states(self, entity_ids: Iterable[str] | None = None) -> list[dict[str, Any]]:
+        if entity_ids is None:
+            return list(self.entities.values())
+        return [self.entities[eid] for eid in entity_ids if eid in self.entities]
+
+
+sidecar_channel = SidecarChannel()
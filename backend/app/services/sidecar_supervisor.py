@@ -0,0 +1,340 @@
+import asyncio
+import contextlib
+import os
+import shutil
+import time
+from collections.abc import Callable
+from typing import Any
+
+import structlog
+
+from app.core.config import settings
+from app.services.log_service import add_system_log
+from app.services.sidecar_channel import sidecar_channel
+
+logger = structlog.get_logger()
+
+DEFAULT_SCRIPT_PATH = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "../../varco_worker.js")
+)
+_CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def process_usage(pid: int) -> tuple[int | None, float | None]:
+    """RSS (bytes) and consumed CPU time (seconds) of a process, from /proc."""
+    try:
+        with open(f"/proc/{pid}/stat", encoding="utf-8") as stat_file:
+            stat = stat_file.read()
+        # Fields after the parenthesised command name start at field 3 (state)
+        fields = stat.rsplit(")", 1)[1].split()
+        cpu_seconds = (int(fields[11]) + int(fields[12])) / _CLOCK_TICKS
+        return int(fields[21]) * _PAGE_SIZE, cpu_seconds
+    except (OSError, ValueError, IndexError):
+        return None, None
+
+
+class LogRateLimiter:
+    """Token bucket for sidecar log lines; counts what it drops."""
+
+    def __init__(
+        self, per_minute: int, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self._clock = clock
+        self._capacity = float(max(1, per_minute))
+        self._tokens = self._capacity
+        self._updated = clock()
+        self.suppressed = 0
+        self.total_suppressed = 0
+
+    def allow(self) -> bool:
+        now = self._clock()
+        refill = (now - self._updated) * self._capacity / 60
+        self._tokens = min(self._capacity, self._tokens + refill)
+        self._updated = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return True
+        self.suppressed += 1
+        self.total_suppressed += 1
+        return False
+
+
+class SidecarSupervisor:
+    """
+    Runs the Varco Node sidecar (backend/varco_worker.js) while monitoring needs it.
+
+    A started sidecar counts as ready once it has connected to the sidecar channel
+    and said hello. A sidecar that exits, misses the readiness timeout or exceeds
+    VARCO_SIDECAR_MAX_RSS_MB is restarted with exponential backoff, which resets
+    after it has run for VARCO_SIDECAR_STABLE_SECONDS. The channel keeps its entity
+    cache across restarts, so the collector keeps serving states while the new
+    sidecar reconnects and resubscribes (a warm restart). Node's heap is capped
+    with --max-old-space-size and its log output is rate limited.
+    """
+
+    def __init__(
+        self,
+        script_path: str = DEFAULT_SCRIPT_PATH,
+        node_binary: str | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.script_path = script_path
+        self.node_binary = node_binary
+        self._clock = clock
+        self._proc: asyncio.subprocess.Process | None = None
+        self._tasks: set[asyncio.Task[None]] = set()
+        self._next_start = 0.0
+        self._cpu_sample: tuple[float, float] | None = None
+        self._logs = LogRateLimiter(settings.VARCO_SIDECAR_LOG_LINES_PER_MINUTE)
+        # Called with the delay until a restart is allowed (e.g. to wake the collector)
+        self.on_restart_due: Callable[[float], None] | None = None
+        self.ready = False
+        self.started_at: float | None = None
+        self.starts = 0
+        self.restarts = 0
+        self.consecutive_failures = 0
+        self.last_exit_code: int | None = None
+        self.last_failure: str | None = None
+        self.rss_bytes: int | None = None
+        self.cpu_percent: float | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._proc is not None and self._proc.returncode is None
+
+    async def ensure(self, should_run: bool) -> None:
+        """Starts, checks or stops the sidecar. Called on every collector pass."""
+        if not should_run:
+            if self._proc is not None:
+                await self.stop()
+                sidecar_channel.entities.clear()
+                add_system_log(
+                    "INFO",
+                    "Varco Node.js Sidecar Worker stopped "
+                    "(Monitoring or Share Link disabled)",
+                    {},
+                )
+            return
+        if self.running:
+            self._check_health()
+            return
+        if self._clock() >= self._next_start:
+            await self._start()
+
+    def _check_health(self) -> None:
+        assert self._proc is not None
+        self.sample_usage()
+        limit = settings.VARCO_SIDECAR_MAX_RSS_MB * 1024 * 1024
+        if self.rss_bytes is not None and self.rss_bytes > limit:
+            proc = self._proc
+            self._proc = None
+            self._spawn(self._terminate(proc))
+            self._record_failure(
+                f"exceeded its memory limit ({self.rss_bytes // (1024 * 1024)} MB RSS)"
+            )
+            return
+        uptime = self._clock() - (self.started_at or self._clock())
+        if (
+            self.consecutive_failures
+            and uptime >= settings.VARCO_SIDECAR_STABLE_SECONDS
+        ):
+            self.consecutive_failures = 0
+
+    def sample_usage(self) -> None:
+        if not self.running:
+            self.rss_bytes = self.cpu_percent = None
+            return
+        assert self._proc is not None
+        rss, cpu_seconds = process_usage(self._proc.pid)
+        self.rss_bytes = rss
+        if cpu_seconds is None:
+            return
+        now = self._clock()
+        if self._cpu_sample is not None and now > self._cpu_sample[0]:
+            used = cpu_seconds - self._cpu_sample[1]
+            self.cpu_percent = round(100 * used / (now - self._cpu_sample[0]), 1)
+        self._cpu_sample = (now, cpu_seconds)
+
+    async def _start(self) -> None:
+        if not os.path.exists(self.script_path):
+            return
+        node_binary = self.node_binary or shutil.which("node") or "/usr/bin/node"
+        try:
+            socket_path = await sidecar_channel.start()
+            proc = await asyncio.create_subprocess_exec(
+                node_binary,
+                f"--max-old-space-size={settings.VARCO_SIDECAR_MAX_HEAP_MB}",
+                self.script_path,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                env={**os.environ, "VARCO_SOCKET_PATH": socket_path},
+            )
+        except Exception as err:
+            self._record_failure(f"failed to start: {err}")
+            return
+
+        if self.starts:
+            self.restarts += 1
+        self.starts += 1
+        self._proc = proc
+        self.ready = False
+        self.started_at = self._clock()
+        self._cpu_sample = None
+        add_system_log(
+            "INFO",
+            "Varco Node.js Sidecar Worker started",
+            {"pid": proc.pid, "path": self.script_path},
+        )
+        self._spawn(self._read_stream(proc.stdout, False))
+        self._spawn(self._read_stream(proc.stderr, True))
+        exited = self._spawn(self._watch(proc))
+
+        hello = asyncio.ensure_future(sidecar_channel.wait_for_hello(proc.pid))
+        await asyncio.wait(
+            {hello, exited},
+            timeout=settings.VARCO_SIDECAR_READY_TIMEOUT_SECONDS,
+            return_when=asyncio.FIRST_COMPLETED,
+        )
+        if not hello.done():
+            hello.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await hello
+            if self._proc is proc:
+                # Still running but never connected: treat as a failed start
+                self._proc = None
+                await self._terminate(proc)
+                self._record_failure("did not become ready")
+            return
+        self.ready = True
+        add_system_log("INFO", "Varco Node.js Sidecar Worker ready", {"pid": proc.pid})
+
+    def _spawn(self, coro: Any) -> asyncio.Task[None]:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def _watch(self, proc: asyncio.subprocess.Process) -> None:
+        code = await proc.wait()
+        self.last_exit_code = code
+        if self._proc is proc:
+            self._proc = None
+            self._record_failure(f"exited with code {code}")
+
+    def _record_failure(self, reason: str) -> None:
+        self.ready = False
+        self.consecutive_failures += 1
+        self.last_failure = reason
+        delay = min(
+            settings.VARCO_SIDECAR_RESTART_MAX_SECONDS,
+            settings.VARCO_SIDECAR_RESTART_BASE_SECONDS
+            * 2 ** min(self.consecutive_failures - 1, 16),
+        )
+        self._next_start = self._clock() + delay
+        add_system_log(
+            "WARNING",
+            f"Varco Node.js Sidecar Worker {reason}; restarting in {delay:.0f}s",
+            {"reason": reason, "restart_in": delay},
+        )
+        if self.on_restart_due is not None:
+            self.on_restart_due(delay)
+
+    async def _read_stream(
+        self, stream: asyncio.StreamReader | None, is_err: bool
+    ) -> None:
+        if not stream:
+            return
+        while not stream.at_eof():
+            line = await stream.readline()
+            txt = line.decode(errors="replace").strip()
+            if not txt:
+                continue
+            if not self._logs.allow():
+                continue
+            if self._logs.suppressed:
+                add_system_log(
+                    "WARNING",
+                    f"Varco Worker: suppressed {self._logs.suppressed} log lines",
+                    {"suppressed": self._logs.suppressed},
+                )
+                self._logs.suppressed = 0
+            level = (
+                "WARNING"
+                if is_err
+                else "INFO" if ("PAIRING" in txt or "connected" in txt) else "DEBUG"
+            )
+            add_system_log(
+                level,
+                f"Varco Worker {'Err' if is_err else 'Log'}: {txt}",
+                {"output" if not is_err else "error": txt},
+            )
+
+    @staticmethod
+    async def _terminate(proc: asyncio.subprocess.Process) -> None:
+        if proc.returncode is not None:
+            return
+        try:
+            proc.terminate()
+            await asyncio.wait_for(proc.wait(), timeout=3.0)
+        except ProcessLookupError:
+            pass
+        except Exception:
+            with contextlib.suppress(ProcessLookupError):
+                proc.kill()
+            with contextlib.suppress(Exception):
+                await proc.wait()
+
+    async def stop(self) -> None:
+        proc, self._proc = self._proc, None
+        self.ready = False
+        if proc is not None:
+            await self._terminate(proc)
+        for task in list(self._tasks):
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        self._tasks.clear()
+        await sidecar_channel.stop()
+        self._next_start = 0.0
+        self.consecutive_failures = 0
+        self.rss_bytes = self.cpu_percent = None
+
+    def status(self) -> dict[str, Any]:
+        self.sample_usage()
+        now = self._clock()
+        return {
+            "running": self.running,
+            "ready": self.ready,
+            "pid": self._proc.pid if self.running and self._proc else None,
+            "uptime_seconds": (
+                round(now - self.started_at, 1)
+                if self.running and self.started_at is not None
+                else None
+            ),
+            "starts": self.starts,
+            "restarts": self.restarts,
+            "consecutive_failures": self.consecutive_failures,
+            "last_failure": self.last_failure,
+            "last_exit_code": self.last_exit_code,
+            "next_restart_in": (
+                round(max(0.0, self._next_start - now), 1)
+                if not self.running and self.consecutive_failures
+                else None
+            ),
+            "rss_mb": (
+                round(self.rss_bytes / (1024 * 1024), 1)
+                if self.rss_bytes is not None
+                else None
+            ),
+            "cpu_percent": self.cpu_percent,
+            "max_heap_mb": settings.VARCO_SIDECAR_MAX_HEAP_MB,
+            "max_rss_mb": settings.VARCO_SIDECAR_MAX_RSS_MB,
+            "suppressed_log_lines": self._logs.total_suppressed,
+            "channel_connected": sidecar_channel.connected,
+            "online": sidecar_channel.online,
+            "cached_entities": len(sidecar_channel.entities),
+        }
+
+
+sidecar_supervisor = SidecarSupervisor()
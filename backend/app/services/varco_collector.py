@@ -1,38 +1,31 @@
 import asyncio
-import contextlib
 import datetime
 import ipaddress
 import json
-import os
-import re
-import shutil
-import time
 import urllib.parse
+from collections.abc import Collection
 from typing import Any
 
 import httpx
 import structlog
 
+from app.core.config import settings
 from app.repositories.repos import MonitoringRepository
 from app.schemas.monitoring import MonitoringEntity
 from app.services.log_service import add_system_log
+from app.services.monitoring_sessions import monitoring_sessions
+from app.services.polling_schedule import entity_poll_bounds, poll_schedule
+from app.services.scheduler import scheduler
+from app.services.sidecar_channel import sidecar_channel
+from app.services.sidecar_supervisor import sidecar_supervisor
+from app.services.varco_parser import parse_share_page
 
 logger = structlog.get_logger()
 
-_collector_task: asyncio.Task[None] | None = None
-_stop_event: asyncio.Event = asyncio.Event()
-_last_active_timestamp: float = 0.0
-
-
-def touch_monitoring_active() -> None:
-    global _last_active_timestamp
-    _last_active_timestamp = time.time()
-
-
-def is_monitoring_active() -> bool:
-    """Returns True if a frontend client sent an active heartbeat within the last 45 seconds."""
-    global _last_active_timestamp
-    return (time.time() - _last_active_timestamp) < 45.0
+VARCO_COLLECTOR_JOB = "varco-collector"
+VARCO_PROVIDER_ID = "varco-server"
+# Collector recheck while no client has the monitoring overlay open
+INACTIVE_RECHECK_SECONDS = 5
 
 
 def _is_safe_url(url_str: str) -> bool:
@@ -313,93 +306,9 @@ async def _fetch_varco_data(
                         "Varco Collector share page HTML received",
                         {"length": len(body_str), "snippet": body_str[:400]},
                     )
-                    # 1. Standard Varco HTML section tags
-                    section_pattern = (
-                        r'<section[^>]*data-entity="([^"]+)"[^>]*>(.*?)</section>'
-                    )
-                    sections = re.findall(section_pattern, body_str, re.DOTALL)
-                    if sections:
-                        for ent_id, sec_body in sections:
-                            ent_id = ent_id.strip()
-                            st_match = re.search(
-                                r'class="varco-card__state">([^<]+)</span>', sec_body
-                            )
-                            name_match = re.search(
-                                r'class="varco-card__title">([^<]+)</div>', sec_body
-                            )
-                            unit_match = re.search(
-                                r'class="varco-card__unit">([^<]+)</span>', sec_body
-                            )
-
-                            if st_match:
-                                extracted_entities.append(
-                                    {
-                                        "id": ent_id,
-                                        "name": (
-                                            name_match.group(1).strip()
-                                            if name_match
-                                            else ent_id.split(".")[-1]
-                                            .replace("_", " ")
-                                            .title()
-                                        ),
-                                        "state": st_match.group(1).strip(),
-                                        "unit": (
-                                            unit_match.group(1).strip()
-                                            if unit_match
-                                            else None
-                                        ),
-                                        "domain": (
-                                            "binary_sensor"
-                                            if ent_id.startswith("binary_sensor.")
-                                            else "sensor"
-                                        ),
-                                    }
-                                )
-
-                    # 2. Extract JSON payload blobs or state objects in script tags/data attributes
-                    if not extracted_entities:
-                        all_json_blobs = re.findall(
-                            r"({[^{}]*\"entity_id\"[^{}]*}|{[^{}]*\"id\":\s*\"(?:sensor|binary_sensor)\.[^\"]+\"[^{}]*})",
-                            body_str,
-                            re.DOTALL,
-                        )
-                        for blob in all_json_blobs:
-                            try:
-                                b_data = json.loads(blob)
-                                eid = b_data.get("entity_id") or b_data.get("id")
-                                if eid:
-                                    st = b_data.get("state")
-                                    snap = b_data.get("state_snapshot")
-                                    if (
-                                        isinstance(snap, dict)
-                                        and snap.get("state") is not None
-                                    ):
-                                        st = snap.get("state")
-                                    u = b_data.get("unit_of_measurement") or b_data.get(
-                                        "unit"
-                                    )
-                                    extracted_entities.append(
-                                        {
-                                            "id": str(eid),
-                                            "name": str(
-                                                b_data.get("name")
-                                                or b_data.get("friendly_name")
-                                                or str(eid)
-                                                .split(".")[-1]
-                                                .replace("_", " ")
-                                                .title()
-                                            ),
-                                            "state": st if st is not None else "N/A",
-                                            "unit": str(u) if u else None,
-                                            "domain": (
-                                                "binary_sensor"
-                                                if str(eid).startswith("binary_sensor.")
-                                                else "sensor"
-                                            ),
-                                        }
-                                    )
-                            except Exception:
-                                pass
+                    # Varco section cards, else embedded JSON state objects
+                    records = await asyncio.to_thread(parse_share_page, body_str)
+                    extracted_entities.extend(r.as_entity() for r in records)
         except Exception as e:
             logger.debug("Varco share URL fallback query info", error=str(e))
 
@@ -413,392 +322,319 @@ async def _fetch_varco_data(
     return extracted_entities
 
 
-_sidecar_process: asyncio.subprocess.Process | None = None
 _first_sync_reported: bool = False
 
 
 async def _ensure_sidecar_running(enabled: bool, has_share_link: bool) -> None:
-    """Starts or stops backend/varco_worker.js Node.js process conditionally."""
-    global _sidecar_process
+    """Starts, health-checks or stops the Varco Node.js sidecar via its supervisor."""
+    await sidecar_supervisor.ensure(enabled and has_share_link)
 
-    should_run = enabled and has_share_link
-
-    if should_run:
-        if _sidecar_process is None or _sidecar_process.returncode is not None:
-            script_path = os.path.abspath(
-                os.path.join(os.path.dirname(__file__), "../../varco_worker.js")
-            )
-            node_binary = shutil.which("node") or "/usr/bin/node"
-            if os.path.exists(script_path):
-                try:
-                    _sidecar_process = await asyncio.create_subprocess_exec(
-                        node_binary,
-                        script_path,
-                        stdout=asyncio.subprocess.PIPE,
-                        stderr=asyncio.subprocess.PIPE,
-                    )
-                    add_system_log(
-                        "INFO",
-                        "Varco Node.js Sidecar Worker started",
-                        {"pid": _sidecar_process.pid, "path": script_path},
-                    )
 
-                    async def _read_stream(
-                        stream: asyncio.StreamReader | None, is_err: bool
-                    ) -> None:
-                        if not stream:
-                            return
-                        while not stream.at_eof():
-                            line = await stream.readline()
-                            if line:
-                                txt = line.decode().strip()
-                                if txt:
-                                    add_system_log(
-                                        (
-                                            "WARNING"
-                                            if is_err
-                                            else (
-                                                "INFO"
-                                                if (
-                                                    "PAIRING" in txt
-                                                    or "connected" in txt
-                                                )
-                                                else "DEBUG"
-                                            )
-                                        ),
-                                        f"Varco Worker {'Err' if is_err else 'Log'}: {txt}",
-                                        {"output" if not is_err else "error": txt},
-                                    )
+async def _query_sidecar_telemetry(
+    entity_ids: Collection[str] | None = None,
+) -> list[dict[str, Any]]:
+    """
+    Entity states from the Varco sidecar. Its subscription pushes changes over the
+    sidecar channel, so cached states are returned as is; only entities not cached
+    yet are fetched from Varco on demand. With `entity_ids`, only those entities
+    are returned.
+    """
+    if not sidecar_channel.connected:
+        return []
+    if entity_ids is None:
+        missing = None if not sidecar_channel.entities else ()
+    else:
+        missing = [eid for eid in entity_ids if eid not in sidecar_channel.entities]
+    success = True
+    if missing is None or missing:
+        success = await sidecar_channel.fetch(missing)
+    entities = sidecar_channel.states(entity_ids)
+    msg = (
+        f"Varco Sidecar Telemetry queried: online={sidecar_channel.online}, "
+        f"success={success}, count={len(entities)}"
+    )
+    add_system_log(
+        "DEBUG",
+        msg,
+        {
+            "online": sidecar_channel.online,
+            "success": success,
+            "count": len(entities),
+        },
+    )
+    return entities
 
-                    async def _read_sidecar_logs(
-                        proc: asyncio.subprocess.Process,
-                    ) -> None:
-                        await asyncio.gather(
-                            _read_stream(proc.stdout, False),
-                            _read_stream(proc.stderr, True),
-                        )
 
-                    asyncio.create_task(_read_sidecar_logs(_sidecar_process))
-                except Exception as err:
-                    add_system_log(
-                        "WARNING",
-                        f"Failed to start Varco Node.js Sidecar Worker: {err}",
-                        {"error": str(err)},
-                    )
-    elif _sidecar_process is not None and _sidecar_process.returncode is None:
-        try:
-            _sidecar_process.terminate()
-            await asyncio.wait_for(_sidecar_process.wait(), timeout=3.0)
-        except Exception:
-            with contextlib.suppress(Exception):
-                _sidecar_process.kill()
-        _sidecar_process = None
-        add_system_log(
-            "INFO",
-            "Varco Node.js Sidecar Worker stopped (Monitoring or Share Link disabled)",
-            {},
-        )
+def _on_sidecar_entities(entity_ids: list[str]) -> None:
+    """Schedules a collector pass for entities whose state the sidecar pushed."""
+    delay = poll_schedule.mark_changed(entity_ids)
+    if delay is not None:
+        scheduler.trigger(VARCO_COLLECTOR_JOB, delay)
 
 
-async def _query_sidecar_telemetry() -> list[dict[str, Any]]:
-    """Queries internal Node.js Varco Sidecar worker endpoint on 127.0.0.1:8089."""
-    try:
-        async with httpx.AsyncClient(timeout=3.0) as client:
-            resp = await client.get("http://127.0.0.1:8089/telemetry")
-            if resp.status_code == 200:
-                data = resp.json()
-                entities = data.get("entities", [])
-                success = data.get("success", True)
-                msg = (
-                    f"Varco Sidecar Telemetry queried: online={data.get('online')}, "
-                    f"success={success}, count={len(entities)}"
-                )
-                add_system_log(
-                    "DEBUG",
-                    msg,
-                    {
-                        "online": data.get("online"),
-                        "success": success,
-                        "count": len(entities),
-                    },
-                )
-                if success and entities and isinstance(entities, list):
-                    return entities
-    except Exception as sidecar_err:
-        logger.debug(
-            "Varco Sidecar Telemetry query failed",
-            exc_info=True,
-            error=str(sidecar_err),
-        )
-        add_system_log(
-            "DEBUG",
-            f"Varco Sidecar Telemetry query info: {sidecar_err}",
-            {"error": str(sidecar_err)},
-        )
-    return []
+sidecar_channel.add_listener(_on_sidecar_entities)
+sidecar_supervisor.on_restart_due = lambda delay: scheduler.trigger(
+    VARCO_COLLECTOR_JOB, delay
+)
 
 
-async def _run_collector_loop() -> None:
-    logger.info("Varco Background Collector started")
+async def collect_varco_telemetry() -> float:
+    """
+    One Varco collector pass (scheduled job). Polls the watched entities that are due
+    on the adaptive schedule and returns the seconds until the next one comes due, or
+    a short recheck while no client is watching.
+    """
     repo = MonitoringRepository()
+    async with repo.lock:
+        config = await repo.get_config()
+    await sidecar_channel.push_config(config)
+
+    # Only fetch what open clients show; nothing while no one is watching
+    demand = monitoring_sessions.demand(config)
+    if demand is None:
+        return INACTIVE_RECHECK_SECONDS
+    wanted = demand.entity_ids
+
+    varco_provider = next(
+        (p for p in config.providers if p.type == "varco" and p.enabled),
+        None,
+    )
+    has_link = bool(
+        varco_provider
+        and (varco_provider.url or (varco_provider.settings or {}).get("shareCode"))
+    )
 
-    while not _stop_event.is_set():
-        try:
-            async with repo.lock:
-                config = await repo.get_config()
-
-            # Pause telemetry polling if monitoring overlay is not active on any client
-            if not is_monitoring_active():
-                for _ in range(5):
-                    if _stop_event.is_set():
-                        break
-                    await asyncio.sleep(1)
-                continue
-
-            varco_provider = next(
-                (p for p in config.providers if p.type == "varco" and p.enabled),
-                None,
-            )
-            has_link = bool(
-                varco_provider
-                and (
-                    varco_provider.url
-                    or (varco_provider.settings or {}).get("shareCode")
-                )
+    # Determine interval (minimum 5s, maximum 86400s / 24h, default 60s)
+    interval = 60
+    if config.enabled:
+        if varco_provider and varco_provider.polling_interval_seconds:
+            interval = varco_provider.polling_interval_seconds
+        elif config.polling_interval_seconds:
+            interval = config.polling_interval_seconds
+
+    if demand.interval_seconds:
+        interval = min(interval, demand.interval_seconds)
+
+    interval = max(5, min(86400, interval))
+
+    # Entities this pass may poll: what clients show, or every known Varco entity
+    known = {e.id for e in config.entities if e.provider_id == VARCO_PROVIDER_ID}
+    candidates = wanted if wanted is not None else known
+    adaptive = settings.MONITORING_ADAPTIVE_POLLING
+    max_interval = max(interval, settings.MONITORING_POLL_MAX_SECONDS)
+    overrides = entity_poll_bounds(config, interval, max_interval)
+    # None queries every entity the share grants (legacy clients, discovery). Zone
+    # views only list entities that already have cards, so newly shared ones are
+    # picked up by a periodic full fetch for them too.
+    query: set[str] | None = wanted
+    if not known or poll_schedule.discovery_due():
+        query = None
+    elif adaptive:
+        query = poll_schedule.due(candidates)
+
+    # Ensure Sidecar worker is running ONLY if enabled and share link is present
+    await _ensure_sidecar_running(config.enabled, has_link)
+
+    if config.enabled and varco_provider and has_link and (query is None or query):
+        sidecar_collected = await _query_sidecar_telemetry(query)
+        collected = sidecar_collected or await _fetch_varco_data(
+            varco_provider.url or "", varco_provider.settings or {}
+        )
+        if collected and (adaptive or query is None):
+            poll_schedule.record(
+                candidates if query is None else query,
+                {c["id"]: c.get("state") for c in collected if c.get("id")},
+                interval,
+                max_interval,
+                overrides,
+                discovery=query is None,
             )
+        # Discovery passes persist everything so new entities get their cards
+        if wanted is not None and query is not None:
+            collected = [c for c in collected if c.get("id") in wanted]
+        if collected:
+            async with repo.lock:
+                fresh_config = await repo.get_config()
+                ent_map = {e.id: e for e in fresh_config.entities}
+                cards = list(fresh_config.cards)
+                existing_card_ids = {c.id for c in cards}
+                iso_now = datetime.datetime.now(datetime.timezone.utc).isoformat()
+
+                has_changed = False
+                for c in collected:
+                    eid = c["id"]
+                    existing = ent_map.get(eid)
+                    new_st = c.get("state", "N/A")
+                    raw_u = c.get("unit_of_measurement") or c.get("unit")
+                    new_u = raw_u or (
+                        existing.unit_of_measurement if existing else None
+                    )
+                    new_name = c.get("name") or (existing.name if existing else eid)
+                    new_dom = c.get("domain") or "sensor"
+                    new_vt = (
+                        "numeric"
+                        if isinstance(c.get("state"), (int, float))
+                        else "string"
+                    )
 
-            # Ensure Sidecar worker is running ONLY if enabled and share link is present
-            await _ensure_sidecar_running(config.enabled, has_link)
-
-            if config.enabled and varco_provider and has_link:
-                sidecar_collected = await _query_sidecar_telemetry()
-                collected = sidecar_collected or await _fetch_varco_data(
-                    varco_provider.url or "", varco_provider.settings or {}
-                )
-                if collected:
-                    async with repo.lock:
-                        fresh_config = await repo.get_config()
-                        ent_map = {e.id: e for e in fresh_config.entities}
-                        cards = list(fresh_config.cards)
-                        existing_card_ids = {c.id for c in cards}
-                        iso_now = datetime.datetime.now(
-                            datetime.timezone.utc
-                        ).isoformat()
-
-                        has_changed = False
-                        for c in collected:
-                            eid = c["id"]
-                            existing = ent_map.get(eid)
-                            new_st = c.get("state", "N/A")
-                            raw_u = c.get("unit_of_measurement") or c.get("unit")
-                            new_u = raw_u or (
-                                existing.unit_of_measurement if existing else None
-                            )
-                            new_name = c.get("name") or (
-                                existing.name if existing else eid
-                            )
-                            new_dom = c.get("domain") or "sensor"
-                            new_vt = (
-                                "numeric"
-                                if isinstance(c.get("state"), (int, float))
-                                else "string"
-                            )
+                    if (
+                        not existing
+                        or existing.state != new_st
+                        or existing.unit_of_measurement != new_u
+                        or existing.name != new_name
+                        or existing.domain != new_dom
+                        or existing.value_type != new_vt
+                    ):
+                        has_changed = True
+
+                    ent_map[eid] = MonitoringEntity(
+                        id=eid,
+                        provider_id=VARCO_PROVIDER_ID,
+                        name=new_name,
+                        domain=new_dom,
+                        value_type=new_vt,
+                        state=new_st,
+                        unit_of_measurement=new_u,
+                        last_updated=(
+                            iso_now
+                            if (not existing or existing.state != new_st)
+                            else (existing.last_updated if existing else iso_now)
+                        ),
+                    )
 
+                    # Auto-create missing card for newly discovered entity
+                    card_id = f"card-{eid.replace('.', '-')}"
+                    if card_id not in existing_card_ids:
+                        is_bin = eid.startswith("binary_sensor.")
+                        card_type = (
+                            "status_beacon"
                             if (
-                                not existing
-                                or existing.state != new_st
-                                or existing.unit_of_measurement != new_u
-                                or existing.name != new_name
-                                or existing.domain != new_dom
-                                or existing.value_type != new_vt
-                            ):
-                                has_changed = True
-
-                            ent_map[eid] = MonitoringEntity(
-                                id=eid,
-                                provider_id="varco-server",
-                                name=new_name,
-                                domain=new_dom,
-                                value_type=new_vt,
-                                state=new_st,
-                                unit_of_measurement=new_u,
-                                last_updated=(
-                                    iso_now
-                                    if (not existing or existing.state != new_st)
-                                    else (
-                                        existing.last_updated if existing else iso_now
-                                    )
-                                ),
+                                is_bin
+                                or any(
+                                    k in eid
+                                    for k in [
+                                        "status",
+                                        "online",
+                                        "state",
+                                        "virtualmachine",
+                                        "server",
+                                        "icmp",
+                                    ]
+                                )
                             )
-
-                            # Auto-create missing card for newly discovered entity
-                            card_id = f"card-{eid.replace('.', '-')}"
-                            if card_id not in existing_card_ids:
-                                is_bin = eid.startswith("binary_sensor.")
-                                card_type = (
-                                    "status_beacon"
-                                    if (
-                                        is_bin
-                                        or any(
-                                            k in eid
-                                            for k in [
-                                                "status",
-                                                "online",
-                                                "state",
-                                                "virtualmachine",
-                                                "server",
-                                                "icmp",
-                                            ]
-                                        )
-                                    )
-                                    else (
-                                        "live_traffic"
-                                        if any(
-                                            k in eid
-                                            for k in [
-                                                "download",
-                                                "upload",
-                                                "speed",
-                                                "bandwidth",
-                                                "traffic",
-                                            ]
-                                        )
-                                        else (
-                                            "gauge"
-                                            if any(
-                                                k in eid
-                                                for k in [
-                                                    "ping",
-                                                    "latency",
-                                                    "cpu",
-                                                    "temp",
-                                                    "memory",
-                                                    "usage",
-                                                ]
-                                            )
-                                            else "metric_card"
-                                        )
-                                    )
+                            else (
+                                "live_traffic"
+                                if any(
+                                    k in eid
+                                    for k in [
+                                        "download",
+                                        "upload",
+                                        "speed",
+                                        "bandwidth",
+                                        "traffic",
+                                    ]
                                 )
-                                from app.schemas.monitoring import MonitoringCard
-
-                                cards.append(
-                                    MonitoringCard(
-                                        id=card_id,
-                                        title=c.get("name")
-                                        or eid.split(".")[-1].replace("_", " ").title(),
-                                        card_type=card_type,
-                                        entity_ids=[eid],
-                                        zone_id=(
-                                            "network"
-                                            if any(
-                                                k in eid
-                                                for k in [
-                                                    "speedtest",
-                                                    "ping",
-                                                    "net",
-                                                    "traffic",
-                                                    "icmp",
-                                                    "virtualmachine",
-                                                    "server",
-                                                ]
-                                            )
-                                            else "overview"
-                                        ),
-                                        x=0,
-                                        y=0,
-                                        w=2,
-                                        h=2,
+                                else (
+                                    "gauge"
+                                    if any(
+                                        k in eid
+                                        for k in [
+                                            "ping",
+                                            "latency",
+                                            "cpu",
+                                            "temp",
+                                            "memory",
+                                            "usage",
+                                        ]
                                     )
+                                    else "metric_card"
                                 )
-                                existing_card_ids.add(card_id)
-                                has_changed = True
-
-                        if has_changed or len(ent_map) != len(fresh_config.entities):
-                            fresh_config.entities = list(ent_map.values())
-                            fresh_config.cards = cards
-                            await repo.save_config(fresh_config)
-
-                            add_system_log(
-                                "INFO",
-                                f"Varco Collector synced {len(collected)} entities to server config",
-                                {
-                                    "count": len(collected),
-                                    "first_entity": collected[0] if collected else None,
-                                },
                             )
-                            logger.info(
-                                "Varco Background Collector synced entities",
-                                count=len(collected),
+                        )
+                        from app.schemas.monitoring import MonitoringCard
+
+                        cards.append(
+                            MonitoringCard(
+                                id=card_id,
+                                title=c.get("name")
+                                or eid.split(".")[-1].replace("_", " ").title(),
+                                card_type=card_type,
+                                entity_ids=[eid],
+                                zone_id=(
+                                    "network"
+                                    if any(
+                                        k in eid
+                                        for k in [
+                                            "speedtest",
+                                            "ping",
+                                            "net",
+                                            "traffic",
+                                            "icmp",
+                                            "virtualmachine",
+                                            "server",
+                                        ]
+                                    )
+                                    else "overview"
+                                ),
+                                x=0,
+                                y=0,
+                                w=2,
+                                h=2,
                             )
+                        )
+                        existing_card_ids.add(card_id)
+                        has_changed = True
 
-                        if collected:
-                            global _first_sync_reported
-                            if not _first_sync_reported:
-                                _first_sync_reported = True
-                                sett = varco_provider.settings or {}
-                                pk = sett.get("privateKey") or sett.get("private_key")
-                                auth_id = sett.get("authorityId") or sett.get(
-                                    "authority_id"
-                                )
-                                sc = sett.get("shareCode") or sett.get("share_code")
-                                credentials_ready = bool(pk and auth_id and sc)
-
-                                status_str = "YES" if credentials_ready else "PENDING"
-                                pk_str = "OK" if pk else "Missing"
-                                auth_str = "OK" if auth_id else "Missing"
-                                msg = (
-                                    f"Varco First Successful Sync Verified! Synced {len(collected)} entities. "
-                                    f"Credentials persisted for future background sync: {status_str} "
-                                    f"(privateKey: {pk_str}, authorityId: {auth_str})"
-                                )
-                                add_system_log(
-                                    "INFO",
-                                    msg,
-                                    {
-                                        "count": len(collected),
-                                        "credentials_ready": credentials_ready,
-                                        "has_private_key": bool(pk),
-                                        "has_authority_id": bool(auth_id),
-                                        "has_share_code": bool(sc),
-                                    },
-                                )
-
-            # Determine interval (minimum 5s, maximum 86400s / 24h, default 60s)
-            interval = 60
-            if config.enabled:
-                if varco_provider and varco_provider.polling_interval_seconds:
-                    interval = varco_provider.polling_interval_seconds
-                elif config.polling_interval_seconds:
-                    interval = config.polling_interval_seconds
-
-            interval = max(5, min(86400, interval))
-
-            # Sleep in small ticks to respond quickly to shutdown
-            for _ in range(interval):
-                if _stop_event.is_set():
-                    break
-                await asyncio.sleep(1)
-
-        except Exception as e:
-            logger.warning("Error in Varco Background Collector loop", exc_info=e)
-            await asyncio.sleep(15)
-
-    logger.info("Varco Background Collector stopped")
-
+                if has_changed or len(ent_map) != len(fresh_config.entities):
+                    fresh_config.entities = list(ent_map.values())
+                    fresh_config.cards = cards
+                    await repo.save_config(fresh_config)
 
-def start_varco_collector() -> None:
-    global _collector_task
-    _stop_event.clear()
-    if _collector_task is None or _collector_task.done():
-        _collector_task = asyncio.create_task(_run_collector_loop())
+                    add_system_log(
+                        "INFO",
+                        f"Varco Collector synced {len(collected)} entities to server config",
+                        {
+                            "count": len(collected),
+                            "first_entity": collected[0] if collected else None,
+                        },
+                    )
+                    logger.info(
+                        "Varco Background Collector synced entities",
+                        count=len(collected),
+                    )
 
+                if collected:
+                    global _first_sync_reported
+                    if not _first_sync_reported:
+                        _first_sync_reported = True
+                        sett = varco_provider.settings or {}
+                        pk = sett.get("privateKey") or sett.get("private_key")
+                        auth_id = sett.get("authorityId") or sett.get("authority_id")
+                        sc = sett.get("shareCode") or sett.get("share_code")
+                        credentials_ready = bool(pk and auth_id and sc)
+
+                        status_str = "YES" if credentials_ready else "PENDING"
+                        pk_str = "OK" if pk else "Missing"
+                        auth_str = "OK" if auth_id else "Missing"
+                        msg = (
+                            f"Varco First Successful Sync Verified! Synced {len(collected)} entities. "
+                            f"Credentials persisted for future background sync: {status_str} "
+                            f"(privateKey: {pk_str}, authorityId: {auth_str})"
+                        )
+                        add_system_log(
+                            "INFO",
+                            msg,
+                            {
+                                "count": len(collected),
+                                "credentials_ready": credentials_ready,
+                                "has_private_key": bool(pk),
+                                "has_authority_id": bool(auth_id),
+                                "has_share_code": bool(sc),
+                            },
+                        )
 
-async def stop_varco_collector() -> None:
-    global _collector_task
-    _stop_event.set()
-    if _collector_task and not _collector_task.done():
-        _collector_task.cancel()
-        with contextlib.suppress(asyncio.CancelledError):
-            await _collector_task
-    _collector_task = None
+    if not adaptive or not config.enabled or not has_link:
+        return interval
+    # Sleep until the earliest candidate is due; a view change triggers a pass earlier
+    delay = min(poll_schedule.next_delay(candidates, interval), max_interval)
+    return max(5, min(86400, delay))
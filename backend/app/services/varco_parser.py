@@ -0,0 +1,128 @@
+import contextlib
+import json
+import re
+from collections.abc import Iterator
+from dataclasses import dataclass
+from typing import Any
+
+# Card fields inside a section, matched only within the section's bounds
+_FIELD_RE = re.compile(
+    r'class="varco-card__(?:(?P<field>state|unit)">(?P<value>[^<]+)</span>'
+    r'|title">(?P<title>[^<]+)</div>)'
+)
+_ENTITY_ATTR_RE = re.compile(r'data-entity="([^"]+)"')
+# Innermost JSON objects (no nested braces); filtered cheaply before json.loads
+_FLAT_OBJECT_RE = re.compile(r"\{[^{}]*\}")
+_ENTITY_ID_RE = re.compile(r'"id":\s*"(?:sensor|binary_sensor)\.[^"]+"')
+
+
+@dataclass(slots=True)
+class VarcoEntityRecord:
+    id: str
+    state: Any
+    name: str | None = None
+    unit: str | None = None
+
+    @property
+    def domain(self) -> str:
+        return "binary_sensor" if self.id.startswith("binary_sensor.") else "sensor"
+
+    @property
+    def display_name(self) -> str:
+        return self.name or self.id.split(".")[-1].replace("_", " ").title()
+
+    def as_entity(self) -> dict[str, Any]:
+        """Entity dict in the shape the collector and manifest import consume."""
+        return {
+            "id": self.id,
+            "name": self.display_name,
+            "state": self.state,
+            "unit": self.unit,
+            "domain": self.domain,
+        }
+
+
+def split_state_text(text: str) -> tuple[Any, str | None]:
+    """Splits a rendered state like "93.4 Mbit/s" into (93.4, "Mbit/s")."""
+    parts = text.split()
+    value: Any = parts[0] if parts else text
+    unit = parts[1] if len(parts) > 1 else None
+    with contextlib.suppress(ValueError):
+        value = float(value)
+    return value, unit
+
+
+def iter_share_sections(html: str) -> Iterator[VarcoEntityRecord]:
+    """
+    Streams the entity cards (`<section data-entity=...>`) of a Varco share page in
+    one forward pass. The first state, title and unit inside a section are used;
+    sections without a state are skipped. An unclosed section ends at the next
+    section, so malformed pages stay linear.
+    """
+    length = len(html)
+    close = 0
+    pos = html.find("<section")
+    while pos != -1:
+        tag_end = html.find(">", pos)
+        if tag_end == -1:
+            return
+        next_section = html.find("<section", tag_end)
+        entity_match = _ENTITY_ATTR_RE.search(html, pos, tag_end)
+        if entity_match is None:
+            pos = next_section
+            continue
+        if close != length and close < tag_end:
+            # Searched once per closing tag; a page without one is not rescanned
+            close = html.find("</section>", tag_end)
+            if close == -1:
+                close = length
+        body_end = close
+        if next_section != -1 and next_section < body_end:
+            # Nested or unclosed: the body runs to the next section start
+            body_end = next_section
+        fields: dict[str, str] = {}
+        for match in _FIELD_RE.finditer(html, tag_end, body_end):
+            if match.group("title") is not None:
+                fields.setdefault("title", match.group("title").strip())
+            else:
+                fields.setdefault(match.group("field"), match.group("value").strip())
+        if "state" in fields:
+            yield VarcoEntityRecord(
+                id=entity_match.group(1).strip(),
+                state=fields["state"],
+                name=fields.get("title"),
+                unit=fields.get("unit"),
+            )
+        pos = html.find("<section", body_end) if body_end < length else -1
+
+
+def iter_json_entities(html: str) -> Iterator[VarcoEntityRecord]:
+    """Entity state objects embedded as JSON (script tags, data attributes)."""
+    for match in _FLAT_OBJECT_RE.finditer(html):
+        blob = match.group(0)
+        if '"entity_id"' not in blob and not _ENTITY_ID_RE.search(blob):
+            continue
+        try:
+            data = json.loads(blob)
+        except ValueError:
+            continue
+        eid = data.get("entity_id") or data.get("id")
+        if not eid:
+            continue
+        state = data.get("state")
+        snapshot = data.get("state_snapshot")
+        if isinstance(snapshot, dict) and snapshot.get("state") is not None:
+            state = snapshot.get("state")
+        unit = data.get("unit_of_measurement") or data.get("unit")
+        name = data.get("name") or data.get("friendly_name")
+        yield VarcoEntityRecord(
+            id=str(eid),
+            state=state if state is not None else "N/A",
+            name=str(name) if name else None,
+            unit=str(unit) if unit else None,
+        )
+
+
+def parse_share_page(html: str) -> list[VarcoEntityRecord]:
+    """Entity cards of a share page, falling back to embedded JSON state objects."""
+    return list(iter_share_sections(html)) or list(iter_json_entities(html))
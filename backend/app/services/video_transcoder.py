@@ -0,0 +1,196 @@
+import asyncio
+import json
+import os
+import shutil
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+import structlog
+
+from app.core.config import settings
+
+logger = structlog.get_logger()
+
+ProgressCallback = Callable[[float], None]
+
+_slots: asyncio.Semaphore | None = None
+
+
+def _transcode_slots() -> asyncio.Semaphore:
+    global _slots
+    if _slots is None:
+        _slots = asyncio.Semaphore(max(1, settings.MEDIA_TRANSCODE_CONCURRENCY))
+    return _slots
+
+
+@dataclass(frozen=True)
+class VideoOutput:
+    kind: str
+    file: str
+    args: tuple[str, ...]
+
+
+# Scales down to 720p (never up) and keeps even dimensions for the encoders
+_SCALE_720 = "scale=-2:'min(720,ih)'"
+
+VIDEO_OUTPUTS = (
+    VideoOutput(
+        kind="poster",
+        file="poster.jpg",
+        args=("-frames:v", "1", "-vf", "scale=-2:'min(1080,ih)'", "-q:v", "3"),
+    ),
+    VideoOutput(
+        kind="720p",
+        file="720p.mp4",
+        args=(
+            "-vf", _SCALE_720,
+            "-c:v", "libx264", "-preset", "veryfast", "-crf", "28",
+            "-maxrate", "1500k", "-bufsize", "3000k", "-pix_fmt", "yuv420p",
+            "-c:a", "aac", "-b:a", "96k", "-movflags", "+faststart",
+        ),
+    ),
+    VideoOutput(
+        kind="loop",
+        file="loop.webm",
+        args=(
+            "-vf", _SCALE_720, "-an",
+            "-c:v", "libvpx-vp9", "-crf", "40", "-b:v", "0", "-row-mt", "1",
+            "-deadline", "good", "-cpu-used", "4",
+            # Short closed GOPs so the player can restart the loop without a stall
+            "-g", "60",
+        ),
+    ),
+)  # fmt: skip
+
+
+def ffmpeg_available() -> bool:
+    return (
+        settings.MEDIA_TRANSCODE_ENABLED
+        and shutil.which(settings.FFMPEG_PATH) is not None
+        and shutil.which(settings.FFPROBE_PATH) is not None
+    )
+
+
+def parse_progress_line(line: str) -> float | None:
+    """Returns the output position in seconds from an `ffmpeg -progress` line, if any."""
+    key, _, value = line.strip().partition("=")
+    if key in ("out_time_us", "out_time_ms") and value.isdigit():
+        # Both keys are reported in microseconds
+        return int(value) / 1_000_000
+    return None
+
+
+async def probe_video(path: str) -> dict[str, Any]:
+    proc = await asyncio.create_subprocess_exec(
+        settings.FFPROBE_PATH,
+        "-v", "error",
+        "-select_streams", "v:0",
+        "-show_entries", "stream=width,height:format=duration",
+        "-of", "json",
+        path,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )  # fmt: skip
+    stdout, stderr = await proc.communicate()
+    if proc.returncode != 0:
+        raise RuntimeError(f"ffprobe failed: {stderr.decode(errors='replace')[-300:]}")
+    data = json.loads(stdout or b"{}")
+    stream = (data.get("streams") or [{}])[0]
+    duration = float((data.get("format") or {}).get("duration") or 0.0)
+    return {
+        "width": stream.get("width"),
+        "height": stream.get("height"),
+        "duration": duration,
+    }
+
+
+async def _run_ffmpeg(
+    src_path: str,
+    out_path: str,
+    output: VideoOutput,
+    duration: float,
+    on_progress: ProgressCallback,
+) -> None:
+    args = [settings.FFMPEG_PATH, "-hide_banner", "-nostats", "-y"]
+    if output.kind == "poster":
+        # Poster frame: seek a little into the clip to skip black intro frames
+        args += ["-ss", str(min(1.0, duration / 2))]
+    args += ["-i", src_path]
+    if output.kind == "loop":
+        args += ["-t", str(settings.MEDIA_LOOP_MAX_SECONDS)]
+    args += [*output.args, "-progress", "pipe:1", out_path]
+
+    proc = await asyncio.create_subprocess_exec(
+        *args,
+        stdin=asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    assert proc.stdout is not None and proc.stderr is not None
+    stderr_task = asyncio.create_task(proc.stderr.read())
+    try:
+        expected = duration
+        if output.kind == "loop":
+            expected = min(duration, settings.MEDIA_LOOP_MAX_SECONDS)
+        async for raw in proc.stdout:
+            position = parse_progress_line(raw.decode(errors="replace"))
+            if position is not None and expected > 0:
+                on_progress(min(1.0, position / expected))
+        returncode = await proc.wait()
+    except asyncio.CancelledError:
+        proc.kill()
+        await proc.wait()
+        raise
+    finally:
+        stderr = await stderr_task
+    if returncode != 0:
+        raise RuntimeError(
+            f"ffmpeg {output.kind} failed: {stderr.decode(errors='replace')[-300:]}"
+        )
+    on_progress(1.0)
+
+
+async def transcode_video(
+    src_path: str, out_dir: str, on_progress: ProgressCallback
+) -> dict[str, Any]:
+    """
+    Produces a poster frame, a low-bitrate 720p MP4 and a muted loop WebM of a video.
+
+    At most MEDIA_TRANSCODE_CONCURRENCY videos are transcoded at a time; each runs as
+    ffmpeg child processes. `on_progress` receives the overall progress (0..1).
+    Outputs are written to `out_dir` under temp names and renamed once complete.
+    """
+    async with _transcode_slots():
+        return await _transcode(src_path, out_dir, on_progress)
+
+
+async def _transcode(
+    src_path: str, out_dir: str, on_progress: ProgressCallback
+) -> dict[str, Any]:
+    info = await probe_video(src_path)
+    os.makedirs(out_dir, exist_ok=True)
+    outputs = []
+    for step, output in enumerate(VIDEO_OUTPUTS):
+        name, ext = os.path.splitext(output.file)
+        tmp_path = os.path.join(out_dir, f".{name}.tmp{ext}")
+        final_path = os.path.join(out_dir, output.file)
+        await _run_ffmpeg(
+            src_path,
+            tmp_path,
+            output,
+            info["duration"],
+            lambda fraction, step=step: on_progress(
+                (step + fraction) / len(VIDEO_OUTPUTS)
+            ),
+        )
+        os.replace(tmp_path, final_path)
+        outputs.append(
+            {
+                "kind": output.kind,
+                "format": ext.lstrip("."),
+                "file": output.file,
+                "size": os.path.getsize(final_path),
+            }
+        )
+    return {**info, "outputs": outputs}
@@ -0,0 +1,243 @@
+import asyncio
+import contextlib
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Any
+
+import structlog
+
+from app.core.config import settings
+from app.core.exceptions import BackendException
+from app.repositories.repos import ConfigRepository
+from app.schemas.config import WidgetDefaults
+
+logger = structlog.get_logger()
+
+_TITLE_KEYS = ("name", "title", "trip_name", "destination", "summary", "text")
+_DATE_KEYS = (
+    "startDate",
+    "date",
+    "targetDate",
+    "start_date",
+    "start",
+    "departure",
+    "departureDate",
+    "timestamp",
+)
+_DESTINATION_KEYS = ("destination", "location", "city", "place")
+# Only explicit delivery/event ids: a generic "id" usually names the trip itself
+_EVENT_ID_KEYS = ("event_id", "eventId", "delivery_id", "deliveryId")
+_MAX_SEEN = 10_000
+
+
+class WebhookQueueFullException(BackendException):
+    def __init__(self) -> None:
+        super().__init__(
+            "Webhook queue is full, retry later", code="QUEUE_FULL", status_code=503
+        )
+        self.headers = {"Retry-After": "5"}
+
+
+class WebhookQueueClosedException(BackendException):
+    def __init__(self) -> None:
+        super().__init__(
+            "Server is shutting down, retry later",
+            code="SHUTTING_DOWN",
+            status_code=503,
+        )
+        self.headers = {"Retry-After": "5"}
+
+
+def _first(data: dict[str, Any], keys: tuple[str, ...]) -> Any:
+    for key in keys:
+        if data.get(key):
+            return data[key]
+    return None
+
+
+def vacation_update(payload: dict[str, Any]) -> dict[str, str] | None:
+    """
+    Extracts the widget default fields a trip planner payload updates, or None when
+    it carries no target date.
+    """
+    trip_data = payload
+    for key in ("data", "trip", "vacation", "attributes", "payload"):
+        if isinstance(payload.get(key), dict):
+            trip_data = payload[key]
+            break
+
+    target_date = _first(trip_data, _DATE_KEYS)
+    if not target_date:
+        return None
+    update = {
+        "vacationTitle": str(_first(trip_data, _TITLE_KEYS) or "Nächster Urlaub"),
+        "vacationDate": str(target_date),
+    }
+    destination = _first(trip_data, _DESTINATION_KEYS)
+    if destination:
+        update["vacationDestination"] = str(destination)
+    return update
+
+
+def delivery_key(payload: dict[str, Any], delivery_id: str | None = None) -> str:
+    """
+    The sender's delivery id (X-Delivery-Id header or an event/delivery id in the
+    payload) if it provides one, else a hash of the canonical payload.
+    """
+    if delivery_id:
+        return f"id:{delivery_id}"
+    event_id = _first(payload, _EVENT_ID_KEYS)
+    if event_id is not None and isinstance(event_id, (str, int)):
+        return f"id:{event_id}"
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return "sha256:" + hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class WebhookQueue:
+    """
+    Bounded in-process queue for webhook updates to the widget defaults.
+
+    Deliveries are acknowledged before processing; retries of a delivery (delivery id
+    or payload hash) that is still queued, or was applied within
+    WEBHOOK_DEDUPE_WINDOW_SECONDS, are dropped. A delivery only counts as seen once
+    its update has been saved, so retries of a failed one are accepted. The worker
+    merges everything queued within WEBHOOK_COALESCE_SECONDS into a single config
+    save. On shutdown new deliveries are refused and the acknowledged ones are
+    applied (up to WEBHOOK_DRAIN_TIMEOUT_SECONDS) before the worker is cancelled.
+    """
+
+    def __init__(self) -> None:
+        self._queue: asyncio.Queue[tuple[str, dict[str, str]]] | None = None
+        self._task: asyncio.Task | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._seen: OrderedDict[str, float] = OrderedDict()
+        self._pending: set[str] = set()
+        self._closed = False
+        self.saves = 0
+
+    def _ensure_worker(self) -> asyncio.Queue[tuple[str, dict[str, str]]]:
+        loop = asyncio.get_running_loop()
+        if self._queue is None or self._loop is not loop:
+            self._queue = asyncio.Queue(maxsize=max(1, settings.WEBHOOK_QUEUE_SIZE))
+            self._loop = loop
+            self._task = None
+            self._pending.clear()
+            self._closed = False
+        if self._closed:
+            raise WebhookQueueClosedException()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        return self._queue
+
+    def _prune_seen(self, now: float) -> None:
+        window = settings.WEBHOOK_DEDUPE_WINDOW_SECONDS
+        while self._seen:
+            oldest_key, seen_at = next(iter(self._seen.items()))
+            if now - seen_at < window and len(self._seen) <= _MAX_SEEN:
+                break
+            del self._seen[oldest_key]
+
+    def submit(self, key: str, update: dict[str, str]) -> bool:
+        """
+        Queues `update` for the widget defaults. Returns False if it is a duplicate
+        delivery; raises WebhookQueueFullException when the queue is at capacity and
+        WebhookQueueClosedException once shutdown has begun.
+        """
+        queue = self._ensure_worker()
+        now = time.monotonic()
+        self._prune_seen(now)
+        if key in self._seen or key in self._pending:
+            return False
+        if queue.full():
+            raise WebhookQueueFullException()
+        self._pending.add(key)
+        queue.put_nowait((key, update))
+        return True
+
+    async def _drain(
+        self, first: tuple[str, dict[str, str]]
+    ) -> tuple[dict[str, str], list[str]]:
+        assert self._queue is not None
+        keys = [first[0]]
+        merged = dict(first[1])
+        deadline = time.monotonic() + settings.WEBHOOK_COALESCE_SECONDS
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except asyncio.QueueEmpty:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), remaining)
+                except TimeoutError:
+                    break
+            keys.append(item[0])
+            merged.update(item[1])
+        return merged, keys
+
+    async def _apply(self, update: dict[str, str]) -> None:
+        config_repo = ConfigRepository()
+        config = await config_repo.get_config()
+        if not config.layoutConfig.widgetDefaults:
+            config.layoutConfig.widgetDefaults = WidgetDefaults()
+        for field, value in update.items():
+            setattr(config.layoutConfig.widgetDefaults, field, value)
+        await config_repo.save_config(config)
+        self.saves += 1
+
+    async def _run(self) -> None:
+        assert self._queue is not None
+        queue = self._queue
+        while True:
+            first = await queue.get()
+            keys = [first[0]]
+            try:
+                update, keys = await self._drain(first)
+                await self._apply(update)
+                now = time.monotonic()
+                for key in keys:
+                    self._seen[key] = now
+                logger.info(
+                    "Vacation webhook updated successfully",
+                    title=update.get("vacationTitle"),
+                    date=update.get("vacationDate"),
+                    coalesced=len(keys),
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Failed applying vacation webhook update", exc_info=e)
+            finally:
+                self._pending.difference_update(keys)
+                for _ in keys:
+                    queue.task_done()
+
+    async def join(self) -> None:
+        """Waits until every queued update has been applied."""
+        if self._queue is not None and self._loop is asyncio.get_running_loop():
+            await self._queue.join()
+
+    async def stop(self, timeout: float | None = None) -> None:
+        """Refuses new deliveries, applies the queued ones, then stops the worker."""
+        self._closed = True
+        if timeout is None:
+            timeout = settings.WEBHOOK_DRAIN_TIMEOUT_SECONDS
+        if self._task and not self._task.done():
+            try:
+                await asyncio.wait_for(self.join(), timeout)
+            except TimeoutError:
+                logger.warning(
+                    "Dropping unapplied vacation webhook updates on shutdown",
+                    pending=len(self._pending),
+                )
+        if self._task and not self._task.done():
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+        self._task = None
+
+
+webhook_queue = WebhookQueue()
@@ -0,0 +1,99 @@
+import asyncio
+import hashlib
+import hmac
+import os
+from collections.abc import Iterable
+
+from app.repositories.repos import AppRepository, ConfigRepository
+from app.schemas.app import App
+
+
+def _digest(secret: str) -> bytes:
+    return hashlib.sha256(secret.encode("utf-8")).digest()
+
+
+def _file_stamp(path: str) -> tuple[int, int, int] | None:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+def _app_secrets(apps: Iterable[App]) -> Iterable[str]:
+    for app in apps:
+        if app.api_config and isinstance(app.api_config, dict):
+            sec = app.api_config.get("vacationSecret")
+            enabled = app.api_config.get("webhookEnabled", True)
+            if sec and enabled:
+                yield str(sec)
+
+
+class WebhookSecretIndex:
+    """
+    Valid webhook secrets (config default and per-app), stored as SHA-256 digests.
+
+    Rebuilt only when config.json or apps.json changed: in-process saves bump the
+    repositories' generation, and external edits are picked up from the inode, mtime
+    and size of the two files (writes to other files in the data directory do not
+    count). A request therefore costs two stats, a hash and a constant-time comparison
+    against every configured digest instead of reading and validating both files.
+    """
+
+    def __init__(self) -> None:
+        self._digests: tuple[bytes, ...] = ()
+        self._version: tuple | None = None
+        self._lock = asyncio.Lock()
+
+    @staticmethod
+    def _current_version(
+        config_repo: ConfigRepository, app_repo: AppRepository
+    ) -> tuple:
+        config_path = str(config_repo.file_path)
+        apps_path = str(app_repo.file_path)
+        return (
+            config_path,
+            config_repo.generation,
+            _file_stamp(config_path),
+            apps_path,
+            app_repo.generation,
+            _file_stamp(apps_path),
+        )
+
+    async def _refresh(self) -> None:
+        config_repo = ConfigRepository()
+        app_repo = AppRepository()
+        version = self._current_version(config_repo, app_repo)
+        if version == self._version:
+            return
+        async with self._lock:
+            if version == self._version:
+                return
+            config = await config_repo.get_config()
+            apps = await app_repo.read_all()
+
+            secrets: set[str] = set()
+            defaults = config.layoutConfig.widgetDefaults
+            if defaults and defaults.vacationSecret:
+                secrets.add(defaults.vacationSecret)
+            secrets.update(_app_secrets(apps))
+
+            self._digests = tuple(map(_digest, secrets))
+            self._version = version
+
+    async def matches(self, provided: str | None) -> bool:
+        if not provided:
+            return False
+        await self._refresh()
+        digest = _digest(provided)
+        matched = False
+        # No early exit: the time taken does not reveal which secret matched
+        for stored in self._digests:
+            matched |= hmac.compare_digest(stored, digest)
+        return matched
+
+    def invalidate(self) -> None:
+        self._version = None
+
+
+webhook_secrets = WebhookSecretIndex()
@@ -0,0 +1,235 @@
+import asyncio
+import time
+from datetime import timedelta
+
+import pytest
+from fastapi import Request
+from httpx import ASGITransport, AsyncClient
+
+from app.core import security
+from app.core.config import settings
+from app.main import app
+from app.services.login_limiter import LoginRateLimiter, client_ip, login_limiter
+
+
+@pytest.fixture
+def auth_data(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(security, "_hash_limiter", None)
+    security.invalidate_password_cache()
+    security.setup_password("correct horse")
+    login_limiter.reset()
+    yield tmp_path
+    security.invalidate_password_cache()
+    login_limiter.reset()
+
+
+def test_password_hash_is_cached_until_changed(auth_data, monkeypatch):
+    assert security.check_password("correct horse")
+
+    reads = []
+    real_open = open
+
+    def counting_open(path, *args, **kwargs):
+        reads.append(path)
+        return real_open(path, *args, **kwargs)
+
+    with monkeypatch.context() as patched:
+        patched.setattr("builtins.open", counting_open)
+        assert security.check_password("correct horse")
+        assert not security.check_password("wrong")
+    assert reads == []
+
+    security.setup_password("battery staple")
+    assert security.check_password("battery staple")
+    assert not security.check_password("correct horse")
+
+
+@pytest.mark.asyncio
+async def test_login_burst_does_not_block_other_requests(auth_data, monkeypatch):
+    monkeypatch.setattr(settings, "AUTH_RATE_LIMIT_BURST", 100)
+    started = time.perf_counter()
+    security.check_password("correct horse")
+    single_hash = time.perf_counter() - started
+
+    latencies: list[float] = []
+    burst_done = asyncio.Event()
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as ac:
+
+        async def poll_health() -> None:
+            while not burst_done.is_set():
+                t0 = time.perf_counter()
+                resp = await ac.get("/health")
+                latencies.append(time.perf_counter() - t0)
+                assert resp.status_code == 200
+                await asyncio.sleep(0.002)
+
+        async def burst() -> None:
+            results = await asyncio.gather(
+                *(
+                    ac.post("/api/v1/auth/login", json={"password": f"guess-{i}"})
+                    for i in range(12)
+                )
+            )
+            burst_done.set()
+            assert all(r.status_code == 401 for r in results)
+
+        await asyncio.gather(poll_health(), burst())
+
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    # Hashing inline would stall /health behind the whole burst (~12 hashes)
+    assert len(latencies) >= 5
+    assert p99 < max(0.25, 3 * single_hash)
+
+
+def test_limiter_refills_and_locks_out_exponentially(monkeypatch):
+    monkeypatch.setattr(settings, "AUTH_RATE_LIMIT_BURST", 2)
+    monkeypatch.setattr(settings, "AUTH_RATE_LIMIT_PER_MINUTE", 60.0)
+    monkeypatch.setattr(settings, "AUTH_LOCKOUT_THRESHOLD", 3)
+    monkeypatch.setattr(settings, "AUTH_LOCKOUT_BASE_SECONDS", 10)
+    now = [0.0]
+    limiter = LoginRateLimiter(clock=lambda: now[0])
+
+    assert limiter.acquire("a") is None
+    assert limiter.acquire("a") is None
+    assert limiter.acquire("a") == pytest.approx(1.0)
+    assert limiter.acquire("b") is None
+    now[0] += 1.0
+    assert limiter.acquire("a") is None
+
+    for _ in range(3):
+        limiter.record_failure("a")
+    now[0] += 5
+    assert limiter.acquire("a") == pytest.approx(5.0)
+    now[0] += 5
+    limiter.record_failure("a")
+    assert limiter.acquire("a") == pytest.approx(20.0)
+
+    limiter.record_success("a")
+    assert limiter.acquire("a") is None
+    stats = limiter.stats()
+    assert stats["lockouts"] == 2
+    assert stats["locked_out"] == 2
+    assert stats["tracked_clients"] == 2
+
+
+def test_client_ip_trusts_only_configured_proxies(monkeypatch):
+    def request(peer: str, forwarded: str) -> Request:
+        return Request(
+            {
+                "type": "http",
+                "client": (peer, 50000),
+                "headers": [(b"x-forwarded-for", forwarded.encode())],
+            }
+        )
+
+    spoofed = "1.2.3.4, 203.0.113.9"
+    monkeypatch.setattr(settings, "AUTH_TRUSTED_PROXIES", [])
+    assert client_ip(request("172.18.0.5", spoofed)) == "172.18.0.5"
+
+    monkeypatch.setattr(settings, "AUTH_TRUSTED_PROXIES", ["172.18.0.0/16"])
+    assert client_ip(request("172.18.0.5", spoofed)) == "203.0.113.9"
+    # Other private peers and non-IP peers cannot pick their own address
+    assert client_ip(request("10.0.0.7", spoofed)) == "10.0.0.7"
+    assert client_ip(request("testclient", spoofed)) == "testclient"
+
+
+@pytest.mark.asyncio
+async def test_login_is_rejected_before_hashing(auth_data, monkeypatch):
+    monkeypatch.setattr(settings, "AUTH_RATE_LIMIT_BURST", 2)
+    # ASGITransport connects from 127.0.0.1, standing in for the nginx container
+    monkeypatch.setattr(settings, "AUTH_TRUSTED_PROXIES", ["127.0.0.1"])
+    checks = []
+    real_check = security.check_password_async
+
+    async def counting_check(password):
+        checks.append(password)
+        return await real_check(password)
+
+    monkeypatch.setattr(security, "check_password_async", counting_check)
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as ac:
+        spoofed = {"X-Forwarded-For": "10.9.9.9, 203.0.113.7"}
+        for _ in range(2):
+            resp = await ac.post(
+                "/api/v1/auth/login", json={"password": "nope"}, headers=spoofed
+            )
+            assert resp.status_code == 401
+        resp = await ac.post(
+            "/api/v1/auth/login", json={"password": "nope"}, headers=spoofed
+        )
+        assert resp.status_code == 429
+        assert resp.json()["error_code"] == "RATE_LIMITED"
+        assert int(resp.headers["retry-after"]) >= 1
+        assert len(checks) == 2
+
+        # Only the address appended by the proxy identifies the client
+        other = {"X-Forwarded-For": "10.9.9.9, 203.0.113.8"}
+        resp = await ac.post(
+            "/api/v1/auth/login", json={"password": "correct horse"}, headers=other
+        )
+        assert resp.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_disabled_login_refill_returns_bounded_retry_after(
+    auth_data, monkeypatch
+):
+    monkeypatch.setattr(settings, "AUTH_RATE_LIMIT_BURST", 1)
+    monkeypatch.setattr(settings, "AUTH_RATE_LIMIT_PER_MINUTE", 0)
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as ac:
+        for expected in (401, 429):
+            resp = await ac.post("/api/v1/auth/login", json={"password": "nope"})
+            assert resp.status_code == expected
+    assert int(resp.headers["retry-after"]) == settings.AUTH_LOCKOUT_MAX_SECONDS
+
+
+def test_verified_tokens_are_cached_until_expiry(monkeypatch):
+    security.clear_token_cache()
+    decodes = []
+    real_decode = security.jwt.decode
+
+    def counting_decode(*args, **kwargs):
+        decodes.append(args[0])
+        return real_decode(*args, **kwargs)
+
+    monkeypatch.setattr(security.jwt, "decode", counting_decode)
+    token = security.create_access_token({"sub": "admin"}, timedelta(minutes=5))
+
+    for _ in range(3):
+        assert security.verify_token(token)["sub"] == "admin"
+    assert len(decodes) == 1
+    assert security.verify_token(token + "x") is None
+
+    now = time.time()
+    monkeypatch.setattr(security.time, "time", lambda: now + 600)
+    # Past its `exp` the cached entry is dropped and the token verified again
+    security.verify_token(token)
+    assert len(decodes) == 3
+    security.clear_token_cache()
+
+
+@pytest.mark.asyncio
+async def test_admin_endpoints_require_session(auth_data):
+    token = security.create_access_token({"sub": "admin"}, timedelta(minutes=5))
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as ac:
+        resp = await ac.get("/api/v1/system/auth/limiter")
+        assert resp.status_code == 401
+
+        ac.cookies.set("access_token", token)
+        resp = await ac.get("/api/v1/system/auth/limiter")
+        assert resp.status_code == 200
+        assert resp.json()["enabled"] is True
+        resp = await ac.get("/api/v1/auth/status")
+        assert resp.json()["is_authenticated"] is True
@@ -0,0 +1,139 @@
+import asyncio
+import json
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.core.config import settings
+from app.core.exceptions import ValidationException
+from app.main import app
+from app.repositories.repos import AppRepository
+from app.schemas.app import App, AppImportJob
+from app.services.bookmark_import import (
+    MAX_FOLDER_DEPTH,
+    _run_import,
+    parse_bookmarks,
+)
+
+NETSCAPE_EXPORT = b"""<!DOCTYPE NETSCAPE-Bookmark-file-1>
+<META HTTP-EQUIV="Content-Type" CONTENT="text/html; charset=UTF-8">
+<TITLE>Bookmarks</TITLE>
+<H1>Bookmarks</H1>
+<DL><p>
+    <DT><H3 PERSONAL_TOOLBAR_FOLDER="true">Media</H3>
+    <DL><p>
+        <DT><A HREF="https://jellyfin.example.com/" ICON="data:image/png;base64,AA==">Jellyfin</A>
+        <DT><H3>Arr</H3>
+        <DL><p>
+            <DT><A HREF="https://sonarr.example.com/">Sonarr</A>
+        </DL><p>
+    </DL><p>
+    <DT><A HREF="https://example.com/">Example &amp; Co</A>
+    <DT><A HREF="javascript:alert(1)">Bookmarklet</A>
+</DL><p>
+"""
+
+
+def test_parse_netscape_bookmarks():
+    nodes = parse_bookmarks(NETSCAPE_EXPORT, "bookmarks.html")
+    assert [n.name for n in nodes] == ["Media", "Example & Co", "Bookmarklet"]
+    media = nodes[0]
+    assert media.is_folder
+    assert [n.name for n in media.children] == ["Jellyfin", "Arr"]
+    assert media.children[0].icon == "data:image/png;base64,AA=="
+    assert media.children[1].children[0].url == "https://sonarr.example.com/"
+
+
+def test_parse_chrome_json_bookmarks():
+    data = {
+        "roots": {
+            "bookmark_bar": {
+                "name": "Bookmarks bar",
+                "type": "folder",
+                "children": [
+                    {"name": "Radarr", "type": "url", "url": "https://radarr.example"}
+                ],
+            },
+            "other": {"name": "Other", "type": "folder", "children": []},
+        }
+    }
+    nodes = parse_bookmarks(json.dumps(data).encode(), "Bookmarks.json")
+    assert nodes[0].name == "Bookmarks bar"
+    assert nodes[0].children[0].url == "https://radarr.example"
+    assert nodes[1].children == []
+
+
+@pytest.mark.asyncio
+async def test_import_endpoint_writes_folders(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "DATA_DIR", str(tmp_path))
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as ac:
+        resp = await ac.post(
+            "/api/v1/apps/import?enrich=false",
+            files={"file": ("bookmarks.html", NETSCAPE_EXPORT, "text/html")},
+        )
+        assert resp.status_code == 202
+        job = resp.json()
+        assert job["total"] == 3
+
+        for _ in range(50):
+            job = (await ac.get(f"/api/v1/apps/import/{job['id']}")).json()
+            if job["status"] in ("completed", "failed"):
+                break
+            await asyncio.sleep(0.02)
+
+        assert job["status"] == "completed"
+        assert job["imported"] == 3
+
+    stored = json.loads((tmp_path / "apps.json").read_text())
+    assert [a["name"] for a in stored] == ["Media", "Example & Co"]
+    assert stored[0]["type"] == "folder"
+    assert stored[0]["contents"][1]["type"] == "folder"
+    assert stored[0]["contents"][0]["icon_url"] == "data:image/png;base64,AA=="
+
+
+@pytest.mark.asyncio
+async def test_import_commit_does_not_lose_concurrent_writes(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "DATA_DIR", str(tmp_path))
+    nodes = parse_bookmarks(NETSCAPE_EXPORT, "bookmarks.html")
+    job = AppImportJob(id="job", total=3, created_at="now")
+    repo = AppRepository()
+
+    await asyncio.gather(
+        _run_import(job, nodes, enrich=False),
+        *(
+            repo.add(
+                App(id=f"manual-{i}", name=f"Manual {i}", type="link", created_at="now")
+            )
+            for i in range(10)
+        ),
+    )
+
+    assert job.status == "completed"
+    names = {a["name"] for a in json.loads((tmp_path / "apps.json").read_text())}
+    assert {"Media", "Example & Co"} <= names
+    assert {f"Manual {i}" for i in range(10)} <= names
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("depth", [MAX_FOLDER_DEPTH + 1, 100_000])
+async def test_deeply_nested_bookmarks_are_rejected(depth):
+    tree: dict = {"url": "https://deep.example.com/", "name": "Deep"}
+    # Built as text: json.dumps itself would overflow the stack
+    body = '{"name": "f", "children": [' * depth
+    body += json.dumps(tree) + "]}" * depth
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as ac:
+        resp = await ac.post(
+            "/api/v1/apps/import?enrich=false",
+            files={"file": ("bookmarks.json", body.encode(), "application/json")},
+        )
+    assert resp.status_code == 400
+
+    html = "<DL><p><DT><H3>f</H3>" * (depth + 1) + "<DT><A HREF='https://x/'>x</A>"
+    with pytest.raises(ValidationException):
+        parse_bookmarks(html.encode(), "bookmarks.html")
@@ -0,0 +1,110 @@
+import io
+import os
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from PIL import Image
+
+import app.services.icon_mirror as icon_mirror_module
+from app.core.config import settings
+from app.main import app
+from app.services.icon_mirror import ICON_DIR, IconMirror, normalize_icon
+
+
+def _png_bytes(size: int) -> bytes:
+    buf = io.BytesIO()
+    Image.new("RGBA", (size, size), (255, 0, 0, 255)).save(buf, format="PNG")
+    return buf.getvalue()
+
+
+def test_normalize_icon_resizes_raster_to_webp():
+    data, ext = normalize_icon(_png_bytes(512), "image/png", 128)
+    assert ext == "webp"
+    with Image.open(io.BytesIO(data)) as img:
+        assert img.format == "WEBP"
+        assert img.size == (128, 128)
+
+
+def test_normalize_icon_keeps_svg():
+    svg = b'<?xml version="1.0"?><svg xmlns="http://www.w3.org/2000/svg"></svg>'
+    assert normalize_icon(svg, "text/plain", 128) == (svg, "svg")
+
+
+def test_icon_mirror_lookup_after_store(tmp_path):
+    mirror = IconMirror(
+        icon_dir=str(tmp_path / "icons"), index_path=str(tmp_path / "index.json")
+    )
+    remote = "https://cdn.example.com/icon.png"
+    assert mirror.lookup(remote) is None
+
+    mirror._store("abc.webp", b"data", remote, "/uploads/icons/abc.webp")
+    assert mirror.lookup(remote) == "/uploads/icons/abc.webp"
+    assert mirror.lookup("/uploads/icons/abc.webp") is None
+
+    reloaded = IconMirror(
+        icon_dir=str(tmp_path / "icons"), index_path=str(tmp_path / "index.json")
+    )
+    assert reloaded.lookup(remote) == "/uploads/icons/abc.webp"
+
+
+@pytest.mark.asyncio
+async def test_icon_mirror_aborts_oversized_download(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "ICON_MIRROR_MAX_BYTES", 1024)
+    served = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        def body():
+            for _ in range(64):
+                served.append(1)
+                yield b"x" * 512
+
+        # No Content-Length: the limit must be enforced while streaming
+        return httpx.Response(
+            200, headers={"content-type": "image/png"}, content=body()
+        )
+
+    real_client = httpx.AsyncClient
+    monkeypatch.setattr(
+        icon_mirror_module.httpx,
+        "AsyncClient",
+        lambda **kwargs: real_client(transport=httpx.MockTransport(handler)),
+    )
+    mirror = IconMirror(
+        icon_dir=str(tmp_path / "icons"), index_path=str(tmp_path / "index.json")
+    )
+    assert await mirror.mirror("https://cdn.example.com/huge.png") is None
+    assert len(served) < 64
+    assert not (tmp_path / "icons").exists()
+
+
+@pytest.mark.asyncio
+async def test_icon_mirror_retries_failures_after_ttl(tmp_path, monkeypatch):
+    now = [0.0]
+    attempts = []
+
+    async def failing_download(url: str):
+        attempts.append(url)
+        raise ValueError("HTTP 503")
+
+    mirror = IconMirror(
+        icon_dir=str(tmp_path / "icons"),
+        index_path=str(tmp_path / "index.json"),
+        clock=lambda: now[0],
+    )
+    monkeypatch.setattr(mirror, "_download", failing_download)
+    remote = "https://cdn.example.com/flaky.png"
+
+    assert await mirror.mirror(remote) is None
+    assert await mirror.mirror(remote) is None
+    assert len(attempts) == 1
+
+    now[0] += settings.ICON_MIRROR_FAILURE_TTL_SECONDS + 1
+    assert await mirror.mirror(remote) is None
+    assert len(attempts) == 2
+
+
+def test_missing_icon_is_a_404_before_anything_is_mirrored():
+    assert os.path.isdir(ICON_DIR)
+    resp = TestClient(app).get("/uploads/icons/" + "0" * 32 + ".webp")
+    assert resp.status_code == 404
@@ -0,0 +1,108 @@
+import io
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from PIL import Image
+
+from app.api.v1.endpoints import media
+from app.core.config import settings
+from app.main import app
+from app.services.media_library import MediaLibrary, shutdown_media_workers
+
+
+@pytest.fixture
+def library(tmp_path, monkeypatch):
+    upload_dir = tmp_path / "uploads"
+    upload_dir.mkdir()
+    monkeypatch.setattr(media, "UPLOAD_DIR", str(upload_dir))
+    monkeypatch.setattr(settings, "UPLOAD_DIR", str(upload_dir))
+    lib = MediaLibrary(
+        derivative_dir=str(tmp_path / "derivatives"),
+        index_path=str(tmp_path / "media_index.json"),
+    )
+    monkeypatch.setattr(media, "media_library", lib)
+    yield lib
+    shutdown_media_workers()
+
+
+def _jpeg(width: int, height: int) -> bytes:
+    out = io.BytesIO()
+    Image.new("RGB", (width, height), (200, 40, 40)).save(out, format="JPEG")
+    return out.getvalue()
+
+
+@pytest.mark.asyncio
+async def test_upload_renders_width_variants_and_serves_best(library, tmp_path):
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as ac:
+        resp = await ac.post(
+            "/api/v1/media/upload",
+            files={"file": ("wall.jpg", _jpeg(2000, 1000), "image/jpeg")},
+        )
+        assert resp.status_code == 200
+        await library.wait("wall.jpg")
+
+        manifest = (await ac.get("/api/v1/media/wall.jpg/variants")).json()
+        assert manifest["status"] == "ready"
+        assert (manifest["width"], manifest["height"]) == (2000, 1000)
+        webp = {v["width"] for v in manifest["variants"] if v["format"] == "webp"}
+        assert webp == {640, 1280, 1920, 2000}
+        webp_source = next(s for s in manifest["sources"] if s["type"] == "image/webp")
+        assert webp_source["srcset"].endswith("2000.webp 2000w")
+
+        resp = await ac.get(
+            "/api/v1/media/wall.jpg/best",
+            params={"w": 700},
+            headers={"Accept": "image/webp,image/*"},
+        )
+        assert resp.status_code == 200
+        assert resp.headers["content-type"] == "image/webp"
+        assert "Accept" in resp.headers["vary"]
+        assert Image.open(io.BytesIO(resp.content)).size == (1280, 640)
+
+        resp = await ac.get(
+            "/api/v1/media/wall.jpg/best", headers={"Accept": "image/jpeg"}
+        )
+        assert resp.headers["content-type"] == "image/jpeg"
+
+        resp = await ac.delete("/api/v1/media/wall.jpg")
+        assert resp.status_code == 200
+    assert library.get("wall.jpg") is None
+    assert list(tmp_path.joinpath("derivatives").iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_placeholder_is_listed_and_attached_to_background(
+    library, tmp_path, monkeypatch
+):
+    monkeypatch.setattr(settings, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr("app.services.config_service.media_library", library)
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as ac:
+        uploaded = await ac.post(
+            "/api/v1/media/upload",
+            files={"file": ("red.jpg", _jpeg(800, 600), "image/jpeg")},
+        )
+        await library.wait("red.jpg")
+
+        item = (await ac.get("/api/v1/media")).json()["items"][0]
+        assert item["placeholder"].startswith("data:image/webp;base64,")
+        r, g, b = (int(item["color"][i : i + 2], 16) for i in (1, 3, 5))
+        assert r > 180 and g < 80 and b < 80
+
+        config = (await ac.get("/api/v1/config")).json()
+        config["bgConfig"] = {"type": "image", "value": uploaded.json()["url"]}
+        saved = (await ac.post("/api/v1/config", json=config)).json()
+        assert saved["bgConfig"]["placeholder"] == item["placeholder"]
+        assert saved["bgConfig"]["color"] == item["color"]
+        assert "data:image" not in (tmp_path / "config.json").read_text()
+
+        # Reading the config only looks the background up in the index
+        async def fail_ensure(*args, **kwargs):
+            raise AssertionError("get_config must not index media")
+
+        monkeypatch.setattr(library, "ensure", fail_ensure)
+        config = (await ac.get("/api/v1/config")).json()
+        assert config["bgConfig"]["placeholder"] == item["placeholder"]
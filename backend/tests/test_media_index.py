@@ -0,0 +1,117 @@
+import asyncio
+import os
+import time
+
+import pytest
+import pytest_asyncio
+from httpx import ASGITransport, AsyncClient
+
+from app.api.v1.endpoints import media
+from app.main import app
+from app.services.media_library import MediaLibrary
+
+
+@pytest_asyncio.fixture
+async def library(tmp_path, monkeypatch):
+    monkeypatch.setattr(media, "UPLOAD_DIR", str(tmp_path))
+    lib = MediaLibrary(
+        upload_dir=str(tmp_path),
+        derivative_dir=str(tmp_path / "derivatives"),
+        index_path=str(tmp_path / "index" / "media_index.json"),
+    )
+    monkeypatch.setattr(media, "media_library", lib)
+    yield lib
+    # Derivative jobs started by uploads must not outlive the test's event loop
+    await lib.stop()
+
+
+@pytest.mark.asyncio
+async def test_listing_pages_through_index_with_filters(library):
+    for i in range(7):
+        await library.register(
+            f"clip-{i}.mp4", "video", size=100 + i, sha256=f"{i:064x}", mtime=1000 + i
+        )
+    await library.register("photo.svg", "image", size=5, sha256="f" * 64, mtime=1)
+    library._reconciled = True
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as ac:
+        seen, cursor = [], None
+        while True:
+            params = {"limit": 3, "type": "video", "sort": "-mtime"}
+            if cursor:
+                params["cursor"] = cursor
+            page = (await ac.get("/api/v1/media", params=params)).json()
+            assert page["total"] == 7
+            seen += [item["name"] for item in page["items"]]
+            cursor = page["next_cursor"]
+            if not cursor:
+                break
+        assert seen == [f"clip-{i}.mp4" for i in reversed(range(7))]
+
+        page = (await ac.get("/api/v1/media", params={"sort": "size"})).json()
+        assert page["items"][0]["name"] == "photo.svg"
+        assert page["items"][1]["size"] == 100
+
+        resp = await ac.get("/api/v1/media", params={"cursor": "garbage"})
+        assert resp.status_code == 400
+        resp = await ac.get("/api/v1/media", params={"sort": "owner"})
+        assert resp.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_reconcile_indexes_legacy_files_and_drops_orphans(library, tmp_path):
+    (tmp_path / "old-background.jpg").write_bytes(b"legacy")
+    media_dir = tmp_path / "media"
+    media_dir.mkdir()
+    orphan = media_dir / ("a" * 64 + ".png")
+    orphan.write_bytes(b"half-finished upload")
+    stale = time.time() - 2 * 3600
+    os.utime(orphan, (stale, stale))
+    await library.register("gone.mp4", "video", size=1, sha256="b" * 64)
+
+    stats = await library.reconcile()
+
+    assert stats == {"added": 1, "updated": 0, "removed": 1, "orphans": 1}
+    entry = library.get("old-background.jpg")
+    assert entry["url"] == "uploads/old-background.jpg"
+    assert entry["size"] == len(b"legacy")
+    assert library.get("gone.mp4") is None
+    assert not orphan.exists()
+    assert await library.reconcile() == dict.fromkeys(stats, 0)
+
+
+@pytest.mark.asyncio
+async def test_reconcile_rehashes_changed_legacy_file_in_place(library, tmp_path):
+    legacy = tmp_path / "wallpaper.jpg"
+    legacy.write_bytes(b"first version")
+    await library.reconcile()
+    first = library.get("wallpaper.jpg")
+
+    legacy.write_bytes(b"second, longer version")
+    stats = await library.reconcile()
+
+    assert stats["updated"] == 1
+    entry = library.get("wallpaper.jpg")
+    assert entry["sha256"] != first["sha256"]
+    assert entry["path"] == "wallpaper.jpg"
+    # The old blob's release must not delete the file that now holds the new content
+    assert legacy.read_bytes() == b"second, longer version"
+
+
+@pytest.mark.asyncio
+async def test_concurrent_first_listings_share_one_reconcile(library, monkeypatch):
+    calls = 0
+    real_reconcile = library.reconcile
+
+    async def counting_reconcile():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return await real_reconcile()
+
+    monkeypatch.setattr(library, "reconcile", counting_reconcile)
+    await asyncio.gather(*(library.ensure_reconciled() for _ in range(5)))
+    await library.ensure_reconciled()
+    assert calls == 1
@@ -0,0 +1,138 @@
+import hashlib
+
+import pytest
+import pytest_asyncio
+from httpx import ASGITransport, AsyncClient
+
+from app.api.v1.endpoints import media
+from app.core.config import settings
+from app.main import app
+from app.services.media_library import MediaLibrary
+
+
+@pytest_asyncio.fixture(autouse=True)
+async def library(tmp_path, monkeypatch):
+    monkeypatch.setattr(media, "UPLOAD_DIR", str(tmp_path))
+    lib = MediaLibrary(
+        upload_dir=str(tmp_path),
+        derivative_dir=str(tmp_path / "derivatives"),
+        index_path=str(tmp_path / "index" / "media_index.json"),
+    )
+    monkeypatch.setattr(media, "media_library", lib)
+    yield lib
+    # Derivative jobs started by uploads must not outlive the test's event loop
+    await lib.stop()
+
+
+@pytest.mark.asyncio
+async def test_upload_streams_to_disk_with_hash(tmp_path, library):
+    payload = b"\x89PNG" + bytes(range(256)) * 1024
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as ac:
+        resp = await ac.post(
+            "/api/v1/media/upload",
+            files={"file": ("../bg.png", payload, "image/png")},
+        )
+
+    assert resp.status_code == 200
+    data = resp.json()
+    digest = hashlib.sha256(payload).hexdigest()
+    assert data["filename"] == "bg.png"
+    assert data["url"] == f"uploads/media/{digest}.png"
+    assert data["type"] == "image"
+    assert data["sha256"] == digest
+    assert (tmp_path / "media" / f"{digest}.png").read_bytes() == payload
+    assert [p.name for p in (tmp_path / "media").iterdir()] == [f"{digest}.png"]
+
+
+@pytest.mark.asyncio
+async def test_upload_aborts_once_limit_is_crossed(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "MEDIA_MAX_UPLOAD_BYTES", 1024 * 1024)
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as ac:
+        resp = await ac.post(
+            "/api/v1/media/upload",
+            files={"file": ("big.mp4", b"\0" * (3 * 1024 * 1024), "video/mp4")},
+        )
+        assert resp.status_code == 413
+        assert "too large" in resp.json()["detail"]
+
+        resp = await ac.post(
+            "/api/v1/media/upload",
+            files={"file": ("script.sh", b"echo hi", "text/plain")},
+        )
+        assert resp.status_code == 400
+        assert resp.json()["detail"] == "File type not allowed"
+
+    # Neither the rejected files nor their temp files are left behind
+    assert list((tmp_path / "media").glob("*")) == []
+
+
+@pytest.mark.asyncio
+async def test_chunked_upload_without_content_length_is_cut_off(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "MEDIA_MAX_UPLOAD_BYTES", 64 * 1024)
+    sent = 0
+
+    async def body():
+        nonlocal sent
+        yield (
+            b'--xx\r\nContent-Disposition: form-data; name="file"; filename="v.mp4"'
+            b"\r\nContent-Type: video/mp4\r\n\r\n"
+        )
+        for _ in range(64):
+            sent += 1
+            yield b"\0" * 16 * 1024
+        yield b"\r\n--xx--\r\n"
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as ac:
+        resp = await ac.post(
+            "/api/v1/media/upload",
+            content=body(),
+            headers={"Content-Type": "multipart/form-data; boundary=xx"},
+        )
+
+    assert resp.status_code == 413
+    assert sent < 64
+    assert list((tmp_path / "media").glob("*")) == []
+
+
+@pytest.mark.asyncio
+async def test_uploads_are_deduplicated_and_refcounted(tmp_path, library):
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as ac:
+
+        async def upload(name: str, payload: bytes) -> dict:
+            resp = await ac.post(
+                "/api/v1/media/upload", files={"file": (name, payload, "video/mp4")}
+            )
+            assert resp.status_code == 200
+            return resp.json()
+
+        first = await upload("clip.mp4", b"same bytes")
+        again = await upload("clip.mp4", b"same bytes")
+        copy = await upload("copy.mp4", b"same bytes")
+        other = await upload("clip.mp4", b"other bytes")
+
+        assert again["filename"] == "clip.mp4"
+        assert first["url"] == again["url"] == copy["url"]
+        # Same name, different content: stored side by side instead of overwriting
+        assert other["filename"] == "clip-2.mp4"
+        assert other["url"] != first["url"]
+        assert len(list((tmp_path / "media").iterdir())) == 2
+        assert library.refcount(first["sha256"]) == 2
+
+        names = [m["name"] for m in (await ac.get("/api/v1/media")).json()["items"]]
+        assert names == ["clip-2.mp4", "clip.mp4", "copy.mp4"]
+
+        await ac.delete("/api/v1/media/clip.mp4")
+        blob = tmp_path / first["url"].removeprefix("uploads/")
+        assert blob.exists()
+        await ac.delete("/api/v1/media/copy.mp4")
+        assert not blob.exists()
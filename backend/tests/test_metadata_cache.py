@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+
+from app.services.metadata_cache import MetadataCache, normalize_url
+
+
+def test_normalize_url():
+    assert normalize_url("HTTPS://Example.com:443/path?b=2&a=1") == (
+        "https://example.com/path?b=2&a=1"
+    )
+    # Distinct resources on servers that tell them apart keep distinct keys
+    assert normalize_url("https://example.com/path/") != normalize_url(
+        "https://example.com/path"
+    )
+    assert normalize_url("https://example.com/s?q=") != normalize_url(
+        "https://example.com/s"
+    )
+    assert normalize_url("http://example.com") == "http://example.com/"
+    assert normalize_url("http://example.com:8080/") == "http://example.com:8080/"
+
+
+@pytest.mark.asyncio
+async def test_metadata_cache_hits_and_persists(tmp_path):
+    cache_file = str(tmp_path / "metadata_cache.json")
+    cache = MetadataCache(cache_file, ttl=60, negative_ttl=1, max_entries=10)
+    calls: list[str] = []
+
+    async def fetcher(url: str):
+        calls.append(url)
+        await asyncio.sleep(0.01)
+        return {"title": "Example", "description": None, "icon": None}, True
+
+    results = await asyncio.gather(
+        cache.get_or_fetch("https://example.com/", fetcher),
+        cache.get_or_fetch("https://EXAMPLE.com", fetcher),
+    )
+    assert calls == ["https://example.com/"]
+    assert results[0]["title"] == results[1]["title"] == "Example"
+    # Saves are batched; nothing is written until the delay passes or a flush
+    assert not (tmp_path / "metadata_cache.json").exists()
+    await cache.flush()
+
+    reloaded = MetadataCache(cache_file, ttl=60, negative_ttl=1, max_entries=10)
+    assert (await reloaded.get("https://example.com"))["title"] == "Example"
+
+
+@pytest.mark.asyncio
+async def test_metadata_cache_negative_ttl_and_lru(tmp_path):
+    now = [1000.0]
+    cache = MetadataCache(
+        str(tmp_path / "metadata_cache.json"),
+        ttl=60,
+        negative_ttl=10,
+        max_entries=2,
+        clock=lambda: now[0],
+    )
+    await cache.set("https://down.example", {}, ok=False)
+    assert await cache.get("https://down.example") == {
+        "title": None,
+        "description": None,
+        "icon": None,
+    }
+    now[0] += 11
+    assert await cache.get("https://down.example") is None
+
+    await cache.set("https://a.example", {"title": "A"}, ok=True)
+    await cache.set("https://b.example", {"title": "B"}, ok=True)
+    assert await cache.get("https://a.example") is not None
+    await cache.set("https://c.example", {"title": "C"}, ok=True)
+
+    assert await cache.get("https://b.example") is None
+    assert (await cache.get("https://a.example"))["title"] == "A"
+    assert (await cache.get("https://c.example"))["title"] == "C"
+    now[0] += 61
+    assert await cache.get("https://c.example") is None
+    await cache.flush()
@@ -1,7 +1,21 @@
 import pytest
 from httpx import ASGITransport, AsyncClient
 
+from app.core.config import settings
 from app.main import app
+from app.repositories.repos import MonitoringRepository
+from app.schemas.monitoring import (
+    MonitoringCard,
+    MonitoringConfig,
+    MonitoringProviderConfig,
+)
+from app.services import varco_collector
+from app.services.monitoring_sessions import MonitoringSessions, monitoring_sessions
+from app.services.polling_schedule import (
+    AdaptivePollSchedule,
+    entity_poll_bounds,
+    poll_schedule,
+)
 
 
 @pytest.mark.asyncio
@@ -35,3 +49,207 @@ async def test_import_manifest_payload():
         assert resp.status_code == 200
         data = resp.json()
         assert any(c["id"] == "card-sensor-speedtest_download" for c in data["cards"])
+
+
+def _viewer_config() -> MonitoringConfig:
+    return MonitoringConfig(
+        enabled=True,
+        providers=[
+            MonitoringProviderConfig(
+                id="varco",
+                name="Varco",
+                type="varco",
+                enabled=True,
+                url="https://bridge.example/share",
+                polling_interval_seconds=60,
+            )
+        ],
+        cards=[
+            MonitoringCard(
+                id="cpu",
+                title="CPU",
+                card_type="gauge",
+                entity_ids=["sensor.cpu"],
+                zone_id="infrastructure",
+            ),
+            MonitoringCard(
+                id="wan",
+                title="WAN",
+                card_type="live_traffic",
+                entity_ids=["sensor.down", "sensor.up"],
+                zone_id="network",
+            ),
+            MonitoringCard(
+                id="door",
+                title="Door",
+                card_type="status_beacon",
+                entity_ids=["binary_sensor.door"],
+                zone_id="security",
+            ),
+        ],
+    )
+
+
+def test_viewer_sessions_union_visible_entities(monkeypatch):
+    sessions = MonitoringSessions()
+    config = _viewer_config()
+    assert sessions.demand(config) is None
+
+    sessions.touch("a", zone_ids=["network"])
+    sessions.touch("b", zone_ids=[], card_ids=["door"], interval_seconds=10)
+    demand = sessions.demand(config)
+    assert demand.entity_ids == {"sensor.down", "sensor.up", "binary_sensor.door"}
+    assert demand.interval_seconds == 10
+    assert demand.viewers == 2
+
+    sessions.touch("c", zone_ids=["overview"])
+    assert sessions.demand(config).entity_ids == {
+        "sensor.cpu",
+        "sensor.down",
+        "sensor.up",
+        "binary_sensor.door",
+    }
+    sessions.touch()
+    assert sessions.demand(config).entity_ids is None
+
+    monkeypatch.setattr(settings, "MONITORING_SESSION_TTL_SECONDS", -1)
+    assert sessions.demand(config) is None
+
+
+@pytest.mark.asyncio
+async def test_collector_fetches_only_visible_entities(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "DATA_DIR", str(tmp_path))
+    await MonitoringRepository().save_config(_viewer_config())
+    monitoring_sessions.clear()
+    poll_schedule.clear()
+    requested = []
+
+    async def fake_sidecar(entity_ids=None):
+        requested.append(entity_ids)
+        return [
+            {"id": "sensor.down", "state": 91.2, "name": "Down"},
+            {"id": "sensor.cpu", "state": 12, "name": "CPU"},
+        ]
+
+    async def no_sidecar(enabled, has_share_link):
+        return None
+
+    monkeypatch.setattr(varco_collector, "_query_sidecar_telemetry", fake_sidecar)
+    monkeypatch.setattr(varco_collector, "_ensure_sidecar_running", no_sidecar)
+
+    try:
+        assert await varco_collector.collect_varco_telemetry() == 5
+        assert requested == []
+
+        async with AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://test"
+        ) as ac:
+            resp = await ac.post(
+                "/api/v1/monitoring/active",
+                json={"clientId": "tab-1", "zoneIds": ["network"], "cardIds": []},
+            )
+            assert resp.status_code == 200
+
+        # No Varco entity is known yet, so the first pass discovers everything
+        assert round(await varco_collector.collect_varco_telemetry()) == 60
+        assert requested == [None]
+        config = await MonitoringRepository().get_config()
+        assert {e.id for e in config.entities} == {"sensor.down", "sensor.cpu"}
+        # Nothing is due yet: no upstream request until the earliest entity is
+        assert round(await varco_collector.collect_varco_telemetry()) == 60
+        assert len(requested) == 1
+
+        # Between discoveries only the visible entities are fetched
+        monkeypatch.setattr(settings, "MONITORING_ADAPTIVE_POLLING", False)
+        assert await varco_collector.collect_varco_telemetry() == 60
+        assert requested[1:] == [{"sensor.down", "sensor.up"}]
+
+        async with AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://test"
+        ) as ac:
+            resp = await ac.delete("/api/v1/monitoring/active/tab-1")
+            assert resp.status_code == 200
+        assert not monitoring_sessions.has_viewers()
+    finally:
+        monitoring_sessions.clear()
+        poll_schedule.clear()
+
+
+@pytest.mark.asyncio
+async def test_collector_discovers_entities_for_zone_sessions_without_cards(
+    tmp_path, monkeypatch
+):
+    monkeypatch.setattr(settings, "DATA_DIR", str(tmp_path))
+    config = _viewer_config()
+    config.cards = []
+    await MonitoringRepository().save_config(config)
+    monitoring_sessions.clear()
+    poll_schedule.clear()
+    requested = []
+
+    async def fake_sidecar(entity_ids=None):
+        requested.append(entity_ids)
+        return [{"id": "sensor.cpu_usage", "state": 12, "name": "CPU"}]
+
+    async def no_sidecar(enabled, has_share_link):
+        return None
+
+    monkeypatch.setattr(varco_collector, "_query_sidecar_telemetry", fake_sidecar)
+    monkeypatch.setattr(varco_collector, "_ensure_sidecar_running", no_sidecar)
+    try:
+        monitoring_sessions.touch("tab-1", zone_ids=["overview"])
+        await varco_collector.collect_varco_telemetry()
+        assert requested == [None]
+        config = await MonitoringRepository().get_config()
+        assert [e.id for e in config.entities] == ["sensor.cpu_usage"]
+        assert [(c.id, c.zone_id) for c in config.cards] == [
+            ("card-sensor-cpu_usage", "overview")
+        ]
+        assert monitoring_sessions.demand(config).entity_ids == {"sensor.cpu_usage"}
+    finally:
+        monitoring_sessions.clear()
+        poll_schedule.clear()
+
+
+def test_adaptive_poll_schedule_backs_off_stable_entities():
+    now = [0.0]
+    schedule = AdaptivePollSchedule(clock=lambda: now[0])
+    config = _viewer_config()
+    config.cards[1].settings = {"pollIntervalSeconds": 30}
+    config.cards[2].settings = {"maxPollIntervalSeconds": 120}
+    overrides = entity_poll_bounds(config, 10, 600)
+    assert overrides == {
+        "sensor.down": (30, 30),
+        "sensor.up": (30, 30),
+        "binary_sensor.door": (10, 120),
+    }
+    ids = ["sensor.cpu", "sensor.down", "binary_sensor.door", "sensor.speedtest"]
+    assert schedule.due(ids) == set(ids)
+
+    for step in range(8):
+        due = schedule.due(ids)
+        schedule.record(
+            due,
+            {
+                "sensor.cpu": step,
+                "sensor.down": 1,
+                "binary_sensor.door": "off",
+                "sensor.speedtest": 500,
+            },
+            10,
+            600,
+            overrides,
+        )
+        now[0] += 10
+
+    # Changes every poll: stays at the minimum
+    assert schedule.interval("sensor.cpu") == 10
+    # Pinned by card settings
+    assert schedule.interval("sensor.down") == 30
+    # Stable: backs off to the card / global maximum
+    assert schedule.interval("binary_sensor.door") == 120
+    assert schedule.interval("sensor.speedtest") == 600
+
+    schedule.record(["sensor.speedtest"], {"sensor.speedtest": 480}, 10, 600)
+    assert schedule.interval("sensor.speedtest") == 10
+    assert schedule.next_delay(ids, 60) == 0
@@ -0,0 +1,79 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.services import registry_service
+from app.services.registry_service import RegistryService
+
+REGISTRY_URL = "https://registry.example.com/apps.json"
+REGISTRY_APPS = [
+    {
+        "id": "custom-app",
+        "name": "Custom",
+        "description": "From a remote registry",
+        "default_icon": "https://registry.example.com/custom.png",
+    }
+]
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    state = {"requests": [], "fail": False}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        state["requests"].append(request)
+        if state["fail"]:
+            raise httpx.ConnectTimeout("upstream down")
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, json=REGISTRY_APPS, headers={"ETag": '"v1"'})
+
+    real_client = httpx.AsyncClient
+
+    def client_factory(*args, **kwargs):
+        kwargs["transport"] = httpx.MockTransport(handler)
+        return real_client(*args, **kwargs)
+
+    monkeypatch.setattr(registry_service.httpx, "AsyncClient", client_factory)
+    monkeypatch.setattr(registry_service, "_registry_cache", {})
+    monkeypatch.setattr(registry_service, "_refresh_tasks", {})
+    monkeypatch.setattr(registry_service, "_merged_cache", None)
+    return state
+
+
+def _expire_cache():
+    for entry in registry_service._registry_cache.values():
+        entry.expires_at = 1.0
+
+
+@pytest.mark.asyncio
+async def test_registry_cached_and_revalidated(upstream):
+    service = RegistryService()
+
+    apps = await service.get_all_premium_apps([REGISTRY_URL])
+    assert any(a.id == "custom-app" for a in apps)
+    assert len(upstream["requests"]) == 1
+
+    await service.get_all_premium_apps([REGISTRY_URL])
+    assert len(upstream["requests"]) == 1
+
+    _expire_cache()
+    apps = await service.get_all_premium_apps([REGISTRY_URL])
+    assert any(a.id == "custom-app" for a in apps)
+    await asyncio.gather(*registry_service._refresh_tasks.values())
+    assert upstream["requests"][-1].headers["if-none-match"] == '"v1"'
+
+
+@pytest.mark.asyncio
+async def test_registry_serves_stale_copy_when_upstream_fails(upstream):
+    service = RegistryService()
+    await service.get_all_premium_apps([REGISTRY_URL])
+
+    upstream["fail"] = True
+    _expire_cache()
+    await service.get_all_premium_apps([REGISTRY_URL])
+    await asyncio.gather(*registry_service._refresh_tasks.values())
+
+    apps = await service.get_all_premium_apps([REGISTRY_URL])
+    assert any(a.id == "custom-app" for a in apps)
@@ -0,0 +1,146 @@
+import asyncio
+
+import pytest
+
+from app.services.scheduler import Scheduler
+
+
+async def _wait_for(predicate, timeout=2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        assert asyncio.get_running_loop().time() < deadline
+        await asyncio.sleep(0.005)
+
+
+@pytest.mark.asyncio
+async def test_job_runs_periodically_and_reports_status():
+    sched = Scheduler()
+    calls = []
+
+    async def tick():
+        calls.append(1)
+
+    sched.add_job("tick", tick, interval=0.02, jitter=0)
+    sched.start()
+    try:
+        await _wait_for(lambda: len(calls) >= 3)
+    finally:
+        await sched.stop()
+
+    (status,) = sched.status()
+    assert status["name"] == "tick"
+    assert status["runs"] >= 3
+    assert status["failures"] == 0
+    assert status["last_duration_ms"] is not None
+    assert status["last_started"] is not None
+
+
+@pytest.mark.asyncio
+async def test_failures_back_off_exponentially_and_recover():
+    sched = Scheduler()
+    outcomes = [RuntimeError("boom"), RuntimeError("boom"), None]
+
+    async def flaky():
+        outcome = outcomes.pop(0) if outcomes else None
+        if outcome:
+            raise outcome
+
+    job = sched.add_job(
+        "flaky", flaky, interval=0.01, jitter=0, retry_delay=0.05, max_backoff=0.08
+    )
+    sched.start()
+    try:
+        await _wait_for(lambda: job.failures == 1)
+        assert job.backoff_delay() == pytest.approx(0.05)
+        await _wait_for(lambda: job.failures == 2)
+        assert job.backoff_delay() == pytest.approx(0.08)
+        await _wait_for(lambda: job.runs >= 3 and job.consecutive_failures == 0)
+    finally:
+        await sched.stop()
+    assert job.last_error is None
+
+
+@pytest.mark.asyncio
+async def test_busy_ticks_are_skipped_or_coalesced():
+    sched = Scheduler()
+    release = asyncio.Event()
+    started = {"skip": 0, "coalesce": 0}
+
+    def make(name):
+        async def slow():
+            started[name] += 1
+            await release.wait()
+
+        return slow
+
+    skip = sched.add_job("skip", make("skip"), interval=0.01, jitter=0)
+    coalesce = sched.add_job(
+        "coalesce",
+        make("coalesce"),
+        interval=0.01,
+        jitter=0,
+        missed_run_policy="coalesce",
+    )
+    sched.start()
+    try:
+        await _wait_for(lambda: skip.missed_runs >= 3 and coalesce.pending)
+        assert started == {"skip": 1, "coalesce": 1}
+        release.set()
+        await _wait_for(lambda: started["coalesce"] >= 2)
+    finally:
+        await sched.stop()
+    assert coalesce.missed_runs == 0
+
+
+@pytest.mark.asyncio
+async def test_returned_delay_overrides_interval():
+    sched = Scheduler()
+    calls = []
+
+    async def slow_down():
+        calls.append(1)
+        return 60.0
+
+    job = sched.add_job("adaptive", slow_down, interval=0.01, jitter=0)
+    sched.start()
+    try:
+        await _wait_for(lambda: len(calls) == 1)
+        await asyncio.sleep(0.05)
+        assert len(calls) == 1
+        assert sched.trigger("adaptive")
+        await _wait_for(lambda: len(calls) == 2)
+    finally:
+        await sched.stop()
+    assert job.runs == 2
+
+
+@pytest.mark.asyncio
+async def test_trigger_while_running_is_not_lost():
+    sched = Scheduler()
+    gates = [asyncio.Event() for _ in range(3)]
+    gates[2].set()
+    calls = []
+
+    async def slow():
+        gate = gates[len(calls)]
+        calls.append(1)
+        await gate.wait()
+        return 60.0
+
+    job = sched.add_job("busy", slow, interval=60, jitter=0)
+    sched.start()
+    try:
+        await _wait_for(lambda: job.running == 1)
+        # Immediate trigger: the skip policy would drop the busy tick
+        assert sched.trigger("busy")
+        await _wait_for(lambda: job.pending)
+        gates[0].set()
+        await _wait_for(lambda: len(calls) == 2 and job.running == 1)
+
+        # Delayed trigger: the delay the running job returns must not push it back
+        assert sched.trigger("busy", delay=0.05)
+        gates[1].set()
+        await _wait_for(lambda: len(calls) == 3)
+    finally:
+        await sched.stop()
+    assert job.missed_runs == 0
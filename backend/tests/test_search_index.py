@@ -0,0 +1,169 @@
+import random
+import string
+import time
+
+import httpx
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.core.config import settings
+from app.main import app
+from app.repositories.repos import AppRepository, ConfigRepository
+from app.schemas.app import App
+from app.services import registry_service, search_index
+from app.services.search_index import SearchDocument, SearchIndex, SearchService
+
+
+def _doc(doc_id: str, name: str, **kwargs) -> SearchDocument:
+    return SearchDocument(id=doc_id, kind="app", name=name, source="test", **kwargs)
+
+
+def test_search_index_prefix_fuzzy_and_host_matching():
+    index = SearchIndex()
+    index.sync_source(
+        "test",
+        [
+            _doc("1", "Sonarr", description="TV series manager"),
+            _doc("2", "Radarr", description="Movie manager"),
+            _doc("3", "Media Server", url="https://jellyfin.home.lan/web"),
+        ],
+    )
+
+    assert [d.id for d, _ in index.search("son")] == ["1"]
+    assert [d.id for d, _ in index.search("sonnar")] == ["1"]
+    assert [d.id for d, _ in index.search("jellyfin")] == ["3"]
+    assert {d.id for d, _ in index.search("manager")} == {"1", "2"}
+    assert [d.id for d, _ in index.search("movie man")] == ["2"]
+
+
+def test_search_index_incremental_sync():
+    index = SearchIndex()
+    index.sync_source("test", [_doc("1", "Sonarr"), _doc("2", "Radarr")])
+    assert index.sync_source("test", [_doc("1", "Sonarr"), _doc("2", "Radarr")]) == 0
+
+    assert index.sync_source("test", [_doc("1", "Lidarr")]) == 2
+    assert index.search("sonarr") == []
+    assert index.search("radarr") == []
+    assert [d.id for d, _ in index.search("lidarr")] == ["1"]
+
+
+def test_search_index_keystroke_latency_with_5000_entries():
+    rng = random.Random(42)
+    words = ["".join(rng.choices(string.ascii_lowercase, k=7)) for _ in range(2000)]
+    index = SearchIndex()
+    index.sync_source(
+        "test",
+        [
+            _doc(
+                str(i),
+                f"{rng.choice(words)} {rng.choice(words)}",
+                description=" ".join(rng.choices(words, k=6)),
+                url=f"https://{rng.choice(words)}.example.com",
+            )
+            for i in range(5000)
+        ],
+    )
+    queries = [w[:n] for w in rng.sample(words, 50) for n in range(1, 8)]
+    index.search("warmup")
+
+    start = time.perf_counter()
+    for q in queries:
+        index.search(q)
+    per_query = (time.perf_counter() - start) / len(queries)
+    # Sub-millisecond on typical hardware; generous bound for shared CI runners
+    assert per_query < 0.005
+
+
+@pytest.mark.asyncio
+async def test_search_endpoint_covers_catalog_and_user_apps(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "DATA_DIR", str(tmp_path))
+    await AppRepository().save_all(
+        [
+            App(
+                id="app-1",
+                name="Family Photos",
+                url="https://immich.home.example",
+                created_at="2026-01-01T00:00:00",
+            )
+        ]
+    )
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as ac:
+        resp = await ac.get("/api/v1/search", params={"q": "immich"})
+        assert resp.status_code == 200
+        assert [r["id"] for r in resp.json()["results"]] == ["app-1"]
+
+        resp = await ac.get(
+            "/api/v1/search", params={"q": "audiobook", "kind": "premium"}
+        )
+        assert resp.json()["results"][0]["id"] == "audiobookshelf"
+
+
+@pytest.mark.asyncio
+async def test_search_total_counts_matches_beyond_limit(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "DATA_DIR", str(tmp_path))
+    await AppRepository().save_all(
+        [
+            App(
+                id=f"app-{i}",
+                name=f"Holiday Album {i}",
+                url=f"https://album{i}.example",
+                created_at="2026-01-01T00:00:00",
+            )
+            for i in range(3)
+        ]
+    )
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as ac:
+        resp = await ac.get(
+            "/api/v1/search", params={"q": "holiday", "kind": "app", "limit": 1}
+        )
+    assert resp.status_code == 200
+    assert resp.json()["total"] == 3
+    assert len(resp.json()["results"]) == 1
+
+
+@pytest.mark.asyncio
+async def test_search_follows_configured_registries(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(search_index, "search_index", SearchIndex())
+    monkeypatch.setattr(search_index, "_synced_versions", {})
+    monkeypatch.setattr(registry_service, "_registry_cache", {})
+    monkeypatch.setattr(registry_service, "_refresh_tasks", {})
+    monkeypatch.setattr(registry_service, "_merged_cache", None)
+    registry_url = "https://registry.example.com/apps.json"
+    real_client = httpx.AsyncClient
+
+    def client_factory(*args, **kwargs):
+        kwargs["transport"] = httpx.MockTransport(
+            lambda request: httpx.Response(
+                200,
+                json=[
+                    {
+                        "id": "zebra-tracker",
+                        "name": "Zebra Tracker",
+                        "description": "From a remote registry",
+                        "default_icon": "https://registry.example.com/zebra.png",
+                    }
+                ],
+            )
+        )
+        return real_client(*args, **kwargs)
+
+    monkeypatch.setattr(registry_service.httpx, "AsyncClient", client_factory)
+
+    config_repo = ConfigRepository()
+    config = await config_repo.get_config()
+    config.registry_urls = [registry_url]
+    await config_repo.save_config(config)
+    hits, total = await SearchService().search("zebra")
+    assert total == 1
+    assert hits[0][0].id == "premium:zebra-tracker"
+
+    config.registry_urls = []
+    await config_repo.save_config(config)
+    assert await SearchService().search("zebra") == ([], 0)
@@ -0,0 +1,154 @@
+import asyncio
+import json
+
+import pytest
+
+from app.core.config import settings
+from app.repositories.repos import MonitoringRepository
+from app.schemas.monitoring import MonitoringConfig, MonitoringProviderConfig
+from app.services import varco_collector
+from app.services.sidecar_channel import SidecarChannel
+
+
+def _varco_config(share_code: str = "share-1") -> MonitoringConfig:
+    return MonitoringConfig(
+        enabled=True,
+        providers=[
+            MonitoringProviderConfig(
+                id="varco",
+                name="Varco",
+                type="varco",
+                enabled=True,
+                settings={"authorityId": "auth-1", "shareCode": share_code},
+            )
+        ],
+    )
+
+
+async def _read(reader: asyncio.StreamReader) -> dict:
+    return json.loads(await asyncio.wait_for(reader.readline(), 2))
+
+
+async def _read_response(reader: asyncio.StreamReader) -> dict:
+    # Saved configs are pushed down the channel too; skip them
+    while True:
+        message = await _read(reader)
+        if message["type"] != "config":
+            return message
+
+
+async def _write(writer: asyncio.StreamWriter, message: dict) -> None:
+    writer.write(json.dumps(message).encode() + b"\n")
+    await writer.drain()
+
+
+@pytest.mark.asyncio
+async def test_sidecar_channel_pushes_config_and_receives_deltas(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "DATA_DIR", str(tmp_path))
+    channel = SidecarChannel()
+    changed: list[list[str]] = []
+    channel.add_listener(changed.append)
+    await channel.push_config(_varco_config())
+    path = await channel.start(str(tmp_path / "varco.sock"))
+    reader, writer = await asyncio.open_unix_connection(path)
+    try:
+        await _write(writer, {"type": "hello", "pid": 123})
+        config_msg = await _read(reader)
+        assert config_msg["type"] == "config"
+        assert config_msg["settings"]["shareCode"] == "share-1"
+        assert (
+            "sensor.speedtest_download" in config_msg["settings"]["requestedEntities"]
+        )
+
+        delta = {"id": "sensor.cpu", "state": 12, "name": "CPU"}
+        await _write(writer, {"type": "entities", "online": True, "entities": [delta]})
+        await _write(writer, {"type": "entities", "entities": [delta]})
+        await _write(writer, {"type": "status", "online": True})
+        for _ in range(50):
+            if channel.online and channel.entities:
+                break
+            await asyncio.sleep(0.01)
+        assert channel.entities["sensor.cpu"]["state"] == 12
+        # An unchanged state is cached but does not notify again
+        assert changed == [["sensor.cpu"]]
+
+        # Cached states are served without asking the sidecar
+        monkeypatch.setattr(varco_collector, "sidecar_channel", channel)
+        assert await varco_collector._query_sidecar_telemetry(["sensor.cpu"]) == [delta]
+
+        # Uncached entities are fetched on demand over the channel
+        query = asyncio.create_task(
+            varco_collector._query_sidecar_telemetry(["sensor.cpu", "sensor.ram"])
+        )
+        request = await _read(reader)
+        assert request["type"] == "fetch"
+        assert request["entities"] == ["sensor.ram"]
+        ram = {"id": "sensor.ram", "state": 40, "name": "RAM"}
+        await _write(
+            writer,
+            {
+                "type": "response",
+                "id": request["id"],
+                "success": True,
+                "entities": [ram],
+            },
+        )
+        assert await query == [delta, ram]
+        assert changed == [["sensor.cpu"]]
+
+        # Saving the monitoring config pushes changed settings down
+        await MonitoringRepository().save_config(_varco_config("share-2"))
+        config_msg = await _read(reader)
+        assert config_msg["settings"]["shareCode"] == "share-2"
+    finally:
+        writer.close()
+        await channel.stop()
+    assert not channel.connected
+
+
+@pytest.mark.asyncio
+async def test_sidecar_channel_request_fails_without_sidecar(tmp_path):
+    channel = SidecarChannel()
+    await channel.start(str(tmp_path / "varco.sock"))
+    try:
+        assert await channel.fetch(["sensor.cpu"]) is False
+        with pytest.raises(ConnectionError):
+            await channel.request("fetch")
+    finally:
+        await channel.stop()
+
+
+@pytest.mark.asyncio
+async def test_sidecar_identity_is_persisted_by_the_backend(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "DATA_DIR", str(tmp_path))
+    repo = MonitoringRepository()
+    await repo.save_config(_varco_config())
+    channel = SidecarChannel()
+    path = await channel.start(str(tmp_path / "varco.sock"))
+    reader, writer = await asyncio.open_unix_connection(path)
+    try:
+        await _write(writer, {"type": "hello", "pid": 1})
+        await _write(
+            writer,
+            {
+                "type": "identity",
+                "id": "identity-1",
+                "privateKey": "pk-1",
+                "identityData": '{"privateKey": "pk-1"}',
+            },
+        )
+        ack = await _read_response(reader)
+        assert ack == {"type": "response", "id": "identity-1", "success": True}
+        provider = (await repo.get_config()).providers[0]
+        assert provider.settings["privateKey"] == "pk-1"
+        assert provider.settings["identity_data"] == '{"privateKey": "pk-1"}'
+
+        await _write(writer, {"type": "identity", "id": "identity-2"})
+        assert (await _read_response(reader))["success"] is True
+        provider = (await repo.get_config()).providers[0]
+        assert "privateKey" not in provider.settings
+    finally:
+        writer.close()
+        await channel.stop()
+    # No cross-process lock file: the backend is the only writer
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["monitoring.json"]
@@ -0,0 +1,89 @@
+import shutil
+
+import pytest
+
+from app.core.config import settings
+from app.services import sidecar_supervisor as supervisor_module
+from app.services.sidecar_channel import SidecarChannel
+from app.services.sidecar_supervisor import LogRateLimiter, SidecarSupervisor
+
+requires_node = pytest.mark.skipif(shutil.which("node") is None, reason="needs node")
+
+READY_SCRIPT = """
+import net from 'net';
+const socket = net.createConnection(process.env.VARCO_SOCKET_PATH, () => {
+    socket.write(JSON.stringify({ type: 'hello', pid: process.pid }) + '\\n');
+});
+setInterval(() => {}, 1000);
+"""
+CRASH_SCRIPT = "console.error('boom'); process.exit(3);"
+
+
+@pytest.fixture
+def supervisor(tmp_path, monkeypatch):
+    channel = SidecarChannel()
+    monkeypatch.setattr(supervisor_module, "sidecar_channel", channel)
+    monkeypatch.setattr(settings, "VARCO_SIDECAR_SOCKET", str(tmp_path / "s.sock"))
+    monkeypatch.setattr(settings, "VARCO_SIDECAR_READY_TIMEOUT_SECONDS", 5.0)
+    now = [1000.0]
+    sup = SidecarSupervisor(script_path=str(tmp_path / "worker.mjs"))
+    sup._clock = lambda: now[0]
+    sup.now = now
+    return sup
+
+
+@requires_node
+@pytest.mark.asyncio
+async def test_supervisor_waits_for_readiness_and_reports_usage(supervisor, tmp_path):
+    (tmp_path / "worker.mjs").write_text(READY_SCRIPT)
+    try:
+        await supervisor.ensure(True)
+        status = supervisor.status()
+        assert status["running"] and status["ready"]
+        assert status["channel_connected"]
+        assert status["rss_mb"] > 0
+        assert status["max_heap_mb"] == settings.VARCO_SIDECAR_MAX_HEAP_MB
+
+        # A running sidecar is only health-checked, not restarted
+        pid = status["pid"]
+        await supervisor.ensure(True)
+        assert supervisor.status()["pid"] == pid
+        assert supervisor.starts == 1
+    finally:
+        await supervisor.stop()
+    assert not supervisor.running
+
+
+@requires_node
+@pytest.mark.asyncio
+async def test_supervisor_backs_off_restarts_of_crashing_sidecar(supervisor, tmp_path):
+    (tmp_path / "worker.mjs").write_text(CRASH_SCRIPT)
+    due: list[float] = []
+    supervisor.on_restart_due = due.append
+    try:
+        await supervisor.ensure(True)
+        assert not supervisor.ready
+        assert supervisor.consecutive_failures == 1
+        assert supervisor.last_failure == "exited with code 3"
+        assert due == [settings.VARCO_SIDECAR_RESTART_BASE_SECONDS]
+
+        # Within the backoff window nothing is started
+        await supervisor.ensure(True)
+        assert supervisor.starts == 1
+
+        supervisor.now[0] += due[-1]
+        await supervisor.ensure(True)
+        assert supervisor.starts == 2 and supervisor.restarts == 1
+        assert due[-1] == 2 * settings.VARCO_SIDECAR_RESTART_BASE_SECONDS
+    finally:
+        await supervisor.stop()
+
+
+def test_log_rate_limiter_drops_and_counts_bursts():
+    now = [0.0]
+    limiter = LogRateLimiter(60, clock=lambda: now[0])
+    assert sum(limiter.allow() for _ in range(100)) == 60
+    assert limiter.suppressed == 40
+    now[0] += 1
+    assert limiter.allow()
+    assert not limiter.allow()
@@ -0,0 +1,121 @@
+import gzip
+import os
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.static_files import (
+    IMMUTABLE_CACHE_CONTROL,
+    ConditionalFileResponse,
+    ConditionalStaticFiles,
+    ImmutableStaticFiles,
+)
+
+PAYLOAD = bytes(range(256)) * 40
+
+
+@pytest.fixture
+def client(tmp_path):
+    (tmp_path / "loop.mp4").write_bytes(PAYLOAD)
+    (tmp_path / "logo.svg").write_text("<svg xmlns='http://www.w3.org/2000/svg'/>")
+    (tmp_path / "logo.svg.gz").write_bytes(gzip.compress(b"<svg/>"))
+    digest = "ab" * 32
+    (tmp_path / f"{digest}.webp").write_bytes(b"webp")
+    app = FastAPI()
+    app.mount("/hashed", ImmutableStaticFiles(directory=tmp_path))
+    app.mount("/files", ConditionalStaticFiles(directory=tmp_path))
+    return TestClient(app)
+
+
+def test_full_response_and_conditional_revalidation(client):
+    resp = client.get("/files/loop.mp4")
+    assert resp.status_code == 200
+    assert resp.content == PAYLOAD
+    assert resp.headers["accept-ranges"] == "bytes"
+    assert resp.headers["content-length"] == str(len(PAYLOAD))
+    etag = resp.headers["etag"]
+    assert not etag.startswith("W/")
+
+    resp = client.get("/files/loop.mp4", headers={"If-None-Match": etag})
+    assert resp.status_code == 304
+    assert resp.content == b""
+    assert resp.headers["etag"] == etag
+
+    resp = client.get(
+        "/files/loop.mp4",
+        headers={"If-Modified-Since": resp.headers["last-modified"]},
+    )
+    assert resp.status_code == 304
+
+    resp = client.get("/hashed/" + "ab" * 32 + ".webp")
+    assert resp.headers["etag"] == f'"{"ab" * 32}"'
+    assert resp.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+
+
+def test_byte_ranges(client):
+    resp = client.get("/files/loop.mp4", headers={"Range": "bytes=100-199"})
+    assert resp.status_code == 206
+    assert resp.content == PAYLOAD[100:200]
+    assert resp.headers["content-range"] == f"bytes 100-199/{len(PAYLOAD)}"
+
+    resp = client.get("/files/loop.mp4", headers={"Range": "bytes=-10"})
+    assert resp.content == PAYLOAD[-10:]
+
+    resp = client.get("/files/loop.mp4", headers={"Range": "bytes=10000-"})
+    assert resp.content == PAYLOAD[10000:]
+
+    resp = client.get("/files/loop.mp4", headers={"Range": "bytes=999999-"})
+    assert resp.status_code == 416
+    assert resp.headers["content-range"] == f"bytes */{len(PAYLOAD)}"
+
+    # A stale If-Range validator gets the whole (changed) file instead of a fragment
+    resp = client.get(
+        "/files/loop.mp4", headers={"Range": "bytes=0-9", "If-Range": '"stale"'}
+    )
+    assert resp.status_code == 200
+    assert len(resp.content) == len(PAYLOAD)
+
+    resp = client.head("/files/loop.mp4", headers={"Range": "bytes=0-9"})
+    assert resp.status_code == 206
+    assert resp.headers["content-length"] == "10"
+
+
+def test_precompressed_svg_sibling(client):
+    resp = client.get("/files/logo.svg", headers={"Accept-Encoding": "br, gzip"})
+    assert resp.headers["content-encoding"] == "gzip"
+    assert resp.headers["vary"] == "Accept-Encoding"
+    assert resp.headers["content-type"].startswith("image/svg+xml")
+    assert resp.content == b"<svg/>"
+
+    plain = client.get("/files/logo.svg", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+    assert plain.headers["etag"] != resp.headers["etag"]
+
+
+@pytest.mark.asyncio
+async def test_zero_copy_extension_is_used_when_offered(tmp_path):
+    path = tmp_path / "clip.webm"
+    path.write_bytes(PAYLOAD)
+    response = ConditionalFileResponse(str(path), os.stat(path), etag='"x"')
+    sent = []
+
+    async def send(message):
+        if message["type"] == "http.response.zerocopysend":
+            message = {
+                **message,
+                "data": os.pread(message["file"], message["count"], message["offset"]),
+            }
+        sent.append(message)
+
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "headers": [(b"range", b"bytes=5-14")],
+        "extensions": {"http.response.zerocopysend": {}},
+    }
+    await response(scope, None, send)
+
+    assert sent[0]["status"] == 206
+    assert sent[1]["type"] == "http.response.zerocopysend"
+    assert sent[1]["data"] == PAYLOAD[5:15]
@@ -0,0 +1,76 @@
+import re
+
+from app.services.varco_parser import (
+    VarcoEntityRecord,
+    iter_share_sections,
+    parse_share_page,
+    split_state_text,
+)
+
+
+def _card(eid: str, state: str | None, title: str | None = None, unit=None) -> str:
+    parts = [f'<section class="varco-card" data-entity="{eid}">']
+    if title:
+        parts.append(f'<div class="varco-card__title">{title}</div>')
+    if state is not None:
+        parts.append(f'<span class="varco-card__state">{state}</span>')
+    if unit:
+        parts.append(f'<span class="varco-card__unit">{unit}</span>')
+    parts.append("</section>")
+    return "\n".join(parts)
+
+
+def _legacy_sections(html: str) -> list[tuple[str, str, str | None, str | None]]:
+    found = []
+    pattern = r'<section[^>]*data-entity="([^"]+)"[^>]*>(.*?)</section>'
+    for eid, body in re.findall(pattern, html, re.DOTALL):
+        state = re.search(r'class="varco-card__state">([^<]+)</span>', body)
+        title = re.search(r'class="varco-card__title">([^<]+)</div>', body)
+        unit = re.search(r'class="varco-card__unit">([^<]+)</span>', body)
+        if state:
+            found.append(
+                (
+                    eid.strip(),
+                    state.group(1).strip(),
+                    title.group(1).strip() if title else None,
+                    unit.group(1).strip() if unit else None,
+                )
+            )
+    return found
+
+
+def test_share_sections_match_legacy_extraction():
+    html = "<main>" + "".join(
+        [
+            _card("sensor.speedtest_download", "93.4", "Download", "Mbit/s"),
+            '<section class="intro"><p>no entity</p></section>',
+            _card("binary_sensor.door", "off"),
+            _card("sensor.pending", None, "Pending"),
+            _card("sensor.cpu", " 12 ", "CPU"),
+        ]
+    )
+    records = list(iter_share_sections(html))
+    assert [(r.id, r.state, r.name, r.unit) for r in records] == _legacy_sections(html)
+    assert records[1].as_entity() == {
+        "id": "binary_sensor.door",
+        "name": "Door",
+        "state": "off",
+        "unit": None,
+        "domain": "binary_sensor",
+    }
+
+
+def test_share_page_falls_back_to_embedded_json():
+    html = (
+        '<script>window.__STATE__ = {"entities": ['
+        '{"entity_id": "sensor.ram", "state": "41", "unit_of_measurement": "%"},'
+        '{"id": "sensor.disk", "state": 70, "name": "Disk"},'
+        '{"id": "light.kitchen", "state": "on"}'
+        "]}</script>"
+    )
+    assert parse_share_page(html) == [
+        VarcoEntityRecord(id="sensor.ram", state="41", unit="%"),
+        VarcoEntityRecord(id="sensor.disk", state=70, name="Disk"),
+    ]
+    assert split_state_text("93.4 Mbit/s") == (93.4, "Mbit/s")
+    assert split_state_text("on") == ("on", None)
@@ -0,0 +1,94 @@
+import sys
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.api.v1.endpoints import media
+from app.core.config import settings
+from app.main import app
+from app.services.media_library import MediaLibrary
+from app.services.video_transcoder import parse_progress_line
+
+# Stand-ins for the ffmpeg binaries: they speak the same CLI/progress protocol
+FAKE_FFPROBE = """
+import json
+print(json.dumps({"streams": [{"width": 1920, "height": 1080}],
+                  "format": {"duration": "4.0"}}))
+"""
+
+FAKE_FFMPEG = """
+import sys
+out = sys.argv[-1]
+for us in (1000000, 2000000, 4000000):
+    print(f"out_time_us={us}", flush=True)
+    print("progress=continue", flush=True)
+print("progress=end", flush=True)
+open(out, "wb").write(b"encoded " + out.encode())
+"""
+
+
+def _script(path, body):
+    path.write_text(f"#!{sys.executable}\n{body}")
+    path.chmod(0o755)
+    return str(path)
+
+
+def test_parse_progress_line():
+    assert parse_progress_line("out_time_us=2500000\n") == 2.5
+    assert parse_progress_line("out_time_ms=1000000") == 1.0
+    assert parse_progress_line("out_time_us=N/A") is None
+    assert parse_progress_line("progress=continue") is None
+
+
+@pytest.mark.asyncio
+async def test_video_upload_is_transcoded_with_progress(tmp_path, monkeypatch):
+    upload_dir = tmp_path / "uploads"
+    upload_dir.mkdir()
+    monkeypatch.setattr(media, "UPLOAD_DIR", str(upload_dir))
+    monkeypatch.setattr(settings, "UPLOAD_DIR", str(upload_dir))
+    monkeypatch.setattr(
+        settings, "FFPROBE_PATH", _script(tmp_path / "ffprobe", FAKE_FFPROBE)
+    )
+    monkeypatch.setattr(
+        settings, "FFMPEG_PATH", _script(tmp_path / "ffmpeg", FAKE_FFMPEG)
+    )
+    library = MediaLibrary(
+        derivative_dir=str(tmp_path / "derivatives"),
+        index_path=str(tmp_path / "media_index.json"),
+    )
+    monkeypatch.setattr(media, "media_library", library)
+    seen: list[float] = []
+    original_finish = library._finish
+    monkeypatch.setattr(
+        library,
+        "_finish",
+        lambda name: (seen.append(library.progress(name)), original_finish(name)),
+    )
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as ac:
+        resp = await ac.post(
+            "/api/v1/media/upload",
+            files={"file": ("clip.mov", b"\0" * 4096, "video/quicktime")},
+        )
+        assert resp.status_code == 200
+        await library.wait("clip.mov")
+
+        status = (await ac.get("/api/v1/media/clip.mov/status")).json()
+        assert status["status"] == "ready"
+        assert status["poster"].endswith("/poster.jpg")
+
+    entry = library.get("clip.mov")
+    assert entry["duration"] == 4.0
+    assert {i["kind"] for i in entry["derivatives"]["items"]} == {
+        "poster",
+        "720p",
+        "loop",
+    }
+    assert [s["type"] for s in library.video_sources(entry)] == [
+        "video/webm",
+        "video/mp4",
+        "video/quicktime",
+    ]
+    assert seen == [1.0]
@@ -1,9 +1,34 @@
+import asyncio
+import os
+
 import pytest
 from httpx import ASGITransport, AsyncClient
 
+from app.core.config import settings
 from app.main import app
-from app.repositories.repos import ConfigRepository
+from app.repositories.repos import (
+    AppRepository,
+    ConfigRepository,
+    MonitoringRepository,
+)
+from app.schemas.app import App
 from app.schemas.config import AppConfig, LayoutConfig, WidgetDefaults
+from app.schemas.monitoring import (
+    MonitoringConfig,
+    MonitoringEntity,
+    MonitoringProviderConfig,
+)
+from app.services.monitoring_ingest import (
+    IngestError,
+    iter_json_items,
+    webhook_provider,
+)
+from app.services.webhook_queue import (
+    WebhookQueue,
+    WebhookQueueClosedException,
+    webhook_queue,
+)
+from app.services.webhook_secrets import webhook_secrets
 
 
 @pytest.mark.asyncio
@@ -51,3 +76,344 @@ async def test_vacation_webhook_get_and_post_verification(monkeypatch):
             "/api/v1/webhooks/vacation?secret=wrong_secret", json={}
         )
         assert resp_bad.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_webhook_secret_index_rebuilds_only_on_change(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "DATA_DIR", str(tmp_path))
+    webhook_secrets.invalidate()
+    await AppRepository().save_all(
+        [
+            App(
+                id="a1",
+                name="Trips",
+                created_at="2026-01-01T00:00:00",
+                api_config={"vacationSecret": "app-secret"},
+            ),
+            App(
+                id="a2",
+                name="Disabled",
+                created_at="2026-01-01T00:00:00",
+                api_config={"vacationSecret": "off-secret", "webhookEnabled": False},
+            ),
+        ]
+    )
+
+    reads = []
+    real_read_all = AppRepository.read_all
+
+    async def counting_read_all(self):
+        reads.append(self.file_path)
+        return await real_read_all(self)
+
+    monkeypatch.setattr(AppRepository, "read_all", counting_read_all)
+
+    assert await webhook_secrets.matches("app-secret")
+    assert not await webhook_secrets.matches("off-secret")
+    assert not await webhook_secrets.matches("app-secret ")
+    assert not await webhook_secrets.matches(None)
+    assert len(reads) == 1
+
+    config_repo = ConfigRepository()
+    await config_repo.save_config(await config_repo.get_config())
+    assert await webhook_secrets.matches("app-secret")
+    assert len(reads) == 2
+
+    await AppRepository().update("a2", {"api_config": {"vacationSecret": "new"}})
+    assert await webhook_secrets.matches("new")
+    assert await webhook_secrets.matches("app-secret")
+    assert len(reads) == 4
+
+    # Writes to unrelated files in the data directory do not trigger a rebuild
+    (tmp_path / "monitoring.json").write_text("{}")
+    assert await webhook_secrets.matches("new")
+    assert len(reads) == 4
+
+    # External edits are picked up from the files' stat
+    stats = []
+    real_stat = os.stat
+
+    def counting_stat(path, *args, **kwargs):
+        stats.append(path)
+        return real_stat(path, *args, **kwargs)
+
+    with monkeypatch.context() as patched:
+        patched.setattr(os, "stat", counting_stat)
+        assert await webhook_secrets.matches("new")
+    assert stats == [str(tmp_path / "config.json"), str(tmp_path / "apps.json")]
+    apps_file = tmp_path / "apps.json"
+    edited = apps_file.read_text().replace('"new"', '"edited"')
+    (tmp_path / "apps.json.edit").write_text(edited)
+    os.replace(tmp_path / "apps.json.edit", apps_file)
+    assert await webhook_secrets.matches("edited")
+    assert not await webhook_secrets.matches("new")
+
+
+async def _accept_secret(provided):
+    return provided == "s3cret"
+
+
+@pytest.mark.asyncio
+async def test_vacation_webhook_queues_dedupes_and_coalesces(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "WEBHOOK_COALESCE_SECONDS", 0.2)
+    monkeypatch.setattr(webhook_secrets, "matches", _accept_secret)
+    saves = []
+    real_save = ConfigRepository.save_config
+
+    async def counting_save(self, config):
+        saves.append(config.layoutConfig.widgetDefaults.vacationDate)
+        await real_save(self, config)
+
+    monkeypatch.setattr(ConfigRepository, "save_config", counting_save)
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as ac:
+        url = "/api/v1/webhooks/vacation/s3cret"
+        first = {"id": "trip-1", "trip": {"name": "Rom", "startDate": "2026-07-01"}}
+        retry = {"X-Delivery-Id": "evt-1"}
+        responses = [
+            await ac.post(url, json=first, headers=retry),
+            await ac.post(url, json=first, headers=retry),
+            # Same trip id, but a different delivery
+            await ac.post(
+                url,
+                json={
+                    "id": "trip-1",
+                    "trip": {"name": "Oslo", "startDate": "2026-08-01"},
+                },
+            ),
+        ]
+        assert [r.status_code for r in responses] == [202, 202, 202]
+        assert [r.json()["message"] for r in responses] == [
+            "Vacation payload queued for update",
+            "Duplicate delivery ignored",
+            "Vacation payload queued for update",
+        ]
+
+        ping = await ac.post(url, json={"event": "ping"})
+        assert ping.status_code == 200
+
+        await webhook_queue.join()
+
+    assert saves == ["2026-08-01"]
+    defaults = (await ConfigRepository().get_config()).layoutConfig.widgetDefaults
+    assert defaults.vacationTitle == "Oslo"
+
+
+@pytest.mark.asyncio
+async def test_failed_delivery_is_not_marked_seen(monkeypatch):
+    monkeypatch.setattr(settings, "WEBHOOK_COALESCE_SECONDS", 0)
+    queue = WebhookQueue()
+    attempts = []
+
+    async def flaky_apply(update):
+        attempts.append(update)
+        if len(attempts) == 1:
+            raise OSError("disk full")
+
+    monkeypatch.setattr(queue, "_apply", flaky_apply)
+    update = {"vacationDate": "2026-09-01"}
+    try:
+        assert queue.submit("id:evt-9", update)
+        assert not queue.submit("id:evt-9", update)
+        await queue.join()
+        # The failed delivery's retry is applied, a retry after success is dropped
+        assert queue.submit("id:evt-9", update)
+        await queue.join()
+        assert not queue.submit("id:evt-9", update)
+    finally:
+        await queue.stop()
+    assert len(attempts) == 2
+
+
+@pytest.mark.asyncio
+async def test_stop_applies_acknowledged_updates_before_cancelling(monkeypatch):
+    monkeypatch.setattr(settings, "WEBHOOK_COALESCE_SECONDS", 0)
+    queue = WebhookQueue()
+    applied = []
+
+    async def slow_apply(update):
+        await asyncio.sleep(0.01 if "vacationTitle" in update else 10)
+        applied.append(update)
+
+    monkeypatch.setattr(queue, "_apply", slow_apply)
+    assert queue.submit("id:a", {"vacationTitle": "Rom"})
+    assert queue.submit("id:b", {"vacationDate": "2026-11-01"})
+    await queue.stop()
+    assert applied == [{"vacationTitle": "Rom", "vacationDate": "2026-11-01"}]
+    with pytest.raises(WebhookQueueClosedException):
+        queue.submit("id:c", {"vacationTitle": "Oslo"})
+
+    # A stuck update only delays shutdown by the drain timeout
+    queue = WebhookQueue()
+    monkeypatch.setattr(queue, "_apply", slow_apply)
+    assert queue.submit("id:d", {"vacationDate": "2026-12-24"})
+    await queue.stop(timeout=0.05)
+    assert queue._task is None
+    assert len(applied) == 1
+
+
+async def _chunked(data: bytes, size: int):
+    for i in range(0, len(data), size):
+        yield data[i : i + size]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("size", [1, 7, 4096])
+async def test_iter_json_items_streams_batches(size):
+    body = (
+        b'[{"entity_id": "sensor.a", "state": "1"}, {"entity_id": "sensor.\xc3\xa4"}]'
+    )
+    items = [i async for i in iter_json_items(_chunked(body, size), 10_000)]
+    assert [i["entity_id"] for i in items] == ["sensor.a", "sensor.ä"]
+
+    ndjson = b'{"entity_id": "a"}\n{"entity_id": "b"}\n'
+    items = [i async for i in iter_json_items(_chunked(ndjson, size), 10_000, True)]
+    assert [i["entity_id"] for i in items] == ["a", "b"]
+
+    wrapped = b'{"entities": [{"entity_id": "c"}]}'
+    items = [i async for i in iter_json_items(_chunked(wrapped, size), 10_000)]
+    assert items == [{"entity_id": "c"}]
+
+    for bad in (b'[{"entity_id": "a"}', b"[1, 2]", b'{"a": 1} x'):
+        with pytest.raises(IngestError):
+            [i async for i in iter_json_items(_chunked(bad, size), 10_000)]
+    with pytest.raises(IngestError):
+        [i async for i in iter_json_items(_chunked(body, size), 20)]
+
+
+@pytest.mark.asyncio
+async def test_iter_json_items_streams_wrapped_entities():
+    sent = []
+
+    async def body():
+        sent.append(1)
+        yield b'{"source": "ha", "entities": [{"entity_id": "a"}, '
+        sent.append(2)
+        yield b'{"entity_id": "b"}], "count": 2}'
+
+    items = iter_json_items(body(), 10_000)
+    # The first entity is yielded before the rest of the body is read
+    assert await items.__anext__() == {"entity_id": "a"}
+    assert sent == [1]
+    assert [i async for i in items] == [{"entity_id": "b"}]
+
+    single = b'{"entity_id": "sensor.x", "state": 12345}'
+    items = [i async for i in iter_json_items(_chunked(single, 3), 10_000)]
+    assert items == [{"entity_id": "sensor.x", "state": 12345}]
+
+
+@pytest.mark.asyncio
+async def test_entity_webhook_ingests_states(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "WEBHOOK_ENTITY_BATCH_SIZE", 1)
+    saves = []
+    real_save = MonitoringRepository.save_config
+
+    async def counting_save(self, config):
+        saves.append(len(config.entities))
+        await real_save(self, config)
+
+    await MonitoringRepository().save_config(
+        MonitoringConfig(
+            providers=[
+                MonitoringProviderConfig(
+                    id="ha-push",
+                    name="Home Assistant",
+                    type="webhook",
+                    enabled=True,
+                    settings={"secret": "push-secret"},
+                )
+            ],
+            entities=[
+                MonitoringEntity(id="sensor.cpu", name="CPU", icon="mdi:chip"),
+            ],
+        )
+    )
+    states = [
+        {
+            "entity_id": "sensor.cpu",
+            "state": "42.5",
+            "attributes": {"unit_of_measurement": "%"},
+        },
+        {
+            "entity_id": "binary_sensor.nas",
+            "state": "on",
+            "attributes": {"friendly_name": "NAS"},
+        },
+        {"state": "ignored without id"},
+    ]
+    monkeypatch.setattr(MonitoringRepository, "save_config", counting_save)
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as ac:
+        resp = await ac.post("/api/v1/webhooks/entities/wrong", json=states)
+        assert resp.status_code == 401
+
+        resp = await ac.post("/api/v1/webhooks/entities/push-secret", json=states)
+        assert resp.status_code == 200
+        assert resp.json() == {"status": "ok", "accepted": 2, "count": 2}
+        # One write per batch while streaming
+        assert saves == [1, 2]
+
+        resp = await ac.post(
+            "/api/v1/webhooks/entities/push-secret", content=b'[{"entity_id": '
+        )
+        assert resp.status_code == 400
+
+    entities = {e.id: e for e in (await MonitoringRepository().get_config()).entities}
+    cpu = entities["sensor.cpu"]
+    assert (cpu.state, cpu.value_type, cpu.unit_of_measurement) == (
+        42.5,
+        "numeric",
+        "%",
+    )
+    # Fields not pushed keep their stored values
+    assert (cpu.name, cpu.icon, cpu.provider_id) == ("CPU", "mdi:chip", "ha-push")
+    nas = entities["binary_sensor.nas"]
+    assert (nas.name, nas.domain, nas.state) == ("NAS", "binary_sensor", "on")
+
+
+@pytest.mark.asyncio
+async def test_webhook_provider_lookup_does_not_reread_monitoring_json(
+    tmp_path, monkeypatch
+):
+    monkeypatch.setattr(settings, "DATA_DIR", str(tmp_path))
+    repo = MonitoringRepository()
+    config = MonitoringConfig(
+        providers=[
+            MonitoringProviderConfig(
+                id="ha-push",
+                name="Home Assistant",
+                type="webhook",
+                enabled=True,
+                settings={"secret": "push-secret"},
+            )
+        ]
+    )
+    (tmp_path / "monitoring.json").write_text(config.model_dump_json())
+    reads = []
+    real_get_config = MonitoringRepository.get_config
+
+    async def counting_get_config(self):
+        reads.append(self.file_path)
+        return await real_get_config(self)
+
+    monkeypatch.setattr(MonitoringRepository, "get_config", counting_get_config)
+
+    assert (await webhook_provider("push-secret")).id == "ha-push"
+    assert await webhook_provider("wrong") is None
+    assert len(reads) == 1
+
+    # Saves (including entity ingestion) update the index without a re-read
+    config.providers[0].settings = {"secret": "rotated"}
+    await repo.save_config(config)
+    assert await webhook_provider("push-secret") is None
+    assert (await webhook_provider("rotated")).id == "ha-push"
+    config.providers[0].enabled = False
+    await repo.save_config(config)
+    assert await webhook_provider("rotated") is None
+    assert len(reads) == 1
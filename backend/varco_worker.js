@@ -1,8 +1,7 @@
 import { createVarcoClient, consumerIdentityFromPrivateKey } from '@varco/client';
-import http from 'http';
-import fs from 'fs';
+import net from 'net';
+import os from 'os';
 import path from 'path';
-import { fileURLToPath } from 'url';
 import WebSocket from 'ws';
 import crypto from 'node:crypto';
 
@@ -45,11 +44,12 @@ process.on('uncaughtException', (err) => {
     console.error('[Varco Worker] Uncaught Exception:', err?.message || err);
 });
 
-const __filename = fileURLToPath(import.meta.url);
-const __dirname = path.dirname(__filename);
-
-const PORT = process.env.VARCO_WORKER_PORT ? parseInt(process.env.VARCO_WORKER_PORT, 10) : 8089;
-const CONFIG_PATH = process.env.VARCO_CONFIG_PATH || path.join(__dirname, 'data/monitoring.json');
+const SOCKET_PATH = process.env.VARCO_SOCKET_PATH || path.join(os.tmpdir(), 'er-startseite-varco.sock');
+// Subscription updates arriving within this window go to the backend as one message
+const DELTA_FLUSH_MS = 250;
+const RESYNC_MIN_MS = 10000;
+const RESYNC_MAX_MS = 5 * 60 * 1000;
+const CHANNEL_RECONNECT_MAX_MS = 10000;
 
 let client = null;
 let isSubscribed = false;
@@ -59,151 +59,117 @@ let currentEntities = {};
 let activeEntities = [];
 let syncGeneration = 0;
 let syncPromise = null;
-
-console.log(`[Varco Worker] Starting Varco Consumer Sidecar on port ${PORT}...`);
-
-function readServerSettings() {
-    try {
-        if (!fs.existsSync(CONFIG_PATH)) {
-            return null;
-        }
-        const content = fs.readFileSync(CONFIG_PATH, 'utf-8');
-        const config = JSON.parse(content);
-        if (!config.enabled) {
-            return null;
-        }
-        const provider = (config.providers || []).find(p => p.type === 'varco' && p.enabled);
-        if (!provider || !provider.settings) {
-            return null;
-        }
-        const s = provider.settings;
-        const authorityId = s.authorityId || s.authority_id;
-        const shareCode = s.shareCode || s.share_code;
-        const bridgeUrl = s.bridgeUrl || s.bridge_url || 'https://varco-bridge.andreabaccega.com';
-        const claimSecret = s.claimSecret || s.claim_secret;
-        const privateKey = s.privateKey || s.private_key;
-        const identityData = s.identityData || s.identity_data;
-        const consumerName = s.consumerName || s.consumer_name || 'ER-Startseite Backend Server';
-
-        if (!authorityId || !shareCode) {
-            return null;
-        }
-
-        const entityIdsFromConfig = (config.entities || []).map(e => e.id).filter(Boolean);
-        const cardEntityIds = (config.cards || []).flatMap(c => c.entity_ids || c.entityIds || []).filter(Boolean);
-        const requestedEntities = Array.from(new Set([
-            'sensor.speedtest_download',
-            'sensor.speedtest_upload',
-            'sensor.speedtest_ping',
-            ...entityIdsFromConfig,
-            ...cardEntityIds
-        ]));
-
-        return {
-            authorityId,
-            shareCode,
-            bridgeUrl,
-            claimSecret,
-            privateKey,
-            identityData,
-            consumerName,
-            requestedEntities
-        };
-    } catch (e) {
-        console.error('[Varco Worker] Error reading config:', e.message);
+let resyncRequested = false;
+let resyncTimer = null;
+let resyncDelay = RESYNC_MIN_MS;
+let backendSettings = null;
+let channel = null;
+let channelReconnectDelay = 500;
+const pendingDeltas = new Map();
+let deltaTimer = null;
+
+console.log(`[Varco Worker] Starting Varco Consumer Sidecar on ${SOCKET_PATH}...`);
+
+// Settings are computed and pushed by the backend over the channel
+function settingsFromBackend(raw) {
+    if (!raw || !raw.authorityId || !raw.shareCode) {
         return null;
     }
+    return {
+        authorityId: raw.authorityId,
+        shareCode: raw.shareCode,
+        bridgeUrl: raw.bridgeUrl || 'https://varco-bridge.andreabaccega.com',
+        claimSecret: raw.claimSecret || undefined,
+        privateKey: raw.privateKey || undefined,
+        identityData: raw.identityData || undefined,
+        consumerName: raw.consumerName || 'ER-Startseite Backend Server',
+        requestedEntities: Array.isArray(raw.requestedEntities) ? raw.requestedEntities : []
+    };
 }
 
-const LOCK_PATH = CONFIG_PATH + '.lock';
+function settingsKey(settings) {
+    if (!settings) {
+        return null;
+    }
+    return JSON.stringify([
+        settings.authorityId,
+        settings.shareCode,
+        settings.bridgeUrl,
+        settings.claimSecret ?? null,
+        settings.privateKey ?? null,
+        settings.identityData ?? null,
+        settings.consumerName,
+        settings.requestedEntities
+    ]);
+}
 
-async function acquireConfigFileLock() {
-    const startTime = Date.now();
-    while (true) {
-        try {
-            const fd = fs.openSync(LOCK_PATH, 'wx');
-            fs.closeSync(fd);
-            return true;
-        } catch (err) {
-            if (err.code === 'EEXIST') {
-                try {
-                    const stat = fs.statSync(LOCK_PATH);
-                    if (Date.now() - stat.mtimeMs > 10000) {
-                        try { fs.unlinkSync(LOCK_PATH); } catch {}
-                    }
-                } catch {}
-                if (Date.now() - startTime > 5000) {
-                    return false;
-                }
-                await new Promise(resolve => setTimeout(resolve, 20));
-            } else {
-                return false;
-            }
-        }
+function sendToBackend(message) {
+    if (channel && !channel.destroyed) {
+        channel.write(JSON.stringify(message) + '\n');
+        return true;
     }
+    return false;
 }
 
-function releaseConfigFileLock() {
-    try {
-        if (fs.existsSync(LOCK_PATH)) {
-            fs.unlinkSync(LOCK_PATH);
-        }
-    } catch {}
+function isOnline() {
+    return client !== null && isSubscribed;
 }
 
-async function savePrivateKey(privateKey, identityData = null) {
-    const acquired = await acquireConfigFileLock();
-    if (!acquired) {
-        console.warn('[Varco Worker] Failed to acquire config file lock; skipping save.');
+function reportStatus() {
+    sendToBackend({ type: 'status', online: isOnline() });
+}
+
+function flushDeltas() {
+    deltaTimer = null;
+    if (pendingDeltas.size === 0) {
         return;
     }
-    try {
-        if (!fs.existsSync(CONFIG_PATH)) return;
-        const content = fs.readFileSync(CONFIG_PATH, 'utf-8');
-        const config = JSON.parse(content);
-        const provider = (config.providers || []).find(p => p.type === 'varco');
-        if (provider) {
-            provider.settings = provider.settings || {};
-            if (!privateKey) {
-                delete provider.settings.privateKey;
-                delete provider.settings.private_key;
-                delete provider.settings.identityData;
-                delete provider.settings.identity_data;
-            } else {
-                provider.settings.privateKey = privateKey;
-                provider.settings.private_key = privateKey;
-                if (identityData) {
-                    provider.settings.identityData = identityData;
-                    provider.settings.identity_data = identityData;
-                }
-            }
-            const tmpPath = CONFIG_PATH + '.tmp';
-            fs.writeFileSync(tmpPath, JSON.stringify(config, null, 2), 'utf-8');
-            fs.renameSync(tmpPath, CONFIG_PATH);
-            console.log('[Varco Worker] Saved identity to config file.');
-            if (currentSettings) {
-                if (!privateKey) {
-                    delete currentSettings.privateKey;
-                    delete currentSettings.identityData;
-                } else {
-                    currentSettings.privateKey = privateKey;
-                    if (identityData) {
-                        currentSettings.identityData = identityData;
-                    }
-                }
+    // Undelivered deltas are covered by the full snapshot sent on reconnect
+    sendToBackend({ type: 'entities', online: isOnline(), entities: Array.from(pendingDeltas.values()) });
+    pendingDeltas.clear();
+}
+
+function pushDelta(entity) {
+    pendingDeltas.set(entity.id, entity);
+    if (!deltaTimer) {
+        deltaTimer = setTimeout(flushDeltas, DELTA_FLUSH_MS);
+    }
+}
+
+// The backend owns monitoring.json; identity changes are sent to it and resent
+// after a reconnect until it acknowledges them
+let pendingIdentity = null;
+let identityRequestId = 0;
+
+function flushIdentity() {
+    if (pendingIdentity) {
+        sendToBackend({ type: 'identity', ...pendingIdentity });
+    }
+}
+
+function savePrivateKey(privateKey, identityData = null) {
+    for (const known of [currentSettings, backendSettings]) {
+        if (!known) continue;
+        if (!privateKey) {
+            delete known.privateKey;
+            delete known.identityData;
+        } else {
+            known.privateKey = privateKey;
+            if (identityData) {
+                known.identityData = identityData;
             }
         }
-    } catch (e) {
-        console.error('[Varco Worker] Error saving identity:', e.message);
-    } finally {
-        if (acquired) {
-            releaseConfigFileLock();
-        }
     }
+    pendingIdentity = {
+        id: `identity-${++identityRequestId}`,
+        privateKey: privateKey || null,
+        identityData: privateKey ? identityData : null
+    };
+    flushIdentity();
 }
 
 async function syncVarcoClient() {
-    const settings = readServerSettings();
+    const settings = backendSettings ? { ...backendSettings } : null;
     if (!settings) {
         if (client) {
             console.log('[Varco Worker] Config disabled or missing. Disconnecting Varco client.');
@@ -215,6 +181,7 @@ async function syncVarcoClient() {
         currentSettings = null;
         currentEntities = {};
         activeEntities = [];
+        reportStatus();
         return;
     }
 
@@ -226,7 +193,7 @@ async function syncVarcoClient() {
 
     if (shareCodeChanged) {
         console.log(`[Varco Worker] Share URL changed (${currentSettings?.shareCode} -> ${settings.shareCode}). Clearing stored key for fresh pairing.`);
-        await savePrivateKey(null);
+        savePrivateKey(null);
         delete settings.privateKey;
         delete settings.identityData;
         currentEntities = {};
@@ -234,7 +201,7 @@ async function syncVarcoClient() {
     }
 
     // Check if settings changed or if client is not subscribed
-    const keyChanged = JSON.stringify(settings) !== JSON.stringify(currentSettings);
+    const keyChanged = settingsKey(settings) !== settingsKey(currentSettings);
     if (!keyChanged && client && isSubscribed) {
         return;
     }
@@ -395,7 +362,7 @@ async function syncVarcoClient() {
                             const val = typeof entData === 'object' ? entData.state : entData;
                             const unit = typeof entData === 'object' ? entData.attributes?.unit_of_measurement : undefined;
                             const name = (typeof entData === 'object' && entData.attributes?.friendly_name) || eid.split('.').pop().replace(/_/g, ' ') || eid;
-                            currentEntities[eid] = {
+                            const entity = currentEntities[eid] = {
                                 id: eid,
                                 provider_id: 'varco-server-sidecar',
                                 name: name,
@@ -405,6 +372,7 @@ async function syncVarcoClient() {
                                 unit_of_measurement: unit,
                                 last_updated: new Date().toISOString()
                             };
+                            pushDelta(entity);
                         }
                     });
 
@@ -416,7 +384,9 @@ async function syncVarcoClient() {
                 }
             });
             isSubscribed = true;
+            resyncDelay = RESYNC_MIN_MS;
             console.log(`[Varco Worker] Subscribed to ${activeEntities.length} entities successfully.`);
+            reportStatus();
         }
     } catch (initErr) {
         console.warn('[Varco Worker] Initialization/Subscription attempt failed:', initErr.message || initErr);
@@ -426,11 +396,26 @@ async function syncVarcoClient() {
         }
         isSubscribed = false;
         currentSettings = null;
+        reportStatus();
+        scheduleResync();
     }
 }
 
-async function fetchLatestStates() {
-    const targetEntities = Array.from(new Set([
+// Retries a failed connection with backoff (settings changes sync immediately)
+function scheduleResync() {
+    if (resyncTimer) {
+        return;
+    }
+    const delay = resyncDelay;
+    resyncDelay = Math.min(resyncDelay * 2, RESYNC_MAX_MS);
+    resyncTimer = setTimeout(() => {
+        resyncTimer = null;
+        runSyncVarcoClient();
+    }, delay);
+}
+
+async function fetchLatestStates(onlyEntities = null) {
+    const targetEntities = onlyEntities || Array.from(new Set([
         ...(activeEntities.length > 0 ? activeEntities : (currentSettings?.requestedEntities || [])),
         ...Object.keys(currentEntities)
     ]));
@@ -485,36 +470,96 @@ async function fetchLatestStates() {
 }
 
 function runSyncVarcoClient() {
-    if (!syncPromise) {
-        syncPromise = syncVarcoClient().finally(() => {
-            syncPromise = null;
-        });
+    if (syncPromise) {
+        // Settings arrived mid-sync; apply them once the current sync settles
+        resyncRequested = true;
+        return syncPromise;
     }
+    syncPromise = syncVarcoClient().finally(() => {
+        syncPromise = null;
+        if (resyncRequested) {
+            resyncRequested = false;
+            runSyncVarcoClient();
+        }
+    });
     return syncPromise;
 }
 
-// Polling loop to check config updates & connection status every 10s
-setInterval(() => {
-    runSyncVarcoClient();
-}, 10000);
-runSyncVarcoClient();
-
-// HTTP endpoint for Python backend to query current entities
-const server = http.createServer(async (req, res) => {
-    if (req.url === '/telemetry' && req.method === 'GET') {
-        const success = await fetchLatestStates();
-        res.writeHead(200, { 'Content-Type': 'application/json' });
-        res.end(JSON.stringify({
-            online: client !== null && isSubscribed,
-            success: success,
-            entities: Object.values(currentEntities)
-        }));
-    } else {
-        res.writeHead(404, { 'Content-Type': 'application/json' });
-        res.end(JSON.stringify({ error: 'not_found' }));
+async function handleBackendMessage(message) {
+    if (message.type === 'config') {
+        backendSettings = settingsFromBackend(message.settings);
+        if (resyncTimer) {
+            clearTimeout(resyncTimer);
+            resyncTimer = null;
+        }
+        resyncDelay = RESYNC_MIN_MS;
+        runSyncVarcoClient();
+    } else if (message.type === 'response') {
+        if (pendingIdentity && message.id === pendingIdentity.id) {
+            if (message.success) {
+                console.log('[Varco Worker] Backend saved identity to config.');
+            } else {
+                console.warn('[Varco Worker] Backend could not save identity (no Varco provider).');
+            }
+            pendingIdentity = null;
+        }
+    } else if (message.type === 'fetch') {
+        // On-demand query for entities the subscription has not delivered yet
+        const onlyEntities = Array.isArray(message.entities) && message.entities.length > 0 ? message.entities : null;
+        const success = await fetchLatestStates(onlyEntities);
+        const entities = onlyEntities
+            ? onlyEntities.map(eid => currentEntities[eid]).filter(Boolean)
+            : Object.values(currentEntities);
+        sendToBackend({ type: 'response', id: message.id, online: isOnline(), success, entities });
     }
-});
+}
 
-server.listen(PORT, '127.0.0.1', () => {
-    console.log(`[Varco Worker] Internal HTTP telemetry server listening on 127.0.0.1:${PORT}`);
-});
+// Persistent NDJSON channel to the Python backend, which listens on SOCKET_PATH
+function connectChannel() {
+    const socket = net.createConnection(SOCKET_PATH);
+    let buffer = '';
+    socket.setEncoding('utf8');
+    socket.on('connect', () => {
+        channel = socket;
+        channelReconnectDelay = 500;
+        console.log(`[Varco Worker] Connected to backend channel at ${SOCKET_PATH}`);
+        sendToBackend({ type: 'hello', pid: process.pid });
+        flushIdentity();
+        if (Object.keys(currentEntities).length > 0) {
+            sendToBackend({ type: 'entities', full: true, online: isOnline(), entities: Object.values(currentEntities) });
+        }
+    });
+    socket.on('data', (chunk) => {
+        buffer += chunk;
+        let newline;
+        while ((newline = buffer.indexOf('\n')) >= 0) {
+            const line = buffer.slice(0, newline).trim();
+            buffer = buffer.slice(newline + 1);
+            if (!line) continue;
+            let message;
+            try {
+                message = JSON.parse(line);
+            } catch {
+                console.warn('[Varco Worker] Ignoring malformed backend message');
+                continue;
+            }
+            handleBackendMessage(message).catch((err) => {
+                console.warn('[Varco Worker] Backend message handling info:', err?.message || err);
+            });
+        }
+    });
+    socket.on('error', (err) => {
+        if (channel === socket || err.code !== 'ENOENT') {
+            console.warn('[Varco Worker] Backend channel info:', err.message || err);
+        }
+    });
+    socket.on('close', () => {
+        if (channel === socket) {
+            channel = null;
+        }
+        setTimeout(connectChannel, channelReconnectDelay);
+        channelReconnectDelay = Math.min(channelReconnectDelay * 2, CHANNEL_RECONNECT_MAX_MS);
+    });
+}
+
+connectChannel();
@@ -23,6 +23,7 @@ import { FreeCanvasBoard } from './components/FreeCanvasBoard'
 import { MonitoringProvider } from './components/monitoring/MonitoringContext'
 import { useMonitoring } from './components/monitoring/useMonitoring'
 import { MonitoringOverlay } from './components/monitoring/MonitoringOverlay'
+import { responsiveImageUrl } from './utils/mediaUtils'
 
 interface SortableAppTileProps {
     app: AppData
@@ -1690,17 +1691,31 @@ function AppContent() {
                         autoPlay
                         loop
                         muted
+                        playsInline
+                        poster={bgConfig.poster || undefined}
                         className="w-full h-full object-cover"
                         key={bgConfig.value}
                     >
-                        <source src={bgConfig.value} type="video/mp4" />
+                        {bgConfig.sources?.length ? (
+                            bgConfig.sources.map(source => (
+                                <source key={source.src} src={source.src} type={source.type} />
+                            ))
+                        ) : (
+                            <source src={bgConfig.value} type="video/mp4" />
+                        )}
                     </video>
                 ) : bgConfig.value === 'gradient' ? (
                     <div className="w-full h-full bg-[radial-gradient(ellipse_at_center,_var(--tw-gradient-stops))] from-slate-900 via-[#0a0a0a] to-black" />
                 ) : (
                     <div
                         className="w-full h-full bg-cover bg-center transition-all duration-500"
-                        style={{ backgroundImage: `url(${bgConfig.value})` }}
+                        style={{
+                            backgroundColor: bgConfig.color || undefined,
+                            // Placeholder layer sits underneath and shows until the image has loaded
+                            backgroundImage: bgConfig.placeholder
+                                ? `url(${responsiveImageUrl(bgConfig.value)}), url(${bgConfig.placeholder})`
+                                : `url(${responsiveImageUrl(bgConfig.value)})`
+                        }}
                     />
                 )}
                 {/* Overlay for readability */}
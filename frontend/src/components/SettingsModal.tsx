@@ -180,6 +180,8 @@ interface MediaItem {
     name: string
     url: string
     type: 'image' | 'video'
+    placeholder?: string | null
+    color?: string | null
 }
 
 const getStrength = (pass: string) => {
@@ -299,16 +301,23 @@ function ChangePasswordForm() {
     )
 }
 
+const MEDIA_PAGE_SIZE = 60
+
 function MediaLibrary({ onSelect }: { onSelect: (url: string, type: string) => void }) {
     const [media, setMedia] = useState<MediaItem[]>([])
+    const [nextCursor, setNextCursor] = useState<string | null>(null)
     const [loading, setLoading] = useState(true)
 
-    const fetchMedia = async () => {
+    // Newest first; pass a cursor to append the next page
+    const fetchMedia = async (cursor?: string) => {
         try {
-            const res = await fetch('/api/v1/media')
+            const params = new URLSearchParams({ limit: String(MEDIA_PAGE_SIZE), sort: '-mtime' })
+            if (cursor) params.set('cursor', cursor)
+            const res = await fetch(`/api/v1/media?${params}`)
             if (res.ok) {
-                const data = await res.json()
-                setMedia(data)
+                const data: { items: MediaItem[], next_cursor: string | null } = await res.json()
+                setMedia(prev => cursor ? [...prev, ...data.items] : data.items)
+                setNextCursor(data.next_cursor)
             }
         } catch (e) {
             console.error("Failed to fetch media", e)
@@ -352,7 +361,16 @@ function MediaLibrary({ onSelect }: { onSelect: (url: string, type: string) => v
                             <video src={item.url} className="absolute inset-0 w-full h-full object-cover opacity-50" muted />
                         </div>
                     ) : (
-                        <img src={item.url} alt={item.name} className="w-full h-full object-cover" />
+                        <img
+                            src={item.url}
+                            alt={item.name}
+                            loading="lazy"
+                            className="w-full h-full object-cover bg-cover bg-center"
+                            style={{
+                                backgroundColor: item.color || undefined,
+                                backgroundImage: item.placeholder ? `url(${item.placeholder})` : undefined
+                            }}
+                        />
                     )}
 
                     {/* Hover Overlay */}
@@ -366,6 +384,14 @@ function MediaLibrary({ onSelect }: { onSelect: (url: string, type: string) => v
                     </div>
                 </div>
             ))}
+            {nextCursor && (
+                <button
+                    onClick={() => fetchMedia(nextCursor)}
+                    className="col-span-3 py-1.5 rounded-lg border border-white/10 text-xs text-gray-400 hover:text-white hover:border-neon-cyan transition-colors"
+                >
+                    Load more
+                </button>
+            )}
         </div>
     )
 }
@@ -499,12 +525,13 @@ export function SettingsModal({
             }
 
             const data = await res.json()
-            // Backend returns relative URL like /uploads/filename.ext
+            // Backend returns a content-addressed relative URL like uploads/media/<sha256>.ext,
+            // so a new file always gets a new URL and no cache-busting is needed
 
             if (isLogo) {
                 onLogoChange({
                     type: 'image',
-                    value: `${data.url}?v=${Date.now()}`
+                    value: data.url
                 })
             } else {
                 onBgChange({
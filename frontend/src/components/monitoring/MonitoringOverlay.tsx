@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react'
+import React, { useState, useEffect, useRef } from 'react'
 import { motion, AnimatePresence } from 'framer-motion'
 import { useMonitoring } from './useMonitoring'
 import { MonitoringZoneGrid } from './layout/MonitoringZoneGrid'
@@ -62,14 +62,47 @@ export const MonitoringOverlay: React.FC<MonitoringOverlayProps> = ({
     const [newZoneName, setNewZoneName] = useState('')
     const [dragWidth, setDragWidth] = useState<number | null>(null)
 
+    const clientIdRef = useRef(
+        typeof crypto !== 'undefined' && 'randomUUID' in crypto
+            ? crypto.randomUUID()
+            : Math.random().toString(36).slice(2)
+    )
+    // Cards on screen; the backend only collects entities of visible cards
+    const visibleCardKey = (config?.cards ?? [])
+        .filter((c) => {
+            const zId = c.zone_id || c.zoneId || 'network'
+            return (zId === activeZoneId || activeZoneId === 'overview') && !c.hidden
+        })
+        .map((c) => c.id)
+        .join(',')
+
     useEffect(() => {
         if (!isOpen) return
         const sendActivePing = () => {
-            fetch('/api/v1/monitoring/active', { method: 'POST' }).catch(() => {})
+            fetch('/api/v1/monitoring/active', {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({
+                    client_id: clientIdRef.current,
+                    zone_ids: [activeZoneId],
+                    card_ids: visibleCardKey ? visibleCardKey.split(',') : [],
+                }),
+            }).catch(() => {})
         }
         sendActivePing()
         const interval = setInterval(sendActivePing, 15000)
         return () => clearInterval(interval)
+    }, [isOpen, activeZoneId, visibleCardKey])
+
+    useEffect(() => {
+        if (!isOpen) return
+        const clientId = clientIdRef.current
+        return () => {
+            fetch(`/api/v1/monitoring/active/${encodeURIComponent(clientId)}`, {
+                method: 'DELETE',
+                keepalive: true,
+            }).catch(() => {})
+        }
     }, [isOpen])
 
     if (!isOpen) return null
@@ -1,6 +1,10 @@
 export interface BackgroundConfig {
     type: 'image' | 'video'
     value: string // URL or 'gradient'
+    placeholder?: string | null // Tiny inline preview of uploaded images (set by the backend)
+    color?: string | null // Dominant colour of uploaded images (set by the backend)
+    poster?: string | null // Poster frame of uploaded videos (set by the backend)
+    sources?: { src: string; type: string }[] | null // Transcoded video variants, lightest first (set by the backend)
 }
 
 export interface LogoConfig {
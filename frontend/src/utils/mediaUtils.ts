@@ -0,0 +1,18 @@
+/**
+ * Helpers for serving uploaded media in the size the device actually needs.
+ */
+
+const UPLOAD_PATTERN = /^\/?uploads\/(?:media\/)?([^/?#]+)(?:\?v=([^&#]+))?/;
+
+/**
+ * Maps an uploaded image URL (`uploads/media/<hash>.<ext>` or legacy `uploads/<file>`) to the backend endpoint that serves the
+ * best derivative for the current viewport width and the browser's `Accept` header.
+ * Other URLs (remote images, gradients) are returned unchanged.
+ */
+export function responsiveImageUrl(value: string, width: number = window.innerWidth): string {
+    const match = value.match(UPLOAD_PATTERN);
+    if (!match) return value;
+    const pixels = Math.round(width * (window.devicePixelRatio || 1));
+    const version = match[2] ? `&v=${match[2]}` : '';
+    return `/api/v1/media/${match[1]}/best?w=${pixels}${version}`;
+}
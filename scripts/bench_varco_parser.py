@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the Varco share page parser.
+Compares the shared single-pass extractor against the previous per-section regexes
+on generated share pages with 1k and 10k entity sections, and on a malformed page
+whose sections are never closed.
+"""
+
+import re
+import sys
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR / "backend"))
+
+from app.services.varco_parser import parse_share_page  # noqa: E402
+
+SIZES = (1_000, 10_000)
+UNCLOSED_SIZE = 2_000
+ROUNDS = 5
+
+
+def build_page(sections: int, closed: bool = True) -> str:
+    cards = []
+    for i in range(sections):
+        cards.append(
+            f'<section class="varco-card" data-entity="sensor.bench_{i}">'
+            f'<div class="varco-card__title">Bench {i}</div>'
+            f'<span class="varco-card__state">{i % 97}.5</span>'
+            '<span class="varco-card__unit">%</span>' + ("</section>" if closed else "")
+        )
+    return "<html><body><main>" + "\n".join(cards) + "</main></body></html>"
+
+
+def legacy_parse(html: str) -> list[dict]:
+    entities = []
+    pattern = r'<section[^>]*data-entity="([^"]+)"[^>]*>(.*?)</section>'
+    for eid, body in re.findall(pattern, html, re.DOTALL):
+        state = re.search(r'class="varco-card__state">([^<]+)</span>', body)
+        title = re.search(r'class="varco-card__title">([^<]+)</div>', body)
+        unit = re.search(r'class="varco-card__unit">([^<]+)</span>', body)
+        if state:
+            entities.append(
+                {
+                    "id": eid.strip(),
+                    "name": title.group(1).strip() if title else eid,
+                    "state": state.group(1).strip(),
+                    "unit": unit.group(1).strip() if unit else None,
+                }
+            )
+    return entities
+
+
+def best_of(func, html: str) -> tuple[float, int]:
+    best = float("inf")
+    count = 0
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        count = len(func(html))
+        best = min(best, time.perf_counter() - start)
+    return best, count
+
+
+def main() -> None:
+    print(f"{'sections':>9} {'page KB':>8} {'legacy ms':>10} {'shared ms':>10}")
+    for size in SIZES:
+        html = build_page(size)
+        legacy, legacy_count = best_of(legacy_parse, html)
+        shared, shared_count = best_of(parse_share_page, html)
+        assert legacy_count == shared_count == size
+        print(
+            f"{size:>9} {len(html) // 1024:>8} "
+            f"{legacy * 1000:>10.1f} {shared * 1000:>10.1f}"
+        )
+    # Legacy's lazy match rescans to the end of the page for every unclosed section
+    html = build_page(UNCLOSED_SIZE, closed=False)
+    legacy, legacy_count = best_of(legacy_parse, html)
+    shared, shared_count = best_of(parse_share_page, html)
+    print(
+        f"{UNCLOSED_SIZE:>9} {len(html) // 1024:>8} "
+        f"{legacy * 1000:>10.1f} {shared * 1000:>10.1f}  "
+        f"(unclosed: legacy found {legacy_count}, shared {shared_count})"
+    )
+
+
+if __name__ == "__main__":
+    main()